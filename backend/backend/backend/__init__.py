@@ -1,52 +1,133 @@
+import configparser
+import logging
+import sys
+import time
+
+# Waktu startup dihitung sejak paket ini mulai di-import, sebelum pyramid
+# dan dependensinya dimuat. Dipakai sekali oleh main() pertama.
+_import_started = time.perf_counter()
+
 from pyramid.config import Configurator
-from pyramid.authorization import ACLAuthorizationPolicy
-from pyramid.security import ALL_PERMISSIONS, Allow, Authenticated
-from pyramid.events import NewRequest
-from pyramid.response import Response
-
-def add_cors_headers_response_callback(event):
-    def cors_headers(request, response):
-        if isinstance(response, Response):
-            response.headers.update({
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST,GET,DELETE,PUT,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization',
-                'Access-Control-Allow-Credentials': 'true',
-                'Access-Control-Max-Age': '1728000',
-            })
-    event.request.add_response_callback(cors_headers)
-
-def handle_options_request(request):
-    response = Response()
-    response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'POST,GET,DELETE,PUT,OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization',
-        'Access-Control-Allow-Credentials': 'true',
-        'Access-Control-Max-Age': '1728000',
-    })
-    return response
+from pyramid.settings import asbool
+from pyramid.tweens import INGRESS
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows tidak punya modul resource
+    resource = None
+
+log = logging.getLogger(__name__)
+
+
+def _max_rss_mb():
+    """Puncak RSS proses dalam MB, atau ``None`` bila tidak tersedia.
+
+    ``ru_maxrss`` berupa byte di macOS dan kilobyte di Linux/BSD.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+class _StartupTimer(object):
+    """Catat lama tiap tahap startup untuk dilaporkan di log.
+
+    Dengan ``started`` (mis. saat paket di-import) waktu sebelum timer
+    dibuat dilaporkan sebagai tahap ``imports``.
+    """
+
+    def __init__(self, started=None):
+        self.last = time.perf_counter()
+        self.started = started if started is not None else self.last
+        self.phases = []
+        if started is not None:
+            self.phases.append(('imports', (self.last - started) * 1000))
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def report(self, production):
+        message = 'Startup %s selesai dalam %.0f ms (%s); %d modul ter-import'
+        args = [
+            'production' if production else 'development',
+            (self.last - self.started) * 1000,
+            ', '.join('{} {:.0f} ms'.format(name, ms) for name, ms in self.phases),
+            len(sys.modules),
+        ]
+        max_rss = _max_rss_mb()
+        if max_rss is not None:
+            message += ', maxrss %.0f MB'
+            args.append(max_rss)
+        log.info(message, *args)
+
+
+def _server_threads(global_config):
+    """Nilai ``threads`` di ``[server:main]`` file ini, atau ``None``.
+
+    Section server tidak diteruskan PasteDeploy ke aplikasi, padahal
+    komponen seperti :mod:`backend.passwords` perlu tahu jumlah thread
+    waitress.
+    """
+    path = (global_config or {}).get('__file__')
+    if not path:
+        return None
+    parser = configparser.RawConfigParser()
+    parser.read(path)
+    if not parser.has_section('server:main'):
+        return None
+    return parser.get('server:main', 'threads', fallback=None)
+
 
 def main(global_config, **settings):
     """ This function returns a Pyramid WSGI application.
+
+    Dengan ``backend.production = true`` include khusus development
+    (pyramid_debugtoolbar, pyramid_jinja2) dan view template dilewati.
+    ``waitress.threads`` diisi dari ``[server:main] threads`` bila belum
+    diatur.
     """
+    global _import_started
+    timer = _StartupTimer(_import_started)
+    # App berikutnya dalam proses yang sama (mis. test) diukur dari main()
+    _import_started = None
+    threads = _server_threads(global_config)
+    if threads is not None:
+        settings.setdefault('waitress.threads', threads)
+    production = asbool(settings.get('backend.production', False))
     with Configurator(settings=settings) as config:
-        # CORS
-        config.add_subscriber(add_cors_headers_response_callback, NewRequest)
-        
-        # Handle OPTIONS request
-        config.add_route('cors_preflight', '/{catch_all:.*}', request_method='OPTIONS')
-        config.add_view(handle_options_request, route_name='cors_preflight')
-        
+        config.include('.renderers')
         config.include('.models')
-        config.include('pyramid_jinja2')
+        config.include('.sqltiming')
+        config.include('.metrics')
+        config.include('.ratelimit')
+        config.include('.events')
+        config.include('.cache')
+        config.include('.search')
+        config.include('.cart')
+        config.include('.roles')
+        config.include('.security')
+        config.include('.passwords')
+        if not production:
+            config.include('pyramid_jinja2')
         config.include('.routes')
-        config.include('pyramid_jwt')
-        config.include('pyramid_debugtoolbar')
+        if not production:
+            config.include('pyramid_debugtoolbar')
         config.add_static_view('static', 'static', cache_max_age=3600)
-        
-        # Add CORS configuration
-        config.add_tween('backend.cors.cors_tween_factory')
-        
-        config.scan()
-        return config.make_wsgi_app()
+
+        # CORS untuk semua response; preflight OPTIONS dijawab sebelum routing
+        config.add_tween('backend.cors.cors_tween_factory', under=INGRESS)
+        timer.mark('includes')
+
+        config.include('.views')
+        timer.mark('views')
+
+        app = config.make_wsgi_app()
+        timer.mark('commit')
+
+    timer.report(production)
+    return app
@@ -1,8 +1,7 @@
 """Pyramid bootstrap environment. """
 from alembic import context
 from pyramid.paster import get_appsettings, setup_logging
-from sqlalchemy import engine_from_config
-
+from backend.models import get_engine
 from backend.models.meta import Base
 
 config = context.config
@@ -37,7 +36,7 @@ def run_migrations_online():
     and associate a connection with the context.
 
     """
-    engine = engine_from_config(settings, prefix='sqlalchemy.')
+    engine = get_engine(settings)
 
     connection = engine.connect()
     context.configure(
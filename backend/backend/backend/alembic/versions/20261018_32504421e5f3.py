@@ -0,0 +1,32 @@
+"""daily sales rollup
+
+Revision ID: 32504421e5f3
+Revises: e4b3d754e6a3
+Create Date: 2026-10-18 11:03:27.540917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '32504421e5f3'
+down_revision = 'e4b3d754e6a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_sales',
+    sa.Column('tanggal', sa.Date(), nullable=False),
+    sa.Column('menu_id', sa.Integer(), nullable=False),
+    sa.Column('jumlah', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_id'], ['menu.menu_id'], name=op.f('fk_daily_sales_menu_id_menu')),
+    sa.PrimaryKeyConstraint('tanggal', 'menu_id', name=op.f('pk_daily_sales'))
+    )
+    # Isi tabel dengan `backfill_backend_daily_sales <config_uri>` setelah upgrade
+
+
+def downgrade():
+    op.drop_table('daily_sales')
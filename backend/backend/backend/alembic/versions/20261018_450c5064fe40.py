@@ -0,0 +1,24 @@
+"""menu kategori status index
+
+Revision ID: 450c5064fe40
+Revises: 6545c72e9016
+Create Date: 2026-10-18 15:12:40.518231
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '450c5064fe40'
+down_revision = '6545c72e9016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_menu_kategori_id_status', 'menu', ['kategori_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_menu_kategori_id_status', table_name='menu')
@@ -0,0 +1,32 @@
+"""idempotency keys
+
+Revision ID: 6545c72e9016
+Revises: 32504421e5f3
+Create Date: 2026-10-18 13:47:05.162873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6545c72e9016'
+down_revision = '32504421e5f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('idempotency_keys',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('response', sa.Text(), nullable=False),
+    sa.Column('create_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key', name=op.f('pk_idempotency_keys'))
+    )
+    op.create_index('ix_idempotency_keys_create_at', 'idempotency_keys', ['create_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_idempotency_keys_create_at', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,46 @@
+"""foreign key indexes
+
+Revision ID: e0a0846567a8
+Revises: 450c5064fe40
+Create Date: 2026-10-18 18:05:12.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0a0846567a8'
+down_revision = '450c5064fe40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_orderdetails_order_id', 'orderdetails', ['order_id'], unique=False)
+    op.create_index('ix_orderdetails_menu_id', 'orderdetails', ['menu_id'], unique=False)
+
+    # Gabungkan baris keranjang ganda (user, menu) ke baris tertua sebelum
+    # index unik dibuat
+    op.execute(
+        'UPDATE keranjang SET '
+        'jumlah = (SELECT SUM(k.jumlah) FROM keranjang k '
+        'WHERE k.user_id = keranjang.user_id AND k.menu_id = keranjang.menu_id), '
+        'subtotal = (SELECT SUM(k.subtotal) FROM keranjang k '
+        'WHERE k.user_id = keranjang.user_id AND k.menu_id = keranjang.menu_id) '
+        'WHERE keranjang_id IN (SELECT MIN(keranjang_id) FROM keranjang '
+        'GROUP BY user_id, menu_id HAVING COUNT(*) > 1)'
+    )
+    op.execute(
+        'DELETE FROM keranjang WHERE keranjang_id NOT IN '
+        '(SELECT MIN(keranjang_id) FROM keranjang GROUP BY user_id, menu_id)'
+    )
+    op.create_index('ix_keranjang_user_id_menu_id', 'keranjang', ['user_id', 'menu_id'], unique=True)
+    op.create_index('ix_keranjang_menu_id', 'keranjang', ['menu_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_keranjang_menu_id', table_name='keranjang')
+    op.drop_index('ix_keranjang_user_id_menu_id', table_name='keranjang')
+    op.drop_index('ix_orderdetails_menu_id', table_name='orderdetails')
+    op.drop_index('ix_orderdetails_order_id', table_name='orderdetails')
@@ -0,0 +1,28 @@
+"""order keyset indexes
+
+Revision ID: e4b3d754e6a3
+Revises: 2545de037242
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b3d754e6a3'
+down_revision = '2545de037242'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_orders_create_at_order_id', 'orders', ['create_at', 'order_id'], unique=False)
+    op.create_index('ix_orders_status_create_at_order_id', 'orders', ['status', 'create_at', 'order_id'], unique=False)
+    op.create_index('ix_orders_user_id_create_at_order_id', 'orders', ['user_id', 'create_at', 'order_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_orders_user_id_create_at_order_id', table_name='orders')
+    op.drop_index('ix_orders_status_create_at_order_id', table_name='orders')
+    op.drop_index('ix_orders_create_at_order_id', table_name='orders')
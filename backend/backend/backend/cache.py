@@ -0,0 +1,176 @@
+"""Cache in-process untuk response katalog (/api/menu, /api/kategori).
+
+Entri disimpan dengan TTL dan jumlah maksimum (LRU). Semua view yang
+mengubah menu atau kategori memanggil :func:`invalidate_catalog` sehingga
+perubahan langsung terlihat di proses yang sama; proses lain paling lama
+tertinggal selama TTL.
+
+Setiap entri menyimpan body JSON yang sudah dirender (dengan encoder
+renderer ``json`` aplikasi) beserta ETag kuat dari hash body tersebut. Hit
+langsung dijawab dengan :class:`~pyramid.response.Response` berisi body itu
+tanpa query maupun serialisasi ulang, dan request dengan ``If-None-Match``
+yang cocok dijawab 304. Karena dihitung dari isi, ETag sama di semua proses
+worker yang memakai ``json_renderer.backend`` yang sama.
+"""
+import collections
+import hashlib
+import threading
+import time
+
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.response import Response
+
+from .renderers import get_json_dumps
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 256
+
+
+class CatalogCache(object):
+    """Cache LRU dengan TTL yang aman dipakai dari banyak thread."""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key, creator):
+        """Ambil nilai ``key``; bila belum ada, buat dengan ``creator``.
+
+        Nilai ``None`` dari ``creator`` (mis. data tidak ditemukan) tidak
+        disimpan.
+        """
+        value = self.get(key)
+        if value is None:
+            value = creator()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+def get_catalog_cache(registry):
+    """Cache katalog dari registry, atau ``None`` bila tidak dikonfigurasi."""
+    return registry.get('catalog_cache')
+
+
+def body_etag(body):
+    """ETag kuat dari body response."""
+    return hashlib.sha1(body).hexdigest()
+
+
+def cached_catalog(request, key, creator):
+    """Ambil ``(body, etag)`` katalog dari cache.
+
+    Bila belum ada, payload dibuat dengan ``creator``, dirender menjadi
+    bytes JSON dan ETag-nya dihitung sekali. Menghasilkan ``(None, None)``
+    bila ``creator`` mengembalikan ``None``.
+    """
+    def create():
+        payload = creator()
+        if payload is None:
+            return None
+        body = get_json_dumps(request.registry)(payload)
+        return body, body_etag(body)
+
+    cache = get_catalog_cache(request.registry)
+    entry = create() if cache is None else cache.get_or_create(key, create)
+    return entry if entry is not None else (None, None)
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def conditional_response(request, body, etag):
+    """Response JSON berisi ``body`` dengan header ETag; 304 bila
+    ``If-None-Match`` cocok.
+
+    ``Cache-Control: no-cache`` membuat browser selalu merevalidasi,
+    sehingga perubahan katalog langsung terlihat.
+    """
+    headers = {'ETag': '"{}"'.format(etag), 'Cache-Control': 'no-cache'}
+    if _etag_matches(request.headers.get('If-None-Match'), etag):
+        return HTTPNotModified(headers=headers)
+    response = Response(body=body, content_type='application/json')
+    response.headers.update(headers)
+    return response
+
+
+def invalidate_catalog(request):
+    """Kosongkan cache katalog sekarang dan sekali lagi setelah commit.
+
+    Pengosongan kedua mencegah request lain yang sempat mengisi cache
+    dengan data lama sebelum transaksi ini selesai.
+    """
+    cache = get_catalog_cache(request.registry)
+    if cache is None:
+        return
+    cache.clear()
+    tm = getattr(request, 'tm', None)
+    if tm is not None:
+        tm.get().addAfterCommitHook(lambda success: cache.clear())
+
+
+def includeme(config):
+    """Pasang cache katalog ke registry.
+
+    Activate this setup using ``config.include('backend.cache')``.
+    """
+    settings = config.get_settings()
+    config.registry['catalog_cache'] = CatalogCache(
+        ttl=float(settings.get('catalog_cache.ttl', DEFAULT_TTL)),
+        max_entries=int(settings.get('catalog_cache.max_entries', DEFAULT_MAX_ENTRIES)),
+    )
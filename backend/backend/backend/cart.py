@@ -0,0 +1,384 @@
+"""Keranjang belanja di server: upsert atomik dan cache harga.
+
+Setiap perubahan keranjang adalah satu statement SQL:
+
+- tambah item memakai ``INSERT ... ON CONFLICT (user_id, menu_id) DO
+  UPDATE`` (PostgreSQL dan SQLite) sehingga tap "tambah" bersamaan tidak
+  membuat baris ganda; subtotal baris baru maupun baris yang dijumlahkan
+  dihitung dari harga menu di statement yang sama;
+- ubah jumlah dan hapus memakai ``UPDATE``/``DELETE ... RETURNING``.
+
+Sebelum menambah item, keberadaan semua menu dicek sekaligus dengan satu
+query ``IN`` (:func:`menu_prices`), berapa pun jumlah item yang ditambahkan.
+
+Tier memori opsional (:class:`CartStore`, ``cart.memory_tier = true``)
+menyimpan baris keranjang per user dan harga menu di proses ini. Semua
+perubahan tetap ditulis ke tabel ``keranjang`` lebih dulu (write-through)
+dan baru diterapkan ke memori setelah transaksi di-commit. Bila menu sudah
+ada di cache harga, menambah item cukup satu statement upsert, dan
+``GET /api/keranjang/{user_id}?expand=`` dijawab dari memori. Tier ini
+cocok bila request satu user dilayani proses yang sama; perubahan dari
+proses lain terlihat paling lama setelah ``cart.ttl`` detik.
+
+Setting (semuanya opsional)::
+
+    cart.memory_tier = false
+    cart.max_users = 10000
+    cart.ttl = 60
+"""
+import collections
+import threading
+import time
+
+from pyramid.settings import asbool
+from sqlalchemy import and_, delete, literal_column, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .models import Keranjang, Menu
+
+DEFAULT_MAX_USERS = 10000
+DEFAULT_TTL = 60
+
+# Kolom yang dikembalikan setiap perubahan, sama dengan COLUMNS['keranjang']
+LINE_COLUMNS = (
+    Keranjang.keranjang_id,
+    Keranjang.order_id,
+    Keranjang.menu_id,
+    Keranjang.user_id,
+    Keranjang.jumlah,
+    Keranjang.subtotal,
+)
+
+UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def _line(row):
+    return dict(row._mapping)
+
+
+def menu_prices(dbsession, menu_ids):
+    """Harga menu ``{menu_id: harga}`` untuk semua ``menu_ids`` dalam satu query.
+
+    Menu yang tidak ada tidak muncul di hasil.
+    """
+    if not menu_ids:
+        return {}
+    rows = dbsession.execute(
+        select(Menu.menu_id, Menu.harga).where(Menu.menu_id.in_(set(menu_ids))))
+    return dict(rows.all())
+
+
+def _current_price(menu_id):
+    return select(Menu.harga).where(Menu.menu_id == menu_id).scalar_subquery()
+
+
+def upsert_items(dbsession, user_id, quantities, order_id=None):
+    """Tambahkan ``quantities`` (``{menu_id: jumlah}``) ke keranjang user.
+
+    Subtotal baris baru maupun baris yang dijumlahkan dihitung di statement
+    yang sama dari harga menu saat ini, bukan dari harga di cache yang bisa
+    sudah basi. Mengembalikan baris keranjang hasil perubahan (dict).
+    """
+    rows = [
+        {'user_id': user_id, 'order_id': order_id, 'menu_id': menu_id,
+         'jumlah': jumlah, 'subtotal': _current_price(menu_id) * jumlah}
+        for menu_id, jumlah in quantities.items()
+    ]
+    if not rows:
+        return []
+    dialect_insert = UPSERT_DIALECTS.get(dbsession.get_bind().dialect.name)
+    if dialect_insert is None:
+        return _upsert_fallback(dbsession, rows)
+
+    stmt = dialect_insert(Keranjang).values(rows)
+    jumlah = Keranjang.jumlah + stmt.excluded.jumlah
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Keranjang.user_id, Keranjang.menu_id],
+        set_={
+            'jumlah': jumlah,
+            # literal_column agar subquery berkorelasi dengan baris "excluded"
+            'subtotal': jumlah * _current_price(literal_column('excluded.menu_id')),
+        },
+    ).returning(*LINE_COLUMNS)
+    return [_line(row) for row in dbsession.execute(stmt)]
+
+
+def _upsert_fallback(dbsession, rows):
+    """Upsert untuk dialect tanpa ``ON CONFLICT``/``RETURNING``: UPDATE, lalu
+    INSERT bila belum ada baris, lalu SELECT.
+
+    Tidak atomik; insert ganda yang bersamaan ditolak indeks unik
+    ``(user_id, menu_id)``.
+    """
+    lines = []
+    for row in rows:
+        where = (Keranjang.user_id == row['user_id'], Keranjang.menu_id == row['menu_id'])
+        jumlah = Keranjang.jumlah + row['jumlah']
+        result = dbsession.execute(
+            update(Keranjang)
+            .where(*where)
+            .values(jumlah=jumlah, subtotal=jumlah * _current_price(Keranjang.menu_id))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            dbsession.execute(Keranjang.__table__.insert().values(row))
+        lines.append(_line(dbsession.execute(select(*LINE_COLUMNS).where(*where)).one()))
+    return lines
+
+
+def _item(keranjang_id, user_id):
+    condition = Keranjang.keranjang_id == keranjang_id
+    if user_id is not None:
+        condition = and_(condition, Keranjang.user_id == user_id)
+    return condition
+
+
+def set_quantity(dbsession, keranjang_id, jumlah, user_id=None):
+    """Ubah jumlah satu item; ``None`` bila item tidak ada.
+
+    Dengan ``user_id`` hanya item milik user itu yang diubah.
+    """
+    row = dbsession.execute(
+        update(Keranjang)
+        .where(_item(keranjang_id, user_id))
+        .values(jumlah=jumlah, subtotal=jumlah * _current_price(Keranjang.menu_id))
+        .returning(*LINE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return _line(row) if row is not None else None
+
+
+def remove_item(dbsession, keranjang_id, user_id=None):
+    """Hapus satu item; mengembalikan baris yang dihapus atau ``None``.
+
+    Dengan ``user_id`` hanya item milik user itu yang dihapus.
+    """
+    row = dbsession.execute(
+        delete(Keranjang)
+        .where(_item(keranjang_id, user_id))
+        .returning(*LINE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return _line(row) if row is not None else None
+
+
+def clear_cart(dbsession, user_id):
+    """Kosongkan keranjang user; mengembalikan jumlah baris yang dihapus."""
+    result = dbsession.execute(
+        delete(Keranjang)
+        .where(Keranjang.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def load_lines(dbsession, user_id):
+    """Baris keranjang user (kolom saja, tanpa relasi)."""
+    rows = dbsession.execute(
+        select(*LINE_COLUMNS)
+        .where(Keranjang.user_id == user_id)
+        .order_by(Keranjang.keranjang_id)
+    )
+    return [_line(row) for row in rows]
+
+
+class CartStore(object):
+    """Tier memori keranjang per user dan harga menu, write-through.
+
+    Isi hanya diubah lewat :meth:`apply`/:meth:`discard`/:meth:`clear`
+    setelah perubahan di database di-commit. Setiap perubahan menaikkan
+    versi user, sehingga hasil :meth:`load` dari baca yang mendahului
+    perubahan itu dibuang.
+    """
+
+    def __init__(self, max_users=DEFAULT_MAX_USERS, ttl=DEFAULT_TTL):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # user_id -> (kedaluwarsa, {menu_id: baris})
+        self._carts = collections.OrderedDict()
+        # user_id -> versi, dibatasi seperti ``_carts``
+        self._versions = collections.OrderedDict()
+        # menu_id -> (kedaluwarsa, harga)
+        self._prices = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, user_id):
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def _bump(self, user_id):
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._versions.move_to_end(user_id)
+        while len(self._versions) > self.max_users:
+            self._versions.popitem(last=False)
+
+    def lines(self, user_id):
+        """Baris keranjang user dari memori, atau ``None`` bila belum dimuat."""
+        with self._lock:
+            entry = self._carts.get(user_id)
+            if entry is not None:
+                expires, lines = entry
+                if expires > time.monotonic():
+                    self._carts.move_to_end(user_id)
+                    self.hits += 1
+                    return sorted(lines.values(), key=lambda line: line['keranjang_id'])
+                del self._carts[user_id]
+            self.misses += 1
+            return None
+
+    def load(self, user_id, lines, version):
+        """Simpan hasil baca database bila belum ada perubahan sejak ``version``."""
+        with self._lock:
+            if self._versions.get(user_id, 0) != version:
+                return
+            self._carts[user_id] = (
+                time.monotonic() + self.ttl, {line['menu_id']: line for line in lines})
+            self._carts.move_to_end(user_id)
+            while len(self._carts) > self.max_users:
+                self._carts.popitem(last=False)
+
+    def _change(self, user_id, mutate):
+        with self._lock:
+            self._bump(user_id)
+            entry = self._carts.get(user_id)
+            if entry is not None:
+                mutate(entry[1])
+
+    def apply(self, user_id, lines):
+        """Terapkan baris hasil upsert/update."""
+        def mutate(cart):
+            for line in lines:
+                cart[line['menu_id']] = line
+        self._change(user_id, mutate)
+
+    def discard(self, user_id, menu_id):
+        self._change(user_id, lambda cart: cart.pop(menu_id, None))
+
+    def clear(self, user_id):
+        self._change(user_id, lambda cart: cart.clear())
+
+    def forget(self, user_id):
+        """Buang keranjang user dari memori (mis. transaksi gagal)."""
+        with self._lock:
+            self._bump(user_id)
+            self._carts.pop(user_id, None)
+
+    def prices(self, dbsession, menu_ids):
+        """Seperti :func:`menu_prices`, tetapi hanya menu yang belum di cache
+        yang dibaca dari database."""
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for menu_id in set(menu_ids):
+                entry = self._prices.get(menu_id)
+                if entry is not None and entry[0] > now:
+                    found[menu_id] = entry[1]
+                else:
+                    missing.append(menu_id)
+        if missing:
+            loaded = menu_prices(dbsession, missing)
+            expires = now + self.ttl
+            with self._lock:
+                for menu_id, harga in loaded.items():
+                    self._prices[menu_id] = (expires, harga)
+            found.update(loaded)
+        return found
+
+    def forget_price(self, menu_id):
+        with self._lock:
+            self._prices.pop(menu_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._carts),
+                'max_users': self.max_users,
+                'prices': len(self._prices),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def get_cart_store(registry):
+    """Tier memori keranjang, atau ``None`` bila tidak diaktifkan."""
+    return registry.get('cart_store')
+
+
+def _after_commit(request, apply, on_failure=None):
+    store = get_cart_store(request.registry)
+    if store is None:
+        return
+    tm = getattr(request, 'tm', None)
+    if tm is None:
+        apply(store)
+        return
+
+    def hook(success):
+        if success:
+            apply(store)
+        elif on_failure is not None:
+            on_failure(store)
+
+    tm.get().addAfterCommitHook(hook)
+
+
+def lookup_prices(request, menu_ids):
+    """Harga menu lewat cache tier memori bila aktif."""
+    store = get_cart_store(request.registry)
+    if store is None:
+        return menu_prices(request.dbsession, menu_ids)
+    return store.prices(request.dbsession, menu_ids)
+
+
+def cart_lines(request, user_id):
+    """Baris keranjang user, dari tier memori bila aktif."""
+    store = get_cart_store(request.registry)
+    if store is None:
+        return load_lines(request.dbsession, user_id)
+    lines = store.lines(user_id)
+    if lines is None:
+        version = store.version(user_id)
+        lines = load_lines(request.dbsession, user_id)
+        store.load(user_id, lines, version)
+    return lines
+
+
+def lines_changed(request, user_id, lines):
+    """Perbarui tier memori setelah commit dengan baris yang berubah."""
+    _after_commit(request, lambda store: store.apply(user_id, lines),
+                  lambda store: store.forget(user_id))
+
+
+def line_removed(request, line):
+    user_id, menu_id = line['user_id'], line['menu_id']
+    _after_commit(request, lambda store: store.discard(user_id, menu_id),
+                  lambda store: store.forget(user_id))
+
+
+def cart_cleared(request, user_id):
+    _after_commit(request, lambda store: store.clear(user_id),
+                  lambda store: store.forget(user_id))
+
+
+def menu_price_changed(request, menu_id):
+    """Buang harga menu dari cache setelah menu diubah atau dihapus."""
+    _after_commit(request, lambda store: store.forget_price(menu_id))
+
+
+def includeme(config):
+    """Pasang tier memori keranjang bila ``cart.memory_tier`` aktif.
+
+    Activate this setup using ``config.include('backend.cart')``.
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('cart.memory_tier', False)):
+        return
+    config.registry['cart_store'] = CartStore(
+        max_users=int(settings.get('cart.max_users', DEFAULT_MAX_USERS)),
+        ttl=float(settings.get('cart.ttl', DEFAULT_TTL)),
+    )
@@ -1,11 +1,128 @@
+"""CORS untuk seluruh aplikasi dalam satu tween.
+
+Header dihitung sekali saat startup dari setting ``cors.*``. Preflight
+``OPTIONS`` dijawab langsung oleh tween sebelum routing, transaksi, maupun
+sesi database dibuat.
+
+Setting (semuanya opsional)::
+
+    cors.allow_origins = http://localhost:5173 https://kantin.example.com
+    cors.allow_methods = GET, POST, PUT, DELETE, OPTIONS
+    cors.allow_headers = Origin, Content-Type, Accept, Authorization, Idempotency-Key
+    cors.expose_headers = ETag, Idempotent-Replayed
+    cors.allow_credentials = false
+    cors.max_age = 1728000
+
+``cors.allow_origins = *`` (default) mengizinkan semua origin dengan
+``Access-Control-Allow-Origin: *`` literal. Credentials (cookie) default
+mati karena frontend mengirim token lewat header ``Authorization``; bila
+``cors.allow_credentials = true`` daftar origin wajib eksplisit, karena
+``*`` dengan credentials sama saja mempercayai origin mana pun.
+"""
+from pyramid.response import Response
+from pyramid.settings import asbool, aslist
+
+DEFAULT_ALLOW_ORIGINS = '*'
+DEFAULT_ALLOW_METHODS = 'GET, POST, PUT, DELETE, OPTIONS'
+DEFAULT_ALLOW_HEADERS = 'Origin, Content-Type, Accept, Authorization, Idempotency-Key'
+DEFAULT_EXPOSE_HEADERS = 'ETag, Idempotent-Replayed'
+DEFAULT_MAX_AGE = 1728000
+
+
+class CORSPolicy(object):
+    """Daftar header CORS yang sudah dihitung untuk setiap origin."""
+
+    def __init__(self, allow_origins=DEFAULT_ALLOW_ORIGINS,
+                 allow_methods=DEFAULT_ALLOW_METHODS,
+                 allow_headers=DEFAULT_ALLOW_HEADERS,
+                 expose_headers=DEFAULT_EXPOSE_HEADERS,
+                 allow_credentials=False,
+                 max_age=DEFAULT_MAX_AGE):
+        origins = aslist(allow_origins) if isinstance(allow_origins, str) else list(allow_origins)
+        self.any_origin = '*' in origins
+        if self.any_origin and allow_credentials:
+            raise ValueError(
+                'cors.allow_credentials = true membutuhkan cors.allow_origins yang eksplisit, '
+                'bukan *')
+        self.origins = frozenset(o.rstrip('/') for o in origins if o != '*')
+        self.allow_credentials = allow_credentials
+
+        common = []
+        if allow_credentials:
+            common.append(('Access-Control-Allow-Credentials', 'true'))
+        # Allow-Origin berbeda per origin kecuali '*'
+        self.vary = not self.any_origin
+        if self.vary:
+            common.append(('Vary', 'Origin'))
+
+        self._simple = list(common)
+        if expose_headers:
+            self._simple.append(('Access-Control-Expose-Headers', expose_headers))
+        self._preflight = common + [
+            ('Access-Control-Allow-Methods', allow_methods),
+            ('Access-Control-Allow-Headers', allow_headers),
+            ('Access-Control-Max-Age', str(max_age)),
+        ]
+
+        # Header lengkap untuk origin yang didaftarkan, dihitung sekali
+        self._by_origin = {
+            origin: (
+                [('Access-Control-Allow-Origin', origin)] + self._simple,
+                [('Access-Control-Allow-Origin', origin)] + self._preflight,
+            )
+            for origin in self.origins
+        }
+        self._wildcard = (
+            [('Access-Control-Allow-Origin', '*')] + self._simple,
+            [('Access-Control-Allow-Origin', '*')] + self._preflight,
+        )
+        # Origin kosong atau ditolak tetap mendapat Vary: Origin agar cache
+        # tidak menyimpan respons tanpa Allow-Origin lalu menyajikannya ke
+        # origin yang diizinkan
+        self._vary_only = [('Vary', 'Origin')] if self.vary else None
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            allow_origins=settings.get('cors.allow_origins', DEFAULT_ALLOW_ORIGINS),
+            allow_methods=settings.get('cors.allow_methods', DEFAULT_ALLOW_METHODS),
+            allow_headers=settings.get('cors.allow_headers', DEFAULT_ALLOW_HEADERS),
+            expose_headers=settings.get('cors.expose_headers', DEFAULT_EXPOSE_HEADERS),
+            allow_credentials=asbool(settings.get('cors.allow_credentials', False)),
+            max_age=int(settings.get('cors.max_age', DEFAULT_MAX_AGE)),
+        )
+
+    def headers(self, origin, preflight=False):
+        """Header untuk ``origin``.
+
+        Origin yang kosong atau tidak diizinkan hanya mendapat
+        ``Vary: Origin`` (tanpa header Access-Control-*) bila policy bukan
+        ``*``.
+        """
+        index = 1 if preflight else 0
+        if self.any_origin:
+            return self._wildcard[index]
+        entry = self._by_origin.get(origin) if origin is not None else None
+        return entry[index] if entry is not None else self._vary_only
+
+
 def cors_tween_factory(handler, registry):
+    policy = CORSPolicy.from_settings(registry.settings or {})
+
     def cors_tween(request):
+        origin = request.headers.get('Origin')
+        if request.method == 'OPTIONS':
+            # Preflight dijawab tanpa routing, transaksi maupun sesi database
+            response = Response(status=204)
+            headers = policy.headers(origin, preflight=True)
+            if headers:
+                response.headerlist.extend(headers)
+            return response
+
         response = handler(request)
-        response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
-            'Access-Control-Allow-Headers': 'Origin, Content-Type, Accept, Authorization',
-            'Access-Control-Allow-Credentials': 'true',
-        })
+        headers = policy.headers(origin)
+        if headers:
+            response.headerlist.extend(headers)
         return response
-    return cors_tween 
\ No newline at end of file
+
+    return cors_tween
@@ -0,0 +1,101 @@
+"""Pub/sub in-process untuk event pesanan (dipakai oleh /api/orders/stream).
+
+Broker menyimpan event terakhir dalam ring buffer bernomor urut sehingga
+klien SSE yang tersambung ulang dapat melanjutkan dari ``Last-Event-ID``.
+Broker lain (mis. Redis pub/sub) dapat dipasang lewat setting
+``orders.events.broker`` selama menyediakan ``publish``, ``latest_id``,
+``events_after`` dan ``wait``.
+"""
+import collections
+import threading
+import time
+
+DEFAULT_HISTORY = 256
+
+ORDER_CREATED = 'order_created'
+ORDER_STATUS_CHANGED = 'order_status_changed'
+ORDER_DELETED = 'order_deleted'
+
+Event = collections.namedtuple('Event', ['id', 'type', 'data'])
+
+
+class InProcessBroker(object):
+    """Broker event dalam satu proses, aman dipakai dari banyak thread."""
+
+    def __init__(self, history=DEFAULT_HISTORY):
+        self._condition = threading.Condition()
+        self._events = collections.deque(maxlen=history)
+        self._last_id = 0
+
+    def publish(self, event_type, data):
+        with self._condition:
+            self._last_id += 1
+            event = Event(self._last_id, event_type, data)
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def latest_id(self):
+        return self._last_id
+
+    def events_after(self, last_id):
+        """Event dengan id > ``last_id``.
+
+        Mengembalikan ``None`` bila sebagian event sudah terbuang dari
+        buffer, sehingga klien perlu memuat ulang data secara penuh.
+        """
+        with self._condition:
+            if last_id >= self._last_id:
+                return []
+            if not self._events or self._events[0].id > last_id + 1:
+                return None
+            return [e for e in self._events if e.id > last_id]
+
+    def wait(self, last_id, timeout):
+        """Tunggu hingga ada event baru setelah ``last_id`` atau timeout."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._last_id <= last_id:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+        return self.events_after(last_id)
+
+
+_default_broker = InProcessBroker()
+
+
+def get_broker(registry):
+    return registry.get('order_events', _default_broker)
+
+
+def publish_after_commit(request, event_type, data):
+    """Kirim event setelah transaksi request berhasil di-commit.
+
+    Tanpa transaction manager (mis. di script atau test) event langsung
+    dikirim.
+    """
+    broker = get_broker(request.registry)
+    tm = getattr(request, 'tm', None)
+    if tm is None:
+        broker.publish(event_type, data)
+        return
+
+    def hook(success):
+        if success:
+            broker.publish(event_type, data)
+
+    tm.get().addAfterCommitHook(hook)
+
+
+def includeme(config):
+    """Pasang broker event pesanan ke registry.
+
+    Activate this setup using ``config.include('backend.events')``.
+    """
+    settings = config.get_settings()
+    broker_factory = config.maybe_dotted(
+        settings.get('orders.events.broker', InProcessBroker))
+    config.registry['order_events'] = broker_factory(
+        history=int(settings.get('orders.events.history', DEFAULT_HISTORY)))
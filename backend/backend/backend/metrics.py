@@ -0,0 +1,194 @@
+"""Metrik latensi request per route dalam format teks Prometheus.
+
+Tween :func:`metrics_tween_factory` mencatat setiap request ke
+:class:`RequestMetrics`. Setiap thread worker menulis ke shard miliknya
+sendiri tanpa lock; shard baru digabung saat ``/metrics`` dibaca.
+
+Metrik yang dihasilkan (label ``route`` = nama route Pyramid, atau
+``unmatched`` untuk request tanpa route seperti 404 dan preflight; label
+``method`` di luar method HTTP standar dicatat sebagai ``other`` agar klien
+tidak bisa menambah deret waktu sesukanya)::
+
+    kantin_http_requests_total{route, method, status}
+    kantin_http_request_errors_total{route}
+    kantin_http_request_duration_seconds{route}   (histogram)
+
+Setting (semuanya opsional)::
+
+    metrics.enabled = true
+    metrics.buckets = 0.005 0.01 0.025 0.05 0.1 0.25 0.5 1 2.5 5 10
+    metrics.scrape_token = <string acak, dikirim scraper sebagai Bearer>
+
+``/metrics`` hanya untuk scraper dengan ``metrics.scrape_token`` (kredensial
+tetap, tidak kedaluwarsa seperti token login) atau admin yang login.
+"""
+import bisect
+import hmac
+import threading
+import time
+
+from pyramid.settings import asbool, aslist
+from pyramid.tweens import INGRESS
+
+from .security import bearer_token
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED = 'unmatched'
+METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'PATCH', 'OPTIONS'))
+OTHER_METHOD = 'other'
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+
+class _Shard(object):
+    """Akumulator milik satu thread."""
+
+    __slots__ = ('requests', 'errors', 'histograms')
+
+    def __init__(self):
+        # (route, method, status) -> jumlah
+        self.requests = {}
+        # route -> jumlah response 5xx
+        self.errors = {}
+        # route -> [jumlah per bucket (tidak kumulatif) ..., +Inf, total detik]
+        self.histograms = {}
+
+
+class RequestMetrics(object):
+    """Counter request dan histogram latensi per route."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, route, method, status, duration):
+        shard = self._shard()
+        if method not in METHODS:
+            method = OTHER_METHOD
+        key = (route, method, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        if status >= 500:
+            shard.errors[route] = shard.errors.get(route, 0) + 1
+        histogram = shard.histograms.get(route)
+        if histogram is None:
+            histogram = shard.histograms[route] = [0] * (len(self.buckets) + 1) + [0.0]
+        histogram[bisect.bisect_left(self.buckets, duration)] += 1
+        histogram[-1] += duration
+
+    def _merged(self):
+        requests, errors, histograms = {}, {}, {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict() menyalin secara atomik di bawah GIL walau thread
+            # pemilik shard sedang menulis
+            for key, count in dict(shard.requests).items():
+                requests[key] = requests.get(key, 0) + count
+            for route, count in dict(shard.errors).items():
+                errors[route] = errors.get(route, 0) + count
+            for route, values in dict(shard.histograms).items():
+                values = list(values)
+                total = histograms.get(route)
+                if total is None:
+                    histograms[route] = values
+                else:
+                    histograms[route] = [a + b for a, b in zip(total, values)]
+        return requests, errors, histograms
+
+    def render(self):
+        """Semua metrik dalam format teks Prometheus."""
+        requests, errors, histograms = self._merged()
+        lines = [
+            '# HELP kantin_http_requests_total Jumlah request HTTP per route.',
+            '# TYPE kantin_http_requests_total counter',
+        ]
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append('kantin_http_requests_total{{route="{}",method="{}",status="{}"}} {}'.format(
+                _escape(route), _escape(method), status, count))
+
+        lines += [
+            '# HELP kantin_http_request_errors_total Jumlah response 5xx per route.',
+            '# TYPE kantin_http_request_errors_total counter',
+        ]
+        for route, count in sorted(errors.items()):
+            lines.append('kantin_http_request_errors_total{{route="{}"}} {}'.format(
+                _escape(route), count))
+
+        lines += [
+            '# HELP kantin_http_request_duration_seconds Latensi request per route.',
+            '# TYPE kantin_http_request_duration_seconds histogram',
+        ]
+        bounds = ['{:g}'.format(b) for b in self.buckets] + ['+Inf']
+        for route, values in sorted(histograms.items()):
+            label = _escape(route)
+            cumulative = 0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                lines.append('kantin_http_request_duration_seconds_bucket{{route="{}",le="{}"}} {}'.format(
+                    label, bound, cumulative))
+            lines.append('kantin_http_request_duration_seconds_sum{{route="{}"}} {:.6f}'.format(
+                label, values[-1]))
+            lines.append('kantin_http_request_duration_seconds_count{{route="{}"}} {}'.format(
+                label, cumulative))
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def get_metrics(registry):
+    """Metrik request dari registry, atau ``None`` bila tidak diaktifkan."""
+    return registry.get('request_metrics')
+
+
+def metrics_tween_factory(handler, registry):
+    metrics = get_metrics(registry)
+
+    def metrics_tween(request):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = handler(request)
+            status = response.status_code
+            return response
+        finally:
+            route = getattr(request, 'matched_route', None)
+            metrics.observe(route.name if route is not None else UNMATCHED,
+                            request.method, status, time.perf_counter() - started)
+
+    return metrics_tween
+
+
+def scrape_allowed(request):
+    """``True`` bila request membawa ``metrics.scrape_token`` atau dari admin."""
+    expected = request.registry.get('metrics_scrape_token')
+    token = bearer_token(request)
+    if expected and token and hmac.compare_digest(
+            token.encode('utf-8'), expected.encode('utf-8')):
+        return True
+    return bool(request.has_permission('admin'))
+
+
+def includeme(config):
+    """Pasang metrik request dan tween pencatatnya (paling luar).
+
+    Activate this setup using ``config.include('backend.metrics')``.
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('metrics.enabled', True)):
+        return
+    buckets = aslist(settings.get('metrics.buckets', '')) or DEFAULT_BUCKETS
+    config.registry['request_metrics'] = RequestMetrics(buckets)
+    config.registry['metrics_scrape_token'] = (settings.get('metrics.scrape_token') or '').strip() or None
+    config.add_tween('backend.metrics.metrics_tween_factory',
+                     under=INGRESS, over='backend.cors.cors_tween_factory')
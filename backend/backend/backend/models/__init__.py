@@ -1,20 +1,67 @@
+from pyramid.settings import asbool
 from sqlalchemy import engine_from_config
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import configure_mappers
 import zope.sqlalchemy
 
+from ..pool import DEFAULT_SLOW_WAIT, TimedQueuePool, instrument
+
 # import or define all models here to ensure they are attached to the
 # Base.metadata prior to any initialization routines
 from .mymodel import MyModel  # flake8: noqa
 from .menu import Menu, Kategori, Users, Orders, OrderDetails, Keranjang, Roles  # flake8: noqa
+from .daily_sales import DailySales  # flake8: noqa
+from .idempotency import IdempotencyKey  # flake8: noqa
 
 # run configure_mappers after defining all of the models to ensure
 # all relationships can be setup
 configure_mappers()
 
 
+# Setting pool ``sqlalchemy.*`` dan konversinya; ``engine_from_config``
+# sendiri tidak mengubah "false" menjadi boolean
+POOL_OPTIONS = {
+    'pool_size': int,
+    'max_overflow': int,
+    'pool_timeout': int,
+    'pool_use_lifo': asbool,
+    'pool_recycle': int,
+    'pool_pre_ping': asbool,
+    'query_cache_size': int,
+}
+# Hanya berlaku untuk QueuePool; dibuang bila dialek memakai pool lain
+# (mis. SingletonThreadPool untuk SQLite in-memory)
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_use_lifo')
+
+
 def get_engine(settings, prefix='sqlalchemy.'):
-    return engine_from_config(settings, prefix)
+    """Buat engine dari setting ``sqlalchemy.*``.
+
+    Setting pada :data:`POOL_OPTIONS` dikonversi lalu diteruskan ke
+    ``create_engine``. Dialek yang memakai ``QueuePool`` mendapat
+    :class:`backend.pool.TimedQueuePool` agar statistik pool tercatat.
+    """
+    url = make_url(settings[prefix + 'url'])
+    queue_pool = issubclass(url.get_dialect().get_pool_class(url), QueuePool)
+    options = {}
+    for name, convert in POOL_OPTIONS.items():
+        value = settings.get(prefix + name)
+        if value is not None and (queue_pool or name not in QUEUE_POOL_OPTIONS):
+            options[name] = convert(value)
+    if queue_pool:
+        options['poolclass'] = TimedQueuePool
+
+    config = {
+        key: value for key, value in settings.items()
+        if not key.startswith(prefix) or key[len(prefix):] not in POOL_OPTIONS
+    }
+    engine = engine_from_config(config, prefix, **options)
+    stats = instrument(engine)
+    if stats is not None:
+        stats.slow_wait = float(settings.get('sqlalchemy_pool.slow_wait', DEFAULT_SLOW_WAIT))
+    return engine
 
 
 def get_session_factory(engine):
@@ -66,8 +113,10 @@ def includeme(config):
     # use pyramid_retry to retry a request when transient exceptions occur
     config.include('pyramid_retry')
 
-    session_factory = get_session_factory(get_engine(settings))
+    engine = get_engine(settings)
+    session_factory = get_session_factory(engine)
     config.registry['dbsession_factory'] = session_factory
+    config.registry['dbengine'] = engine
 
     # make request.dbsession available for use in Pyramid
     config.add_request_method(
@@ -0,0 +1,117 @@
+from collections import defaultdict
+
+from sqlalchemy import (
+    Column,
+    Date,
+    Integer,
+    ForeignKey,
+    delete,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .meta import Base
+from .menu import Orders, OrderDetails
+
+# Pesanan dengan status ini tidak dihitung sebagai penjualan
+EXCLUDED_STATUSES = ('cancelled',)
+
+
+class DailySales(Base):
+    """Rollup penjualan harian per menu, dipelihara bersama transaksi order"""
+    __tablename__ = 'daily_sales'
+
+    tanggal = Column(Date, primary_key=True)
+    menu_id = Column(Integer, ForeignKey('menu.menu_id'), primary_key=True)
+    jumlah = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'tanggal': self.tanggal.isoformat() if self.tanggal else None,
+            'menu_id': self.menu_id,
+            'jumlah': self.jumlah,
+            'total': self.total
+        }
+
+
+def counts_as_sale(status):
+    return status not in EXCLUDED_STATUSES
+
+
+def _increment(dbsession, rows):
+    """Tambahkan ``jumlah``/``total`` ke baris rollup, buat baris bila belum ada."""
+    dialect = dbsession.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert_ = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert_(DailySales).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailySales.tanggal, DailySales.menu_id],
+            set_={
+                'jumlah': DailySales.jumlah + stmt.excluded.jumlah,
+                'total': DailySales.total + stmt.excluded.total,
+            },
+        )
+        dbsession.execute(stmt)
+        return
+
+    # Dialek lain: fallback SELECT lalu UPDATE/INSERT melalui ORM
+    for row in rows:
+        sales = dbsession.get(DailySales, (row['tanggal'], row['menu_id']))
+        if sales is None:
+            dbsession.add(DailySales(**row))
+        else:
+            sales.jumlah += row['jumlah']
+            sales.total += row['total']
+
+
+def record_order_sales(dbsession, order, details=None, sign=1):
+    """Catat (``sign=1``) atau batalkan (``sign=-1``) penjualan satu order.
+
+    ``details`` berupa daftar dict (``menu_id``, ``jumlah``, ``subtotal``),
+    mis. baris yang baru di-bulk insert; bila tidak diberikan diambil dari
+    ``order.order_details``.
+    """
+    if order.create_at is None:
+        dbsession.flush()
+        dbsession.refresh(order, ['create_at'])
+    tanggal = order.create_at.date()
+
+    if details is None:
+        details = [
+            {'menu_id': d.menu_id, 'jumlah': d.jumlah, 'subtotal': d.subtotal}
+            for d in order.order_details
+        ]
+
+    totals = defaultdict(lambda: [0, 0])
+    for detail in details:
+        totals[detail['menu_id']][0] += detail['jumlah']
+        totals[detail['menu_id']][1] += detail['subtotal']
+    if not totals:
+        return
+
+    _increment(dbsession, [
+        {'tanggal': tanggal, 'menu_id': menu_id, 'jumlah': sign * jumlah, 'total': sign * total}
+        for menu_id, (jumlah, total) in totals.items()
+    ])
+
+
+def rebuild_daily_sales(dbsession):
+    """Hitung ulang seluruh tabel rollup dari orders dan orderdetails."""
+    tanggal = func.date(Orders.create_at)
+    source = select(
+        tanggal,
+        OrderDetails.menu_id,
+        func.sum(OrderDetails.jumlah),
+        func.sum(OrderDetails.subtotal),
+    ).join(Orders, OrderDetails.order_id == Orders.order_id).where(
+        Orders.create_at.isnot(None),
+        func.coalesce(Orders.status, '').notin_(EXCLUDED_STATUSES),
+    ).group_by(tanggal, OrderDetails.menu_id)
+
+    dbsession.execute(delete(DailySales))
+    dbsession.execute(insert(DailySales).from_select(
+        ['tanggal', 'menu_id', 'jumlah', 'total'], source))
+    dbsession.flush()
@@ -0,0 +1,85 @@
+import datetime
+import hashlib
+import json
+import time
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    String,
+    Text,
+    Index,
+    delete,
+)
+
+from .meta import Base
+
+DEFAULT_TTL = 24 * 60 * 60
+CLEANUP_INTERVAL = 10 * 60
+
+# Waktu (time.monotonic) pembersihan terakhir di proses ini
+_last_cleanup = 0.0
+
+
+class IdempotencyKey(Base):
+    """Response tersimpan untuk request POST yang membawa Idempotency-Key"""
+    __tablename__ = 'idempotency_keys'
+
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    create_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+
+
+Index('ix_idempotency_keys_create_at', IdempotencyKey.create_at)
+
+
+def get_ttl(settings):
+    """Masa berlaku key (detik) dari setting ``idempotency.ttl``."""
+    return int((settings or {}).get('idempotency.ttl', DEFAULT_TTL))
+
+
+def fingerprint(payload):
+    """Hash kanonik body request, untuk mendeteksi key yang dipakai ulang."""
+    raw = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def find_response(dbsession, key, ttl):
+    """Cari key yang masih berlaku; kembalikan ``(fingerprint, response)``."""
+    row = dbsession.query(
+        IdempotencyKey.fingerprint,
+        IdempotencyKey.response,
+        IdempotencyKey.create_at,
+    ).filter(IdempotencyKey.key == key).first()
+    if row is None:
+        return None
+    if row.create_at < datetime.datetime.now() - datetime.timedelta(seconds=ttl):
+        return None
+    return row.fingerprint, json.loads(row.response)
+
+
+def store_response(dbsession, key, request_fingerprint, response, ttl):
+    """Simpan response untuk ``key`` dalam transaksi yang sedang berjalan.
+
+    Key kedaluwarsa dengan nama yang sama ditimpa, dan secara berkala
+    (paling sering tiap ``CLEANUP_INTERVAL`` detik per proses) semua key
+    yang sudah lewat TTL dihapus.
+    """
+    global _last_cleanup
+    now = datetime.datetime.now()
+    expired_before = now - datetime.timedelta(seconds=ttl)
+
+    dbsession.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.key == key, IdempotencyKey.create_at < expired_before))
+    if time.monotonic() - _last_cleanup > CLEANUP_INTERVAL:
+        _last_cleanup = time.monotonic()
+        dbsession.execute(delete(IdempotencyKey).where(
+            IdempotencyKey.create_at < expired_before))
+
+    dbsession.add(IdempotencyKey(
+        key=key,
+        fingerprint=request_fingerprint,
+        response=json.dumps(response),
+        create_at=now,
+    ))
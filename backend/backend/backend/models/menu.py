@@ -6,6 +6,7 @@ from sqlalchemy import (
     DateTime,
     Boolean,
     ForeignKey,
+    Index,
     func
 )
 from sqlalchemy.orm import relationship
@@ -63,6 +64,10 @@ class Menu(Base):
         }
 
 
+# Index untuk daftar menu per kategori (dengan filter status opsional)
+Index('ix_menu_kategori_id_status', Menu.kategori_id, Menu.status)
+
+
 class Roles(Base):
     """Model untuk roles pengguna"""
     __tablename__ = 'roles'
@@ -140,6 +145,12 @@ class Orders(Base):
         }
 
 
+# Index komposit untuk keyset pagination /api/orders (terbaru lebih dulu)
+Index('ix_orders_create_at_order_id', Orders.create_at, Orders.order_id)
+Index('ix_orders_status_create_at_order_id', Orders.status, Orders.create_at, Orders.order_id)
+Index('ix_orders_user_id_create_at_order_id', Orders.user_id, Orders.create_at, Orders.order_id)
+
+
 class OrderDetails(Base):
     """Model untuk order details"""
     __tablename__ = 'orderdetails'
@@ -165,6 +176,11 @@ class OrderDetails(Base):
         }
 
 
+# Index foreign key untuk memuat detail per pesanan dan cek pemakaian menu
+Index('ix_orderdetails_order_id', OrderDetails.order_id)
+Index('ix_orderdetails_menu_id', OrderDetails.menu_id)
+
+
 class Keranjang(Base):
     """Model untuk keranjang belanja"""
     __tablename__ = 'keranjang'
@@ -191,4 +207,8 @@ class Keranjang(Base):
             'subtotal': self.subtotal,
             'menu': self.menu.to_dict() if self.menu else None,
             'user': self.user.to_dict() if self.user else None
-        }
\ No newline at end of file
+        }
+
+# Satu baris keranjang per (user, menu); juga melayani daftar keranjang per user
+Index('ix_keranjang_user_id_menu_id', Keranjang.user_id, Keranjang.menu_id, unique=True)
+Index('ix_keranjang_menu_id', Keranjang.menu_id)
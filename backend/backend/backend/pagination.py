@@ -0,0 +1,57 @@
+"""Helper untuk pagination berbasis cursor (keyset) pada endpoint list."""
+import base64
+import datetime
+import json
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def parse_limit(params, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Ambil parameter ``limit`` dari query string, dibatasi ``maximum``."""
+    value = params.get('limit')
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('Parameter limit harus berupa angka')
+    if limit < 1:
+        raise ValueError('Parameter limit minimal 1')
+    return min(limit, maximum)
+
+
+def encode_cursor(*values):
+    """Bungkus nilai kunci baris terakhir menjadi cursor opaque."""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Kebalikan dari :func:`encode_cursor`; memvalidasi jumlah nilai."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError('Cursor tidak valid')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Cursor tidak valid')
+    return values
+
+
+def parse_datetime(value, end_of_day=False):
+    """Parse tanggal (YYYY-MM-DD) atau datetime ISO 8601.
+
+    Untuk batas akhir berupa tanggal saja (``end_of_day=True``) hasilnya
+    adalah awal hari berikutnya, sehingga dipakai dengan operator ``<``.
+    """
+    try:
+        if len(value) == 10:
+            parsed = datetime.datetime.combine(
+                datetime.date.fromisoformat(value), datetime.time())
+            if end_of_day:
+                parsed += datetime.timedelta(days=1)
+            return parsed
+        return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Format tanggal tidak valid: {value}')
@@ -0,0 +1,170 @@
+"""Hash dan verifikasi password dengan bcrypt di executor terpisah.
+
+bcrypt sengaja lambat (ratusan milidetik pada cost 12). Semua hash dan
+verifikasi dijalankan di thread pool kecil (``auth.hash_workers``) sehingga
+lonjakan registrasi/login hanya memakai sejumlah core tertentu. Thread
+request tetap terblokir menunggu hasilnya, jadi setiap hash yang berjalan
+atau antre menahan satu thread waitress. Karena itu jumlah slot (worker +
+antrean) dibatasi ``waitress.threads - 1``: bila penuh,
+:class:`PasswordHasherBusy` dilempar dan view menjawab 503 sebelum semua
+thread waitress habis, sehingga minimal satu thread tetap melayani request
+biasa.
+
+Password lama yang masih tersimpan sebagai teks biasa, atau hash dengan
+cost berbeda dari ``auth.bcrypt_rounds``, diganti dengan hash baru saat
+user berhasil login (lihat :meth:`PasswordHasher.needs_rehash`).
+
+Setting (semuanya opsional)::
+
+    auth.bcrypt_rounds = 12
+    auth.hash_workers = 2
+    auth.hash_queue = 16
+
+Tanpa ``auth.hash_queue`` panjang antrean dihitung dari ``waitress.threads``
+(diisi :func:`backend.main` dari ``[server:main] threads``).
+"""
+import concurrent.futures
+import hmac
+import threading
+
+import bcrypt
+from pyramid.httpexceptions import HTTPServiceUnavailable
+
+DEFAULT_ROUNDS = 12
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE = 16
+# bcrypt hanya memakai 72 byte pertama; bcrypt >= 5 menolak input lebih panjang
+MAX_PASSWORD_BYTES = 72
+HASH_PREFIXES = (b'$2a$', b'$2b$', b'$2y$')
+
+
+class PasswordHasherBusy(Exception):
+    """Executor hash penuh; request sebaiknya diulang nanti."""
+
+
+def busy_response():
+    """Response 503 untuk :class:`PasswordHasherBusy`."""
+    return HTTPServiceUnavailable(
+        json_body={'error': 'Server sedang sibuk, coba lagi sebentar lagi'},
+        headers={'Retry-After': '1'},
+    )
+
+
+def _encode(password):
+    return password.encode('utf-8')[:MAX_PASSWORD_BYTES]
+
+
+def _is_bcrypt(hashed):
+    return hashed.encode('ascii', 'replace').startswith(HASH_PREFIXES)
+
+
+class PasswordHasher(object):
+    """Hash/verifikasi bcrypt melalui executor dengan antrean terbatas."""
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, queue=DEFAULT_QUEUE):
+        self.rounds = rounds
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='bcrypt')
+        # Slot untuk tugas yang sedang berjalan maupun menunggu
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        # Hash pembanding untuk email yang tidak terdaftar, agar lama
+        # respons login tidak membocorkan email mana yang ada
+        self._dummy = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        """Hentikan thread executor; hasher tidak bisa dipakai lagi."""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(bcrypt.hashpw, _encode(password), salt).decode('ascii')
+
+    def verify(self, password, hashed):
+        """Cocokkan password dengan hash bcrypt (atau teks biasa lama)."""
+        if not hashed:
+            return False
+        if not _is_bcrypt(hashed):
+            return hmac.compare_digest(password.encode('utf-8'), hashed.encode('utf-8'))
+        return self._run(bcrypt.checkpw, _encode(password), hashed.encode('ascii'))
+
+    def dummy_verify(self, password):
+        """Verifikasi terhadap hash palsu, selalu ``False``."""
+        if self._dummy is None:
+            self._dummy = self.hash('dummy-password')
+        self.verify(password, self._dummy)
+        return False
+
+    def needs_rehash(self, hashed):
+        """``True`` bila ``hashed`` teks biasa atau cost-nya bukan ``rounds``."""
+        if not hashed or not _is_bcrypt(hashed):
+            return True
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+_default_hasher = None
+
+
+def get_password_hasher(registry):
+    """Password hasher dari registry, atau hasher default per proses."""
+    global _default_hasher
+    hasher = registry.get('password_hasher')
+    if hasher is None:
+        if _default_hasher is None:
+            _default_hasher = PasswordHasher()
+        hasher = _default_hasher
+    return hasher
+
+
+def hasher_capacity(workers, queue=None, threads=None):
+    """``(workers, queue)`` yang tidak menahan semua thread waitress.
+
+    ``queue`` eksplisit dipakai apa adanya. Tanpa itu, bila ``threads``
+    diketahui, worker + antrean dibatasi ``threads - 1`` (worker minimal 1).
+    """
+    if queue is not None:
+        return workers, queue
+    if threads is None:
+        return workers, DEFAULT_QUEUE
+    slots = max(threads - 1, 1)
+    workers = min(workers, slots)
+    return workers, slots - workers
+
+
+def includeme(config):
+    """Pasang password hasher ke registry.
+
+    Activate this setup using ``config.include('backend.passwords')``.
+    """
+    settings = config.get_settings()
+    queue = settings.get('auth.hash_queue')
+    threads = settings.get('waitress.threads')
+    workers, queue = hasher_capacity(
+        int(settings.get('auth.hash_workers', DEFAULT_WORKERS)),
+        queue=int(queue) if queue is not None else None,
+        threads=int(threads) if threads is not None else None,
+    )
+    config.registry['password_hasher'] = PasswordHasher(
+        rounds=int(settings.get('auth.bcrypt_rounds', DEFAULT_ROUNDS)),
+        workers=workers,
+        queue=queue,
+    )
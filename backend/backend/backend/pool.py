@@ -0,0 +1,200 @@
+"""Pool koneksi database yang mencatat statistik pemakaian.
+
+:class:`TimedQueuePool` menggantikan ``QueuePool`` bawaan SQLAlchemy dan
+mengukur berapa lama request menunggu koneksi saat semua koneksi sedang
+dipakai. Statistik (koneksi yang dipinjam, overflow, waktu tunggu, timeout)
+bisa dilihat di ``/api/_internal/pool``.
+
+Setting pool (semuanya opsional, dibaca oleh :func:`backend.models.get_engine`)::
+
+    sqlalchemy.pool_size = 10
+    sqlalchemy.max_overflow = 10
+    sqlalchemy.pool_timeout = 30
+    sqlalchemy.pool_recycle = 1800
+    sqlalchemy.pool_pre_ping = true
+    sqlalchemy.query_cache_size = 500
+    sqlalchemy_pool.slow_wait = 0.1
+
+Checkout yang menunggu lebih lama dari ``sqlalchemy_pool.slow_wait`` detik
+dicatat sebagai warning.
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+log = logging.getLogger(__name__)
+# SQLAlchemy menamai logger pool menurut kelasnya (backend.pool.TimedQueuePool),
+# sehingga ikut level DEBUG logger ``backend`` di development.ini dan
+# membanjiri log dengan checkout/checkin. Hanya warning ke atas yang perlu.
+logging.getLogger(__name__ + '.TimedQueuePool').setLevel(logging.WARNING)
+
+DEFAULT_SLOW_WAIT = 0.1
+# Checkout di bawah ini (detik) dianggap langsung mendapat koneksi
+WAIT_THRESHOLD = 0.001
+
+
+class PoolStats(object):
+    """Penghitung checkout, waktu tunggu, dan koneksi baru sebuah pool."""
+
+    def __init__(self, slow_wait=DEFAULT_SLOW_WAIT):
+        self.slow_wait = slow_wait
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def record_checkout(self, waited):
+        with self._lock:
+            self.checkouts += 1
+            if waited >= WAIT_THRESHOLD:
+                self.waits += 1
+                self.wait_total += waited
+                if waited > self.wait_max:
+                    self.wait_max = waited
+        if waited >= self.slow_wait:
+            log.warning('Menunggu koneksi database %.0f ms', waited * 1000)
+
+    def record_timeout(self, waited):
+        with self._lock:
+            self.timeouts += 1
+            self.waits += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+        log.warning('Timeout menunggu koneksi database setelah %.1f s', waited)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidate(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_total_ms': round(self.wait_total * 1000, 3),
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+            }
+
+
+class _CheckoutTimer(object):
+    """Listener ``connect``/``checkout`` yang mengukur waktu tunggu per thread.
+
+    Dipakai bersama oleh pool hasil :meth:`TimedQueuePool.recreate`, karena
+    listener ikut disalin ke pool baru lewat ``_dispatch``.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self._local = threading.local()
+
+    def start(self):
+        self._local.started = time.perf_counter()
+        self._local.created = False
+
+    def stop(self):
+        self._local.started = None
+
+    def timeout(self):
+        self.stats.record_timeout(time.perf_counter() - self._local.started)
+
+    def on_connect(self, dbapi_connection, connection_record):
+        self._local.created = True
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        started = getattr(self._local, 'started', None)
+        if started is None:
+            return
+        waited = 0.0 if self._local.created else time.perf_counter() - started
+        self.stats.record_checkout(waited)
+
+
+class TimedQueuePool(QueuePool):
+    """``QueuePool`` yang mencatat waktu tunggu checkout ke :class:`PoolStats`.
+
+    Waktu diukur dari :meth:`connect` sampai event ``checkout``. Checkout
+    yang membuka koneksi baru (event ``connect`` di thread yang sama) tidak
+    menunggu pool, jadi dicatat 0.
+    """
+
+    def __init__(self, *args, stats=None, **kw):
+        super().__init__(*args, **kw)
+        self.stats = stats if stats is not None else PoolStats()
+        self._timer = _CheckoutTimer(self.stats)
+        # Pool dari recreate() sudah membawa listener lama lewat _dispatch;
+        # mendaftarkan ulang membuat setiap checkout tercatat dua kali
+        if kw.get('_dispatch') is None:
+            event.listen(self, 'connect', self._timer.on_connect)
+            event.listen(self, 'checkout', self._timer.on_checkout)
+
+    def recreate(self):
+        # Statistik dan timer (beserta listenernya) tetap dipakai setelah
+        # engine.dispose()
+        pool = super().recreate()
+        pool.stats = self.stats
+        pool._timer = self._timer
+        return pool
+
+    def connect(self):
+        self._timer.start()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self._timer.timeout()
+            raise
+        finally:
+            self._timer.stop()
+
+    def status_dict(self):
+        return {
+            'size': self.size(),
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': self.overflow(),
+            'max_overflow': self._max_overflow,
+            'timeout': self.timeout(),
+        }
+
+
+def instrument(engine):
+    """Pasang listener event pool pada ``engine``.
+
+    Mengembalikan :class:`PoolStats` milik pool, atau ``None`` bila engine
+    tidak memakai :class:`TimedQueuePool` (mis. SQLite in-memory).
+    """
+    pool = engine.pool
+    if not isinstance(pool, TimedQueuePool):
+        return None
+    stats = pool.stats
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        stats.record_connect()
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.record_invalidate()
+
+    return stats
+
+
+def pool_status(engine):
+    """Keadaan pool ``engine`` saat ini beserta statistik kumulatifnya."""
+    pool = engine.pool
+    if isinstance(pool, TimedQueuePool):
+        return dict(pool.status_dict(), **pool.stats.stats())
+    return {'pool': type(pool).__name__, 'status': pool.status()}
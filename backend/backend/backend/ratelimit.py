@@ -0,0 +1,191 @@
+"""Pembatas laju percobaan login (token bucket) per IP dan per email.
+
+Tween :func:`ratelimit_tween_factory` memeriksa request ``POST`` ke path
+yang dibatasi sebelum routing, transaksi, maupun sesi database dibuat.
+Request yang melebihi batas dijawab 429 dengan header ``Retry-After``.
+
+Store bucket dapat diganti lewat ``ratelimit.backend`` (dotted name) selama
+menyediakan ``take(key, rate, burst)`` yang mengembalikan ``(allowed,
+retry_after)``; mis. store bersama (Redis) untuk banyak worker. Default
+:class:`InMemoryBucketStore` per proses dengan jumlah key terbatas. Bucket
+per IP dan per email memakai store terpisah, sehingga banjir email acak
+tidak bisa mendesak keluar bucket IP dari LRU (dan sebaliknya).
+
+IP klien diambil dari alamat koneksi (``REMOTE_ADDR``). ``X-Forwarded-For``
+hanya dipercaya bila koneksi datang dari ``ratelimit.trusted_proxies``;
+yang dipakai adalah hop paling kanan yang bukan proxy tepercaya, karena
+bagian kiri header bisa diisi sembarang oleh klien.
+
+Setting (semuanya opsional)::
+
+    ratelimit.enabled = true
+    ratelimit.paths = /api/login
+    ratelimit.per_ip = 20/60
+    ratelimit.per_email = 5/60
+    ratelimit.max_keys = 10000
+
+``20/60`` berarti paling banyak 20 percobaan beruntun, terisi kembali
+20 per 60 detik.
+"""
+import collections
+import ipaddress
+import math
+import threading
+import time
+
+from pyramid.httpexceptions import HTTPTooManyRequests
+from pyramid.settings import asbool, aslist
+
+DEFAULT_PATHS = '/api/login'
+DEFAULT_PER_IP = '20/60'
+DEFAULT_PER_EMAIL = '5/60'
+DEFAULT_MAX_KEYS = 10000
+
+
+class InMemoryBucketStore(object):
+    """Token bucket per key dalam satu proses, dibatasi ``max_keys`` (LRU).
+
+    Setiap ``take`` O(1): isi bucket dihitung ulang dari waktu update
+    terakhir, tanpa timer maupun pembersihan berkala.
+    """
+
+    def __init__(self, max_keys=DEFAULT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> [token tersisa, waktu update terakhir]
+        self._buckets = collections.OrderedDict()
+
+    def take(self, key, rate, burst, now=None):
+        """Ambil satu token dari bucket ``key``.
+
+        Mengembalikan ``(True, 0)`` bila diizinkan, atau ``(False, detik)``
+        sampai token berikutnya tersedia.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0
+            return False, (1 - bucket[0]) / rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+def parse_limit(value):
+    """``'20/60'`` -> ``(rate token/detik, burst)``; ``None`` bila kosong/0."""
+    if not value:
+        return None
+    count, _, seconds = str(value).partition('/')
+    count, seconds = int(count), float(seconds or 1)
+    if count <= 0:
+        return None
+    return count / seconds, count
+
+
+def parse_networks(value):
+    """Daftar IP/CIDR (dipisah spasi) -> tuple ``ip_network``."""
+    return tuple(ipaddress.ip_network(item, strict=False) for item in aslist(value or ''))
+
+
+def _trusted(addr, networks):
+    try:
+        ip = ipaddress.ip_address(addr)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(request, trusted_proxies=()):
+    """IP klien untuk key rate limit.
+
+    ``X-Forwarded-For`` dibaca dari kanan hanya bila peer langsung adalah
+    proxy tepercaya; hop tepercaya dilewati.
+    """
+    addr = request.remote_addr
+    if not trusted_proxies or not _trusted(addr, trusted_proxies):
+        return addr
+    forwarded = request.headers.get('X-Forwarded-For', '')
+    for hop in reversed([hop.strip() for hop in forwarded.split(',') if hop.strip()]):
+        addr = hop
+        if not _trusted(hop, trusted_proxies):
+            break
+    return addr
+
+
+def get_ratelimit_stores(registry):
+    """``(store per IP, store per email)`` dari registry."""
+    return registry.get('ratelimit_ip_store'), registry.get('ratelimit_email_store')
+
+
+def _login_email(request):
+    try:
+        body = request.json_body
+    except ValueError:
+        return None
+    email = body.get('email') if isinstance(body, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def _too_many(retry_after):
+    return HTTPTooManyRequests(
+        json_body={'error': 'Terlalu banyak percobaan login, coba lagi nanti'},
+        headers={'Retry-After': str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def ratelimit_tween_factory(handler, registry):
+    settings = registry.settings or {}
+    ip_store, email_store = get_ratelimit_stores(registry)
+    trusted_proxies = parse_networks(settings.get('ratelimit.trusted_proxies'))
+    paths = frozenset(aslist(settings.get('ratelimit.paths', DEFAULT_PATHS)))
+    per_ip = parse_limit(settings.get('ratelimit.per_ip', DEFAULT_PER_IP))
+    per_email = parse_limit(settings.get('ratelimit.per_email', DEFAULT_PER_EMAIL))
+
+    def ratelimit_tween(request):
+        if request.method != 'POST' or request.path not in paths:
+            return handler(request)
+
+        if per_ip is not None:
+            allowed, retry_after = ip_store.take(
+                'ip:{}:{}'.format(request.path, client_ip(request, trusted_proxies)), *per_ip)
+            if not allowed:
+                return _too_many(retry_after)
+
+        if per_email is not None:
+            email = _login_email(request)
+            if email is not None:
+                allowed, retry_after = email_store.take(
+                    'email:{}:{}'.format(request.path, email), *per_email)
+                if not allowed:
+                    return _too_many(retry_after)
+
+        return handler(request)
+
+    return ratelimit_tween
+
+
+def includeme(config):
+    """Pasang store bucket dan tween pembatas laju login.
+
+    Activate this setup using ``config.include('backend.ratelimit')``.
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('ratelimit.enabled', True)):
+        return
+    store_factory = config.maybe_dotted(
+        settings.get('ratelimit.backend', InMemoryBucketStore))
+    max_keys = int(settings.get('ratelimit.max_keys', DEFAULT_MAX_KEYS))
+    config.registry['ratelimit_ip_store'] = store_factory(max_keys=max_keys)
+    config.registry['ratelimit_email_store'] = store_factory(max_keys=max_keys)
+    config.add_tween('backend.ratelimit.ratelimit_tween_factory',
+                     under='backend.cors.cors_tween_factory')
@@ -0,0 +1,99 @@
+"""Renderer JSON cepat untuk semua view ``renderer='json'``.
+
+Memakai ``orjson`` bila terpasang (``pip install -e ".[fast]"``) dan
+kembali ke modul ``json`` bawaan bila tidak. ``datetime``/``date`` ditulis
+dalam format ISO 8601 oleh kedua backend, sehingga serializer model
+(:mod:`backend.serializers`) tidak perlu mengubahnya menjadi string.
+Backend dapat dipilih lewat setting ``json_renderer.backend``
+(``auto``, ``orjson`` atau ``json``).
+"""
+import datetime
+import decimal
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(obj):
+    """Tipe yang tidak dikenal backend JSON secara langsung."""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if hasattr(obj, '__json__'):
+        return obj.__json__(None)
+    raise TypeError('Object of type {} is not JSON serializable'.format(
+        type(obj).__name__))
+
+
+def _orjson_dumps(value):
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _json_dumps(value):
+    return json.dumps(
+        value, default=_default, ensure_ascii=False, separators=(',', ':'),
+    ).encode('utf-8')
+
+
+def get_dumps(backend='auto'):
+    """Fungsi ``value -> bytes`` untuk backend yang diminta."""
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'json'
+    if backend == 'orjson':
+        if orjson is None:
+            raise ValueError('json_renderer.backend = orjson, tetapi orjson tidak terpasang')
+        return _orjson_dumps
+    if backend == 'json':
+        return _json_dumps
+    raise ValueError('json_renderer.backend tidak dikenal: {}'.format(backend))
+
+
+class FastJSON(object):
+    """Renderer factory pengganti renderer ``json`` bawaan Pyramid."""
+
+    def __init__(self, backend='auto'):
+        self.dumps = get_dumps(backend)
+
+    def __call__(self, info):
+        dumps = self.dumps
+
+        def _render(value, system):
+            request = system.get('request')
+            if request is not None:
+                response = request.response
+                if response.content_type == response.default_content_type:
+                    response.content_type = 'application/json'
+            return dumps(value)
+
+        return _render
+
+
+def get_json_dumps(registry):
+    """Fungsi ``value -> bytes`` milik renderer ``json`` aplikasi.
+
+    Dipakai kode yang menulis JSON sendiri (cache katalog, export) agar
+    encoder-nya sama dengan response API. Bila renderer belum dipasang
+    (mis. view dipanggil langsung dalam test), backend dibaca dari setting
+    ``json_renderer.backend``.
+    """
+    dumps = registry.get('json_dumps')
+    if dumps is None:
+        settings = getattr(registry, 'settings', None) or {}
+        dumps = get_dumps(settings.get('json_renderer.backend', 'auto'))
+    return dumps
+
+
+def includeme(config):
+    """Ganti renderer ``json`` dengan :class:`FastJSON`.
+
+    Activate this setup using ``config.include('backend.renderers')``.
+    """
+    settings = config.get_settings()
+    renderer = FastJSON(settings.get('json_renderer.backend', 'auto'))
+    config.registry['json_dumps'] = renderer.dumps
+    config.add_renderer('json', renderer)
+
@@ -0,0 +1,219 @@
+"""Cache role dan permission per proses untuk pengecekan otorisasi.
+
+Tabel ``roles`` hampir tidak pernah berubah, jadi seluruh isinya dimuat
+sekali (saat startup, atau saat pertama dipakai bila database belum
+siap) ke :class:`RoleRegistry`. Setelahnya nama role dan permission cukup
+dicari di dict.
+
+Cache dimuat ulang bila:
+
+- ada perubahan baris ``Roles`` lewat ORM yang sudah di-commit di proses
+  ini (lihat :func:`_mark_roles_changed`), atau
+- sudah lewat ``roles.refresh_interval`` detik, untuk perubahan dari
+  proses atau script lain.
+
+Kolom ``permissions`` berisi daftar dipisah koma (mis. ``read,order``);
+``all`` berarti semua permission.
+
+Role dan status aktif tiap user disimpan di :class:`UserRoleCache`, sehingga
+token tidak perlu dipercaya sampai kedaluwarsa: perubahan role, user yang
+dinonaktifkan atau dihapus lewat ORM langsung berlaku setelah commit, dan
+perubahan dari proses lain paling lama setelah ``roles.user_ttl`` detik.
+"""
+import collections
+import logging
+import threading
+import time
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .models import Roles, Users
+
+log = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_INTERVAL = 300
+DEFAULT_USER_TTL = 30
+DEFAULT_USER_MAX_ENTRIES = 10000
+
+Role = collections.namedtuple('Role', ['role_id', 'role_name', 'permissions'])
+UserRole = collections.namedtuple('UserRole', ['role_id', 'is_active'])
+
+# Naik setiap kali transaksi yang mengubah Roles di-commit
+_generation = 0
+
+# Semua UserRoleCache di proses ini, dikosongkan per user setelah commit
+_user_caches = weakref.WeakSet()
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_roles_changed(session, flush_context):
+    for obj in (session.new, session.dirty, session.deleted):
+        for o in obj:
+            if isinstance(o, Roles):
+                session.info['roles_changed'] = True
+            elif isinstance(o, Users) and o.user_id is not None:
+                session.info.setdefault('users_changed', set()).add(o.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_generation(session):
+    global _generation
+    if session.info.pop('roles_changed', False):
+        _generation += 1
+    user_ids = session.info.pop('users_changed', None)
+    if user_ids:
+        for cache in list(_user_caches):
+            cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('roles_changed', None)
+    session.info.pop('users_changed', None)
+
+
+def parse_permissions(value):
+    return frozenset(p.strip().lower() for p in (value or '').split(',') if p.strip())
+
+
+class RoleRegistry(object):
+    """Semua role (id -> :data:`Role`) dari tabel ``roles``."""
+
+    def __init__(self, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._roles = {}
+        self._generation = None
+        self._loaded_at = 0.0
+
+    def stale(self):
+        return (self._generation != _generation
+                or time.monotonic() - self._loaded_at > self.refresh_interval)
+
+    def load(self, dbsession):
+        generation = _generation
+        rows = dbsession.query(Roles.role_id, Roles.role_name, Roles.permissions).all()
+        roles = {
+            role_id: Role(role_id, role_name, parse_permissions(permissions))
+            for role_id, role_name, permissions in rows
+        }
+        with self._lock:
+            self._roles = roles
+            self._generation = generation
+            self._loaded_at = time.monotonic()
+
+    def get(self, role_id, dbsession):
+        """Role dengan ``role_id``; dimuat ulang dari ``dbsession`` bila basi."""
+        if self.stale():
+            self.load(dbsession)
+        return self._roles.get(role_id)
+
+    def principals(self, role_id, dbsession):
+        """Principal ACL untuk role: ``role:<nama>`` dan ``perm:<permission>``."""
+        role = self.get(role_id, dbsession)
+        if role is None:
+            return []
+        return ['role:' + role.role_name.lower()] + [
+            'perm:' + permission for permission in sorted(role.permissions)]
+
+
+class UserRoleCache(object):
+    """Role dan status aktif per user (LRU dengan TTL).
+
+    Dipakai security policy untuk setiap request bertoken, sehingga role
+    di token tidak dipercaya begitu saja.
+    """
+
+    def __init__(self, ttl=DEFAULT_USER_TTL, max_entries=DEFAULT_USER_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        _user_caches.add(self)
+
+    def get(self, user_id, dbsession):
+        """:data:`UserRole` milik ``user_id``, atau ``None`` bila user tidak ada."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        row = dbsession.query(Users.role_id, Users.is_active).filter(
+            Users.user_id == user_id).first()
+        user = UserRole(row.role_id, bool(row.is_active)) if row is not None else None
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+
+_default_registry = None
+_default_user_roles = None
+
+
+def get_role_registry(registry):
+    """Cache role dari registry.
+
+    Bila belum dikonfigurasi (mis. view dipanggil langsung dalam test),
+    dipakai registry per proses yang selalu memuat ulang, karena database
+    di baliknya bisa berganti.
+    """
+    global _default_registry
+    roles = registry.get('role_registry')
+    if roles is None:
+        if _default_registry is None:
+            _default_registry = RoleRegistry(refresh_interval=0)
+        roles = _default_registry
+    return roles
+
+
+def get_user_roles(registry):
+    """Cache role per user dari registry.
+
+    Bila belum dikonfigurasi dipakai cache per proses tanpa TTL, sama
+    seperti :func:`get_role_registry`.
+    """
+    global _default_user_roles
+    users = registry.get('user_roles')
+    if users is None:
+        if _default_user_roles is None:
+            _default_user_roles = UserRoleCache(ttl=0)
+        users = _default_user_roles
+    return users
+
+
+def includeme(config):
+    """Pasang cache role ke registry dan muat isinya bila database siap.
+
+    Harus di-include setelah ``backend.models``.
+
+    Activate this setup using ``config.include('backend.roles')``.
+    """
+    settings = config.get_settings()
+    roles = RoleRegistry(
+        refresh_interval=float(settings.get('roles.refresh_interval', DEFAULT_REFRESH_INTERVAL)))
+    config.registry['role_registry'] = roles
+    config.registry['user_roles'] = UserRoleCache(
+        ttl=float(settings.get('roles.user_ttl', DEFAULT_USER_TTL)),
+        max_entries=int(settings.get('roles.user_max_entries', DEFAULT_USER_MAX_ENTRIES)))
+
+    dbsession = config.registry['dbsession_factory']()
+    try:
+        roles.load(dbsession)
+    except SQLAlchemyError as e:
+        # Mis. tabel belum dibuat; dimuat saat pertama dipakai
+        log.debug('Cache role belum dimuat saat startup: %s', e)
+    finally:
+        dbsession.close()
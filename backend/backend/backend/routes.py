@@ -12,10 +12,11 @@ def includeme(config):
     
     # Menu routes
     config.add_route('menu_list', '/api/menu', request_method='GET')
+    config.add_route('menu_search', '/api/menu/search', request_method='GET')
     config.add_route('menu_detail', '/api/menu/{id}', request_method='GET')
     config.add_route('menu_add', '/api/menu', request_method='POST')
     config.add_route('menu_update', '/api/menu/{id}', request_method='PUT')
-    config.add_route('menu_delete', '/api/menu/{id}', request_method=['DELETE', 'OPTIONS'])
+    config.add_route('menu_delete', '/api/menu/{id}', request_method='DELETE')
     
     # Kategori routes
     config.add_route('kategori_list', '/api/kategori', request_method='GET')
@@ -33,6 +34,8 @@ def includeme(config):
     
     # Order routes
     config.add_route('order_list', '/api/orders', request_method='GET')
+    config.add_route('order_stream', '/api/orders/stream', request_method='GET')
+    config.add_route('order_export', '/api/orders/export', request_method='GET')
     config.add_route('order_detail', '/api/orders/{id}', request_method='GET')
     config.add_route('order_create', '/api/orders', request_method='POST')
     config.add_route('order_update', '/api/orders/{id}', request_method='PUT')
@@ -52,6 +55,14 @@ def includeme(config):
     # Role routes
     config.add_route('role_list', '/api/roles', request_method='GET')
     
+    # Admin routes
+    config.add_route('admin_dashboard', '/api/admin/dashboard', request_method='GET')
+    
+    # Internal monitoring routes
+    config.add_route('internal_cache', '/api/_internal/cache', request_method='GET')
+    config.add_route('internal_pool', '/api/_internal/pool', request_method='GET')
+    config.add_route('metrics', '/metrics', request_method='GET')
+    
     # Special routes
     config.add_route('menu_by_kategori', '/api/menu/kategori/{kategori_id}', request_method='GET')
     config.add_route('user_orders', '/api/users/{user_id}/orders', request_method='GET')
@@ -0,0 +1,44 @@
+import argparse
+import sys
+
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy.exc import OperationalError
+
+from .. import models
+from ..models.daily_sales import rebuild_daily_sales
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Hitung ulang tabel rollup daily_sales dari data order.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+
+    try:
+        with env['request'].tm:
+            dbsession = env['request'].dbsession
+            rebuild_daily_sales(dbsession)
+            rows = dbsession.query(models.DailySales).count()
+        print(f'Rollup daily_sales berhasil dibangun ulang ({rows} baris)')
+    except OperationalError:
+        print('''
+Pyramid is having a problem using your SQL database.
+
+Make sure your database server is running, the daily_sales
+table exists (run "alembic upgrade head") and your connection
+string in development.ini is correctly configured.
+''')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import sys
+import threading
+import time
+
+from ..passwords import DEFAULT_QUEUE, DEFAULT_WORKERS, PasswordHasher, PasswordHasherBusy
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Ukur throughput verifikasi password (login) untuk beberapa cost bcrypt.',
+    )
+    parser.add_argument(
+        '--rounds', type=int, nargs='+', default=[10, 11, 12],
+        help='Cost bcrypt yang diukur (default: 10 11 12)',
+    )
+    parser.add_argument(
+        '--workers', type=int, default=DEFAULT_WORKERS,
+        help='Jumlah thread hash (auth.hash_workers)',
+    )
+    parser.add_argument(
+        '--threads', type=int, default=8,
+        help='Jumlah thread request login bersamaan (mis. thread waitress)',
+    )
+    parser.add_argument(
+        '--logins', type=int, default=32,
+        help='Jumlah login per cost',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def bench(rounds, workers, threads, logins):
+    """Jalankan ``logins`` verifikasi dari ``threads`` thread.
+
+    Mengembalikan ``(login per detik, latensi rata-rata, jumlah 503)``.
+    """
+    # Executor ditutup setiap cost agar thread bcrypt tidak menumpuk
+    with PasswordHasher(rounds=rounds, workers=workers,
+                        queue=max(DEFAULT_QUEUE, threads)) as hasher:
+        return _bench(hasher, threads, logins)
+
+
+def _bench(hasher, threads, logins):
+    hashed = hasher.hash('password123')
+    lock = threading.Lock()
+    remaining = [logins]
+    latencies = []
+    busy = [0]
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            started = time.perf_counter()
+            try:
+                hasher.verify('password123', hashed)
+            except PasswordHasherBusy:
+                with lock:
+                    busy[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, sum(latencies) / max(len(latencies), 1), busy[0]
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    print('workers={} threads={} logins={}'.format(args.workers, args.threads, args.logins))
+    print('{:>6} {:>12} {:>14} {:>6}'.format('cost', 'login/detik', 'latensi (ms)', '503'))
+    for rounds in args.rounds:
+        rate, latency, busy = bench(rounds, args.workers, args.threads, args.logins)
+        print('{:>6} {:>12.1f} {:>14.1f} {:>6}'.format(rounds, rate, latency * 1000, busy))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+"""Indeks pencarian menu in-memory (dipakai oleh /api/menu/search).
+
+Nama dan deskripsi menu dipecah menjadi token yang sudah dinormalisasi
+(huruf kecil, tanpa diakritik) lalu disimpan dalam inverted index. Query
+dicocokkan per token secara persis, sebagai awalan (prefix) atau dengan
+toleransi salah ketik melalui indeks trigram, lalu hasilnya diberi skor.
+
+Indeks dibangun dari database saat pencarian pertama dan diperbarui per
+menu oleh view yang mengubah menu (setelah commit). Perubahan dari proses
+lain (mis. script ``update_menu_status``) terlihat setelah indeks dibangun
+ulang, paling lama ``menu_search.rebuild_interval`` detik; pembangunan
+ulang berjalan di latar belakang sementara pencarian memakai indeks lama.
+"""
+import bisect
+import collections
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+from sqlalchemy.orm import joinedload
+
+from .models import Menu
+
+log = logging.getLogger(__name__)
+
+DEFAULT_REBUILD_INTERVAL = 300
+DEFAULT_LIMIT = 20
+
+# Bobot field: kecocokan di nama lebih penting daripada di deskripsi
+FIELD_WEIGHTS = (('nama_menu', 2.0), ('deskripsi', 1.0))
+
+# Skor per jenis kecocokan token
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+
+# Batas kandidat trigram yang diperiksa dengan edit distance per token
+MAX_FUZZY_CANDIDATES = 32
+
+_token_re = re.compile(r'\w+', re.UNICODE)
+
+
+def fold(text):
+    """Huruf kecil tanpa diakritik, mis. ``'Sâté Ayam'`` -> ``'sate ayam'``."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return _token_re.findall(fold(text))
+
+
+def trigrams(token):
+    padded = '$' + token + '$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(token):
+    """Jumlah salah ketik yang ditoleransi menurut panjang token."""
+    if len(token) < 4:
+        return 0
+    if len(token) < 8:
+        return 1
+    return 2
+
+
+def edit_distance(a, b, limit):
+    """Jarak Damerau-Levenshtein (transposisi bersebelahan), berhenti lebih
+    awal dan mengembalikan ``limit + 1`` bila melebihi ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class MenuSearchIndex(object):
+    """Inverted index menu yang aman dipakai dari banyak thread.
+
+    Pembangunan ulang berkala hanya dijalankan satu thread dalam satu waktu
+    dan, bila ``ensure_built`` diberi session factory, di thread latar
+    belakang; selama itu pencarian tetap memakai indeks lama. Indeks baru
+    dibangun terpisah lalu ditukar sekaligus, dan perubahan per menu yang
+    masuk selama pembangunan diterapkan ulang sesudahnya.
+    """
+
+    def __init__(self, rebuild_interval=DEFAULT_REBUILD_INTERVAL):
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        # Dipegang selama pembangunan pertama; thread lain menunggu di sini
+        self._initial_build = threading.Lock()
+        self._built_at = None
+        self._rebuilding = False
+        # menu_id -> payload (None = dihapus) selama pembangunan ulang
+        self._pending = None
+        self._rebuild_thread = None
+        self._clear()
+
+    def _clear(self):
+        # menu_id -> (payload, set token, nama menu yang sudah dinormalisasi)
+        self._documents = {}
+        # token -> {menu_id: bobot field tertinggi}
+        self._postings = {}
+        # token yang terurut, untuk pencarian awalan dengan bisect
+        self._vocabulary = []
+        # trigram -> set token
+        self._trigrams = collections.defaultdict(set)
+
+    def is_stale(self):
+        with self._lock:
+            return (self._built_at is None
+                    or time.monotonic() - self._built_at > self.rebuild_interval)
+
+    def rebuild(self, menus):
+        """Bangun ulang seluruh indeks dari daftar objek ``Menu``."""
+        fresh = MenuSearchIndex()
+        for menu in menus:
+            fresh._add(menu.menu_id, menu.to_dict())
+        with self._lock:
+            self._documents, self._postings = fresh._documents, fresh._postings
+            self._vocabulary, self._trigrams = fresh._vocabulary, fresh._trigrams
+            for menu_id, payload in (self._pending or {}).items():
+                self._remove(menu_id)
+                if payload is not None:
+                    self._add(menu_id, payload)
+            self._pending = None
+            self._rebuilding = False
+            self._built_at = time.monotonic()
+
+    def ensure_built(self, dbsession, session_factory=None):
+        """Bangun indeks dari database bila belum ada atau sudah kedaluwarsa.
+
+        Pembangunan pertama dijalankan di thread ini (thread lain menunggu
+        hasilnya). Setelah itu, bila ``session_factory`` diberikan, indeks
+        dibangun ulang di thread latar belakang dengan session sendiri dan
+        request tidak menunggu.
+        """
+        with self._lock:
+            if not self.is_stale():
+                return
+            initial = self._built_at is None
+            if self._rebuilding:
+                if not initial:
+                    return
+                claimed = False
+            else:
+                claimed = self._rebuilding = True
+                self._pending = {}
+                if initial:
+                    self._initial_build.acquire()
+
+        if not claimed:
+            # Pembangunan pertama sedang berjalan di thread lain
+            with self._initial_build:
+                return
+
+        if not initial and session_factory is not None:
+            self._rebuild_thread = threading.Thread(
+                target=self._rebuild_with, args=(session_factory,),
+                name='menu-search-rebuild', daemon=True)
+            self._rebuild_thread.start()
+            return
+
+        try:
+            self._rebuild_from(dbsession)
+        finally:
+            if initial:
+                self._initial_build.release()
+
+    def _rebuild_from(self, dbsession):
+        try:
+            menus = dbsession.query(Menu).options(joinedload(Menu.kategori)).all()
+            self.rebuild(menus)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+                self._rebuilding = False
+            raise
+
+    def _rebuild_with(self, session_factory):
+        dbsession = session_factory()
+        try:
+            self._rebuild_from(dbsession)
+        except Exception:
+            # Tetap pakai indeks lama; dicoba lagi setelah rebuild_interval
+            log.exception('Gagal membangun ulang indeks pencarian menu')
+            with self._lock:
+                self._built_at = time.monotonic()
+        finally:
+            dbsession.close()
+
+    def update(self, menu_id, payload):
+        """Tambah atau ganti satu menu; ``payload`` berupa ``Menu.to_dict()``."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending[menu_id] = payload
+            self._remove(menu_id)
+            self._add(menu_id, payload)
+
+    def remove(self, menu_id):
+        with self._lock:
+            if self._pending is not None:
+                self._pending[menu_id] = None
+            self._remove(menu_id)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _add(self, menu_id, payload):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(payload.get(field)):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+                for gram in trigrams(token):
+                    self._trigrams[gram].add(token)
+            postings[menu_id] = weight
+        nama = ' '.join(tokenize(payload.get('nama_menu')))
+        self._documents[menu_id] = (payload, frozenset(weights), nama)
+
+    def _remove(self, menu_id):
+        document = self._documents.pop(menu_id, None)
+        if document is None:
+            return
+        for token in document[1]:
+            postings = self._postings[token]
+            del postings[menu_id]
+            if postings:
+                continue
+            del self._postings[token]
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+            for gram in trigrams(token):
+                tokens = self._trigrams[gram]
+                tokens.discard(token)
+                if not tokens:
+                    del self._trigrams[gram]
+
+    def _prefix_tokens(self, prefix):
+        vocabulary = self._vocabulary
+        i = bisect.bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            yield vocabulary[i]
+            i += 1
+
+    def _fuzzy_tokens(self, token):
+        limit = max_typos(token)
+        if not limit:
+            return
+        counts = collections.Counter()
+        for gram in trigrams(token):
+            counts.update(self._trigrams.get(gram, ()))
+        for candidate, _ in counts.most_common(MAX_FUZZY_CANDIDATES):
+            distance = edit_distance(token, candidate, limit)
+            if distance <= limit:
+                yield candidate, distance
+
+    def _match(self, token):
+        """Skor tiap menu untuk satu token query: ``{menu_id: skor}``."""
+        scores = {}
+
+        def add(candidate, score):
+            for menu_id, weight in self._postings[candidate].items():
+                value = score * weight
+                if scores.get(menu_id, 0) < value:
+                    scores[menu_id] = value
+
+        if token in self._postings:
+            add(token, EXACT_SCORE)
+        if len(token) > 1:
+            for candidate in self._prefix_tokens(token):
+                if candidate != token:
+                    add(candidate, PREFIX_SCORE * len(token) / len(candidate))
+        for candidate, distance in self._fuzzy_tokens(token):
+            if candidate != token:
+                add(candidate, FUZZY_SCORE / (1 + distance))
+        return scores
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Cari menu yang cocok dengan semua token ``query``.
+
+        Mengembalikan ``(total, [payload, ...])`` yang terurut dari skor
+        tertinggi.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0, []
+
+        with self._lock:
+            scores = None
+            for token in tokens:
+                matches = self._match(token)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {
+                        menu_id: score + matches[menu_id]
+                        for menu_id, score in scores.items() if menu_id in matches
+                    }
+                if not scores:
+                    return 0, []
+
+            # Bonus bila nama menu diawali oleh query lengkap
+            phrase = ' '.join(tokens)
+            for menu_id in scores:
+                if self._documents[menu_id][2].startswith(phrase):
+                    scores[menu_id] += 1.0
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return len(ranked), [self._documents[menu_id][0] for menu_id, _ in ranked[:limit]]
+
+
+def get_menu_search(registry):
+    """Indeks pencarian dari registry, atau ``None`` bila tidak dikonfigurasi."""
+    return registry.get('menu_search')
+
+
+def search_menus(request, query, limit=DEFAULT_LIMIT):
+    """Cari menu memakai indeks di registry.
+
+    Tanpa indeks terpasang (mis. di test) indeks sementara dibangun dari
+    database untuk request ini saja.
+    """
+    index = get_menu_search(request.registry)
+    if index is None:
+        index = MenuSearchIndex()
+    index.ensure_built(request.dbsession, request.registry.get('dbsession_factory'))
+    return index.search(query, limit)
+
+
+def _after_commit(request, apply):
+    index = get_menu_search(request.registry)
+    if index is None:
+        return
+    tm = getattr(request, 'tm', None)
+    if tm is None:
+        apply(index)
+        return
+
+    def hook(success):
+        if success:
+            apply(index)
+
+    tm.get().addAfterCommitHook(hook)
+
+
+def reindex_menu(request, menu):
+    """Perbarui satu menu di indeks setelah transaksi request di-commit."""
+    menu_id, payload = menu.menu_id, menu.to_dict()
+    _after_commit(request, lambda index: index.update(menu_id, payload))
+
+
+def unindex_menu(request, menu_id):
+    """Hapus satu menu dari indeks setelah transaksi request di-commit."""
+    _after_commit(request, lambda index: index.remove(menu_id))
+
+
+def includeme(config):
+    """Pasang indeks pencarian menu ke registry.
+
+    Activate this setup using ``config.include('backend.search')``.
+    """
+    settings = config.get_settings()
+    config.registry['menu_search'] = MenuSearchIndex(
+        rebuild_interval=float(settings.get(
+            'menu_search.rebuild_interval', DEFAULT_REBUILD_INTERVAL)),
+    )
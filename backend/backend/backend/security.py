@@ -0,0 +1,220 @@
+"""Autentikasi token bertanda tangan (JWT HS256) tanpa state di server.
+
+``POST /api/login`` menerbitkan token berisi ``sub`` (user_id), ``rid``
+(role_id), ``role`` dan ``exp``. Klien mengirimnya sebagai
+``Authorization: Bearer <token>``. Token yang sudah pernah diverifikasi disimpan di cache LRU sampai
+kedaluwarsa, sehingga request berikutnya tidak perlu memeriksa tanda
+tangan lagi maupun membaca database.
+
+Setting::
+
+    auth.secret = <string acak minimal 32 byte, sama di semua worker>
+    auth.token_ttl = 86400
+    auth.verified_cache_size = 1024
+
+Secret juga bisa diberikan lewat environment ``KANTIN_AUTH_SECRET`` (lebih
+diutamakan daripada ``auth.secret``) agar tidak perlu ditulis di file ini.
+Aplikasi menolak start bila secret kosong, lebih pendek dari 32 byte, atau
+masih berupa placeholder contoh.
+
+Principal yang dihasilkan: ``Everyone``, ``Authenticated``, ``user:<id>``,
+serta ``role:<nama role>`` dan ``perm:<permission>`` dari cache role
+(:mod:`backend.roles`), sehingga pengecekan izin tidak membaca database.
+Role diambil dari role user saat ini (cache per user), bukan dari klaim
+``rid`` di token; token milik user yang sudah dihapus atau dinonaktifkan
+dianggap tidak valid.
+"""
+import collections
+import os
+import secrets
+import threading
+import time
+
+import jwt
+from pyramid.authorization import (
+    ACLHelper,
+    ALL_PERMISSIONS,
+    Allow,
+    Authenticated,
+    Everyone,
+)
+
+from .roles import get_role_registry, get_user_roles
+
+ALGORITHM = 'HS256'
+DEFAULT_TOKEN_TTL = 86400
+DEFAULT_CACHE_SIZE = 1024
+SECRET_ENV = 'KANTIN_AUTH_SECRET'
+MIN_SECRET_BYTES = 32
+# Contoh dari production.ini versi lama; tidak boleh dipakai sungguhan
+PLACEHOLDER_SECRETS = frozenset(['GANTI-DENGAN-STRING-ACAK-PANJANG'])
+
+
+class TokenService(object):
+    """Terbitkan dan verifikasi token, dengan cache token terverifikasi."""
+
+    def __init__(self, secret, ttl=DEFAULT_TOKEN_TTL, cache_size=DEFAULT_CACHE_SIZE):
+        self.secret = secret
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._verified = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def issue(self, user_id, role_id=None, role_name=None):
+        now = int(time.time())
+        claims = {'sub': str(user_id), 'rid': role_id, 'role': role_name,
+                  'iat': now, 'exp': now + self.ttl}
+        return jwt.encode(claims, self.secret, algorithm=ALGORITHM)
+
+    def verify(self, token):
+        """Klaim token yang valid, atau ``None``."""
+        now = time.time()
+        with self._lock:
+            claims = self._verified.get(token)
+            if claims is not None:
+                if claims['exp'] > now:
+                    self._verified.move_to_end(token)
+                    self.hits += 1
+                    return claims
+                del self._verified[token]
+            self.misses += 1
+
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=[ALGORITHM],
+                                options={'require': ['sub', 'exp']})
+        except jwt.InvalidTokenError:
+            return None
+
+        with self._lock:
+            self._verified[token] = claims
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return claims
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._verified),
+                'max_entries': self.cache_size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_default_service = None
+
+
+def get_token_service(registry):
+    """Token service dari registry.
+
+    Bila belum dikonfigurasi (mis. view dipanggil langsung dalam test),
+    dipakai service per proses dengan secret acak.
+    """
+    global _default_service
+    service = registry.get('token_service')
+    if service is None:
+        if _default_service is None:
+            _default_service = TokenService(secrets.token_urlsafe(32))
+        service = _default_service
+    return service
+
+
+def bearer_token(request):
+    header = request.headers.get('Authorization')
+    if not header:
+        return None
+    scheme, _, token = header.partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    return token.strip()
+
+
+class RootFactory(object):
+    """Context default dengan ACL dasar untuk semua route."""
+
+    __acl__ = [
+        (Allow, 'perm:all', ALL_PERMISSIONS),
+        (Allow, 'role:admin', ALL_PERMISSIONS),
+        (Allow, Authenticated, 'authenticated'),
+    ]
+
+    def __init__(self, request):
+        pass
+
+
+class TokenSecurityPolicy(object):
+    """Security policy Pyramid berbasis token Bearer dan ACL context."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.helper = ACLHelper()
+
+    def identity(self, request):
+        """Klaim token dengan ``rid`` diganti role user saat ini, atau ``None``."""
+        token = bearer_token(request)
+        claims = self.tokens.verify(token) if token else None
+        if claims is None:
+            return None
+        user = get_user_roles(request.registry).get(int(claims['sub']), request.dbsession)
+        if user is None or not user.is_active:
+            return None
+        return dict(claims, rid=user.role_id)
+
+    def authenticated_userid(self, request):
+        identity = request.identity
+        return int(identity['sub']) if identity is not None else None
+
+    def effective_principals(self, request):
+        principals = [Everyone]
+        identity = request.identity
+        if identity is not None:
+            principals += [Authenticated, 'user:' + identity['sub']]
+            if identity['rid'] is not None:
+                principals += get_role_registry(request.registry).principals(
+                    identity['rid'], request.dbsession)
+        return principals
+
+    def permits(self, request, context, permission):
+        return self.helper.permits(context, self.effective_principals(request), permission)
+
+    def remember(self, request, userid, **kw):
+        # Token dikirim di body response login; tidak ada cookie
+        return []
+
+    def forget(self, request, **kw):
+        return []
+
+
+def load_secret(settings, environ=os.environ):
+    """Secret penanda tangan token dari environment atau setting.
+
+    ``ValueError`` bila secret tidak diatur, terlalu pendek, atau masih
+    placeholder; token dengan secret lemah bisa dipalsukan siapa saja.
+    """
+    secret = environ.get(SECRET_ENV) or settings.get('auth.secret') or ''
+    secret = secret.strip()
+    if not secret:
+        raise ValueError('auth.secret (atau env {}) wajib diatur'.format(SECRET_ENV))
+    if secret in PLACEHOLDER_SECRETS:
+        raise ValueError('auth.secret masih berupa placeholder; ganti dengan string acak')
+    if len(secret.encode('utf-8')) < MIN_SECRET_BYTES:
+        raise ValueError('auth.secret minimal {} byte'.format(MIN_SECRET_BYTES))
+    return secret
+
+
+def includeme(config):
+    """Pasang token service, security policy dan root factory.
+
+    Activate this setup using ``config.include('backend.security')``.
+    """
+    settings = config.get_settings()
+    tokens = TokenService(
+        load_secret(settings),
+        ttl=int(settings.get('auth.token_ttl', DEFAULT_TOKEN_TTL)),
+        cache_size=int(settings.get('auth.verified_cache_size', DEFAULT_CACHE_SIZE)),
+    )
+    config.registry['token_service'] = tokens
+    config.set_security_policy(TokenSecurityPolicy(tokens))
+    config.set_root_factory(RootFactory)
@@ -0,0 +1,218 @@
+"""Serializer model untuk response JSON.
+
+Hasilnya sama dengan ``to_dict()`` pada model, tetapi:
+
+* kolom dibaca sekaligus dengan ``operator.attrgetter`` yang disusun sekali
+  per kombinasi kolom, bukan dict literal per objek;
+* ``datetime`` dibiarkan apa adanya dan ditulis oleh renderer JSON
+  (:mod:`backend.renderers`);
+* sub-objek yang sama (mis. Kategori, Role atau Menu yang muncul di banyak
+  order) hanya diserialisasi sekali per :class:`Serializer`.
+
+View daftar menerima parameter ``fields`` dan ``expand`` (lihat
+:class:`Fieldset`) untuk memilih kolom model utama dan relasi yang ikut
+dikirim.
+
+Gunakan satu :class:`Serializer` per response. Dict hasil memo dipakai
+bersama, jadi jangan diubah setelah dibuat.
+"""
+import functools
+from operator import attrgetter
+
+from sqlalchemy.orm import load_only
+
+# Kolom tiap model sesuai urutan ``to_dict()``; kolom pertama adalah
+# primary key dan selalu disertakan
+COLUMNS = {
+    'kategori': ('kategori_id', 'nama_kategori', 'icon'),
+    'role': ('role_id', 'role_name', 'permissions'),
+    'user': ('user_id', 'role_id', 'nama_lengkap', 'email', 'is_active', 'create_at'),
+    'menu': ('menu_id', 'kategori_id', 'nama_menu', 'deskripsi', 'harga', 'image', 'status',
+             'create_at'),
+    'order_detail': ('detail_id', 'order_id', 'menu_id', 'jumlah', 'subtotal'),
+    'order': ('order_id', 'user_id', 'status', 'total_harga', 'pembayaran', 'create_at'),
+    'keranjang': ('keranjang_id', 'order_id', 'menu_id', 'user_id', 'jumlah', 'subtotal'),
+}
+
+# Relasi yang dapat dipilih dengan ``expand`` untuk setiap model utama
+RELATIONS = {
+    'kategori': (),
+    'user': ('role',),
+    'menu': ('kategori',),
+    'order': ('user', 'order_details', 'items', 'menu', 'kategori'),
+    'keranjang': ('menu', 'kategori', 'user', 'role'),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(fields):
+    """Fungsi ``obj -> dict`` untuk tuple kolom ``fields``."""
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return lambda obj: {fields[0]: getter(obj)}
+    return lambda obj: dict(zip(fields, getter(obj)))
+
+
+_user_summary = _compile(('user_id', 'nama_lengkap', 'email'))
+
+
+def _split(value):
+    return [name for name in (part.strip() for part in value.split(',')) if name]
+
+
+class Fieldset(object):
+    """Pilihan kolom dan relasi dari query string untuk satu model utama.
+
+    ``fields`` (dipisah koma) membatasi kolom model utama; primary key
+    selalu disertakan. ``expand`` memilih relasi yang ikut diserialisasi:
+    tanpa parameter ini semua relasi disertakan seperti ``to_dict()``,
+    sedangkan ``expand=`` kosong berarti tanpa relasi.
+    """
+
+    def __init__(self, name, fields=None, expand=None):
+        self.name = name
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_params(cls, params, name):
+        """Baca ``fields``/``expand``; raise ``ValueError`` bila tidak dikenal."""
+        columns = COLUMNS[name]
+        fields = None
+        if params.get('fields'):
+            requested = _split(params['fields'])
+            unknown = [f for f in requested if f not in columns]
+            if unknown:
+                raise ValueError('Field tidak dikenal: {}'.format(', '.join(unknown)))
+            fields = tuple(f for f in columns if f == columns[0] or f in requested)
+
+        expand = None
+        if 'expand' in params:
+            expand = frozenset(_split(params['expand']))
+            unknown = sorted(expand.difference(RELATIONS[name]))
+            if unknown:
+                raise ValueError('Relasi tidak dikenal: {}'.format(', '.join(unknown)))
+        return cls(name, fields, expand)
+
+    @property
+    def key(self):
+        """Bagian cache key yang membedakan response per pilihan ini."""
+        return (self.fields, self.expand)
+
+    def expands(self, relation):
+        return self.expand is None or relation in self.expand
+
+    def load_only(self, query, model, *required):
+        """Batasi ``query`` ke kolom terpilih (plus kolom ``required``)."""
+        if self.fields is None:
+            return query
+        names = self.fields + tuple(name for name in required if name not in self.fields)
+        return query.options(load_only(*[getattr(model, name) for name in names]))
+
+    def serializer(self):
+        return Serializer(fields={self.name: self.fields}, expand=self.expand)
+
+
+class Serializer(object):
+    """Serializer model dengan memo sub-objek untuk satu response.
+
+    ``fields`` memetakan nama model ke tuple kolom yang dikirim dan
+    ``expand`` membatasi relasi yang diikutkan (``None`` berarti semua).
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self._memo = {}
+        self._expand = expand
+        self._fields = {
+            name: (fields or {}).get(name) or columns
+            for name, columns in COLUMNS.items()
+        }
+        self._columns = {name: _compile(names) for name, names in self._fields.items()}
+
+    def _expands(self, relation):
+        return self._expand is None or relation in self._expand
+
+    def _memoized(self, obj, pk, build):
+        if obj is None:
+            return None
+        key = (type(obj), getattr(obj, pk))
+        result = self._memo.get(key)
+        if result is None:
+            result = self._memo[key] = build(obj)
+        return result
+
+    def kategori(self, kategori):
+        return self._memoized(kategori, 'kategori_id', self._columns['kategori'])
+
+    def role(self, role):
+        return self._memoized(role, 'role_id', self._columns['role'])
+
+    def user(self, user):
+        return self._memoized(user, 'user_id', self._build_user)
+
+    def _build_user(self, user):
+        data = self._columns['user'](user)
+        if self._expands('role'):
+            data['role'] = self.role(user.role)
+        return data
+
+    def menu(self, menu):
+        return self._memoized(menu, 'menu_id', self._build_menu)
+
+    def _build_menu(self, menu):
+        data = self._columns['menu'](menu)
+        if self._expands('kategori'):
+            data['kategori'] = self.kategori(menu.kategori)
+        return data
+
+    def order_detail(self, detail):
+        data = self._columns['order_detail'](detail)
+        if self._expands('menu'):
+            data['menu'] = self.menu(detail.menu)
+        return data
+
+    def order(self, order):
+        """Sama dengan ``Orders.to_dict()``."""
+        data = self._columns['order'](order)
+        if self._expands('user'):
+            data['user'] = self.user(order.user)
+        if self._expands('order_details'):
+            data['order_details'] = [self.order_detail(d) for d in order.order_details]
+        return data
+
+    def order_summary(self, order):
+        """Format daftar pesanan: data order dengan ringkasan user dan item."""
+        data = self._columns['order'](order)
+        if self._expands('user'):
+            data['user'] = _user_summary(order.user)
+        if self._expands('order_details'):
+            data['order_details'] = [self.order_detail(d) for d in order.order_details]
+        if self._expands('items'):
+            data['items'] = [
+                {
+                    'menu_id': d.menu.menu_id,
+                    'nama_menu': d.menu.nama_menu,
+                    'jumlah': d.jumlah,
+                    'harga': d.menu.harga,
+                    'subtotal': d.subtotal,
+                }
+                for d in order.order_details if d.menu is not None
+            ]
+        return data
+
+    def keranjang(self, keranjang):
+        data = self._columns['keranjang'](keranjang)
+        if self._expands('menu'):
+            data['menu'] = self.menu(keranjang.menu)
+        if self._expands('user'):
+            data['user'] = self.user(keranjang.user)
+        return data
+
+    def project(self, name, data):
+        """Terapkan pilihan kolom dan relasi pada dict ``to_dict()`` yang sudah
+        jadi (mis. hasil indeks pencarian)."""
+        result = {field: data.get(field) for field in self._fields[name]}
+        for relation in RELATIONS[name]:
+            if relation in data and self._expands(relation):
+                result[relation] = data[relation]
+        return result
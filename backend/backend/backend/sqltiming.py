@@ -0,0 +1,125 @@
+"""Jumlah query dan waktu database per request.
+
+Listener ``before_cursor_execute``/``after_cursor_execute`` pada engine
+mencatat setiap statement ke :class:`QueryStats` milik request yang sedang
+berjalan di thread tersebut. Tween :func:`sqltiming_tween_factory` membuat
+penghitung itu, lalu menambahkan header ``Server-Timing`` dan log per
+request.
+
+Setting (semuanya opsional)::
+
+    sqltiming.enabled = true
+    sqltiming.server_timing = true
+    sqltiming.slow_query = 0.2
+    sqltiming.query_warning = 30
+
+Statement yang lebih lama dari ``slow_query`` detik dicatat sebagai warning
+beserta nama route-nya. Request dengan jumlah statement minimal
+``query_warning`` juga dicatat sebagai warning (tanda N+1); request lain
+dicatat pada level DEBUG.
+"""
+import logging
+import threading
+import time
+
+from pyramid.settings import asbool
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY = 0.2
+DEFAULT_QUERY_WARNING = 30
+
+_local = threading.local()
+
+
+class QueryStats(object):
+    """Jumlah statement dan total waktu database satu request."""
+
+    __slots__ = ('request', 'count', 'duration')
+
+    def __init__(self, request=None):
+        self.request = request
+        self.count = 0
+        self.duration = 0.0
+
+    @property
+    def route(self):
+        # matched_route baru tersedia setelah routing, jadi dibaca saat dipakai
+        if self.request is None:
+            return '-'
+        route = getattr(self.request, 'matched_route', None)
+        return route.name if route is not None else self.request.path
+
+
+def current_stats():
+    """:class:`QueryStats` request yang sedang berjalan di thread ini."""
+    return getattr(_local, 'stats', None)
+
+
+def install(engine, slow_query=DEFAULT_SLOW_QUERY):
+    """Pasang listener pencatat statement pada ``engine``."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('sqltiming_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['sqltiming_start'].pop()
+        stats = current_stats()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+        if elapsed >= slow_query:
+            log.warning(
+                'Query lambat %.1f ms route=%s: %s',
+                elapsed * 1000,
+                stats.route if stats is not None else '-',
+                ' '.join(statement.split())[:1000],
+            )
+
+
+def sqltiming_tween_factory(handler, registry):
+    settings = registry.settings or {}
+    server_timing = asbool(settings.get('sqltiming.server_timing', True))
+    query_warning = int(settings.get('sqltiming.query_warning', DEFAULT_QUERY_WARNING))
+
+    def sqltiming_tween(request):
+        stats = _local.stats = QueryStats(request)
+        started = time.perf_counter()
+        try:
+            response = handler(request)
+        finally:
+            _local.stats = None
+        total = time.perf_counter() - started
+
+        if server_timing:
+            response.headers['Server-Timing'] = (
+                'db;dur={:.1f};desc="{} queries", app;dur={:.1f}'.format(
+                    stats.duration * 1000, stats.count, total * 1000))
+        level = logging.WARNING if stats.count >= query_warning else logging.DEBUG
+        if log.isEnabledFor(level):
+            log.log(level, 'route=%s status=%s queries=%d db_ms=%.1f total_ms=%.1f',
+                    stats.route, response.status_code, stats.count,
+                    stats.duration * 1000, total * 1000)
+        return response
+
+    return sqltiming_tween
+
+
+def includeme(config):
+    """Pasang listener statement pada engine dan tween pencatatnya.
+
+    Harus di-include setelah ``backend.models`` (membutuhkan engine di
+    registry).
+
+    Activate this setup using ``config.include('backend.sqltiming')``.
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('sqltiming.enabled', True)):
+        return
+    install(config.registry['dbengine'],
+            slow_query=float(settings.get('sqltiming.slow_query', DEFAULT_SLOW_QUERY)))
+    config.add_tween('backend.sqltiming.sqltiming_tween_factory',
+                     under='backend.cors.cors_tween_factory')
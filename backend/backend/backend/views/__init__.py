@@ -1,2 +1,38 @@
-from . import auth
-from . import kantin
+from pyramid.settings import asbool
+
+# Modul view API, didaftarkan di semua mode
+API_VIEWS = (
+    '.auth',
+    '.kantin',
+    '.dashboard',
+    '.stream',
+    '.export',
+    '.internal',
+)
+
+# View halaman template (jinja2), hanya di luar mode production
+TEMPLATE_VIEWS = (
+    '.default',
+    '.notfound',
+)
+
+
+def includeme(config):
+    """Daftarkan view secara eksplisit per modul.
+
+    Hanya modul di atas yang di-scan (bukan seluruh package ``backend``),
+    sehingga script, test, dan pshell tidak ikut di-import saat worker
+    start. Dalam mode production (``backend.production = true``) view
+    template dilewati dan halaman 404 dijawab dengan JSON.
+
+    Activate this setup using ``config.include('backend.views')``.
+    """
+    production = asbool(config.get_settings().get('backend.production', False))
+    for module in API_VIEWS:
+        config.scan(module)
+    if production:
+        from .notfound import notfound_json
+        config.add_notfound_view(notfound_json, renderer='json')
+    else:
+        for module in TEMPLATE_VIEWS:
+            config.scan(module)
@@ -1,8 +1,10 @@
-from pyramid.view import view_config
+from pyramid.view import forbidden_view_config, view_config
 from pyramid.httpexceptions import HTTPBadRequest, HTTPNotFound
-from ..models import Users, Roles
+from ..models import Users
+from ..roles import get_role_registry
+from ..passwords import PasswordHasherBusy, busy_response, get_password_hasher
+from ..security import get_token_service
 from pyramid.response import Response
-import uuid
 
 @view_config(route_name='login', request_method='POST', renderer='json')
 def login(request):
@@ -19,20 +21,28 @@ def login(request):
         dbsession = request.dbsession
         user = dbsession.query(Users).filter_by(email=json_data['email']).first()
         
+        hasher = get_password_hasher(request.registry)
         if not user:
+            hasher.dummy_verify(json_data['password'])
             return HTTPBadRequest(json_body={'error': 'Email atau password salah'})
             
-        if user.password != json_data['password']:
+        if not hasher.verify(json_data['password'], user.password):
             return HTTPBadRequest(json_body={'error': 'Email atau password salah'})
             
         if not user.is_active:
             return HTTPBadRequest(json_body={'error': 'Akun tidak aktif'})
+
+        # Password teks biasa lama atau cost bcrypt yang sudah diubah
+        # diganti hash baru selagi password asli tersedia
+        if hasher.needs_rehash(user.password):
+            user.password = hasher.hash(json_data['password'])
             
-        # Get user role
-        role = dbsession.query(Roles).get(user.role_id)
+        # Role dari cache role (tanpa query)
+        role = get_role_registry(request.registry).get(user.role_id, dbsession)
         
-        # Generate a secure token
-        token = str(uuid.uuid4())
+        # Token bertanda tangan berisi user_id dan role, berlaku auth.token_ttl detik
+        token = get_token_service(request.registry).issue(
+            user.user_id, user.role_id, role.role_name if role else None)
         
         # Create response with token
         response = {
@@ -48,23 +58,28 @@ def login(request):
         
         return response
 
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         print("Error in login:", str(e))
         import traceback
         traceback.print_exc()
         return HTTPBadRequest(json_body={'error': str(e)})
 
-@view_config(route_name='user_delete', request_method='DELETE', renderer='json')
+@forbidden_view_config(renderer='json')
+def forbidden(request):
+    """View untuk request tanpa token valid (401) atau tanpa izin (403)"""
+    if request.identity is None:
+        request.response.status = 401
+        request.response.headers['WWW-Authenticate'] = 'Bearer'
+        return {'error': 'Login diperlukan'}
+    request.response.status = 403
+    return {'error': 'Akses ditolak'}
+
+@view_config(route_name='user_delete', request_method='DELETE', renderer='json', permission='admin')
 def user_delete(request):
     """View untuk menghapus user"""
     try:
-        # Add CORS headers
-        request.response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'DELETE',
-            'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization'
-        })
-
         user_id = request.matchdict['id']
         dbsession = request.dbsession
         
@@ -75,7 +90,8 @@ def user_delete(request):
             return HTTPNotFound(json_body={'error': 'User tidak ditemukan'})
             
         # Cek apakah user adalah admin
-        if user.role.role_name.lower() == 'admin':
+        role = get_role_registry(request.registry).get(user.role_id, dbsession)
+        if role is not None and role.role_name.lower() == 'admin':
             return HTTPBadRequest(json_body={'error': 'Tidak dapat menghapus user admin'})
         
         # Hapus user
@@ -88,29 +104,10 @@ def user_delete(request):
         print("Error deleting user:", str(e))
         return HTTPBadRequest(json_body={'error': str(e)})
 
-@view_config(route_name='user_delete', request_method='OPTIONS', renderer='json')
-def user_delete_options(request):
-    """Handle OPTIONS request for CORS preflight"""
-    response = request.response
-    response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'DELETE',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization',
-        'Access-Control-Max-Age': '3600'
-    })
-    return {}
-
-@view_config(route_name='user_update', request_method='PUT', renderer='json')
+@view_config(route_name='user_update', request_method='PUT', renderer='json', permission='admin')
 def user_update(request):
     """View untuk mengupdate user"""
     try:
-        # Add CORS headers
-        request.response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'PUT',
-            'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization'
-        })
-
         user_id = request.matchdict['id']
         json_data = request.json_body
         dbsession = request.dbsession
@@ -146,14 +143,3 @@ def user_update(request):
         print("Error updating user:", str(e))
         return HTTPBadRequest(json_body={'error': str(e)})
 
-@view_config(route_name='user_update', request_method='OPTIONS', renderer='json')
-def user_update_options(request):
-    """Handle OPTIONS request for CORS preflight"""
-    response = request.response
-    response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'PUT',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization',
-        'Access-Control-Max-Age': '3600'
-    })
-    return {}
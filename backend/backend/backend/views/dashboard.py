@@ -0,0 +1,158 @@
+import datetime
+from pyramid.view import view_config
+from pyramid.httpexceptions import HTTPBadRequest
+from sqlalchemy import func, distinct
+
+from ..models import Menu, Users, Orders, OrderDetails, DailySales
+from ..models.daily_sales import EXCLUDED_STATUSES, counts_as_sale
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+DEFAULT_TOP = 5
+MAX_TOP = 20
+RECENT_ORDERS = 5
+
+
+def _date_key(value):
+    # SQLite mengembalikan string 'YYYY-MM-DD', PostgreSQL objek date
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _int_param(request, name, default, maximum):
+    value = request.params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f'Parameter {name} harus berupa angka')
+    if value < 1:
+        raise ValueError(f'Parameter {name} minimal 1')
+    return min(value, maximum)
+
+
+@view_config(route_name='admin_dashboard', renderer='json', permission='admin')
+def admin_dashboard(request):
+    """View ringkasan dashboard admin
+
+    Semua angka dihitung di database dengan agregasi (COUNT/SUM ... GROUP BY),
+    sehingga ukuran response tetap kecil berapa pun jumlah datanya.
+    Parameter opsional: ``days`` (rentang grafik penghasilan) dan ``top``
+    (jumlah menu terlaris).
+    """
+    try:
+        days = _int_param(request, 'days', DEFAULT_DAYS, MAX_DAYS)
+        top = _int_param(request, 'top', DEFAULT_TOP, MAX_TOP)
+    except ValueError as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+
+    dbsession = request.dbsession
+    since = datetime.datetime.combine(
+        datetime.date.today() - datetime.timedelta(days=days - 1), datetime.time())
+
+    # Total pesanan per status; penghasilan tanpa pesanan yang dibatalkan,
+    # sama dengan rollup DailySales
+    orders_by_status = {}
+    total_pesanan = 0
+    total_penghasilan = 0
+    rows = dbsession.query(
+        Orders.status,
+        func.count(Orders.order_id),
+        func.coalesce(func.sum(Orders.total_harga), 0),
+    ).group_by(Orders.status).all()
+    for status, count, revenue in rows:
+        orders_by_status[status or 'unknown'] = count
+        total_pesanan += count
+        if counts_as_sale(status):
+            total_penghasilan += revenue
+
+    is_sale = func.coalesce(Orders.status, '').notin_(EXCLUDED_STATUSES)
+
+    # Jumlah pesanan per hari (tanpa yang dibatalkan) untuk jumlah_pesanan
+    tanggal = func.date(Orders.create_at)
+    orders_per_day = {
+        _date_key(day): count
+        for day, count in dbsession.query(tanggal, func.count(Orders.order_id))
+        .filter(Orders.create_at >= since, is_sale)
+        .group_by(tanggal).all()
+    }
+
+    # Penghasilan dan porsi terjual per hari dalam rentang ``days`` dari
+    # tabel rollup (order yang dibatalkan tidak dihitung)
+    revenue_per_day = [
+        {
+            'tanggal': day.isoformat(),
+            'total': total,
+            'jumlah_pesanan': orders_per_day.get(day.isoformat(), 0),
+            'jumlah': jumlah,
+        }
+        for day, total, jumlah in dbsession.query(
+            DailySales.tanggal,
+            func.sum(DailySales.total),
+            func.sum(DailySales.jumlah),
+        ).filter(DailySales.tanggal >= since.date())
+        .group_by(DailySales.tanggal).order_by(DailySales.tanggal).all()
+    ]
+
+    # Menu terlaris berdasarkan jumlah porsi terjual
+    terjual = func.sum(OrderDetails.jumlah)
+    top_menus = [
+        {'menu_id': menu_id, 'nama_menu': nama_menu, 'jumlah': jumlah, 'total': total}
+        for menu_id, nama_menu, jumlah, total in dbsession.query(
+            Menu.menu_id,
+            Menu.nama_menu,
+            terjual,
+            func.sum(OrderDetails.subtotal),
+        ).join(OrderDetails, OrderDetails.menu_id == Menu.menu_id)
+        .join(Orders, OrderDetails.order_id == Orders.order_id)
+        .filter(is_sale)
+        .group_by(Menu.menu_id, Menu.nama_menu)
+        .order_by(terjual.desc(), Menu.menu_id)
+        .limit(top).all()
+    ]
+
+    total_pengguna, pengguna_aktif = dbsession.query(
+        func.count(Users.user_id),
+        func.count(Users.user_id).filter(Users.is_active.is_(True)),
+    ).one()
+    pembeli_aktif = dbsession.query(
+        func.count(distinct(Orders.user_id))
+    ).filter(Orders.create_at >= since).scalar()
+    total_menu = dbsession.query(func.count(Menu.menu_id)).scalar()
+
+    recent_orders = [
+        {
+            'order_id': order_id,
+            'nama_lengkap': nama_lengkap,
+            'email': email,
+            'status': status,
+            'total_harga': total_harga,
+            'create_at': create_at.isoformat() if create_at else None,
+        }
+        for order_id, nama_lengkap, email, status, total_harga, create_at in dbsession.query(
+            Orders.order_id,
+            Users.nama_lengkap,
+            Users.email,
+            Orders.status,
+            Orders.total_harga,
+            Orders.create_at,
+        ).join(Users, Orders.user_id == Users.user_id)
+        .order_by(Orders.create_at.desc().nulls_last(), Orders.order_id.desc())
+        .limit(RECENT_ORDERS).all()
+    ]
+
+    return {
+        'success': True,
+        'totals': {
+            'penghasilan': total_penghasilan,
+            'pesanan': total_pesanan,
+            'menu': total_menu,
+            'pengguna': total_pengguna,
+            'pengguna_aktif': pengguna_aktif,
+            'pembeli_aktif': pembeli_aktif,
+        },
+        'orders_by_status': orders_by_status,
+        'revenue_per_day': revenue_per_day,
+        'top_menus': top_menus,
+        'recent_orders': recent_orders,
+    }
@@ -0,0 +1,136 @@
+import csv
+import datetime
+import io
+
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.response import Response
+from pyramid.view import view_config
+from sqlalchemy import func, select
+
+from ..models import Orders, OrderDetails, Users
+from ..pagination import parse_datetime
+from ..renderers import get_json_dumps
+
+DEFAULT_BATCH_SIZE = 1000
+
+COLUMNS = (
+    'order_id',
+    'create_at',
+    'status',
+    'pembayaran',
+    'total_harga',
+    'jumlah_item',
+    'user_id',
+    'nama_lengkap',
+    'email',
+)
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _export_query(params):
+    """Query kolom export, urut kronologis, dengan filter dari ``params``."""
+    jumlah_item = select(func.coalesce(func.sum(OrderDetails.jumlah), 0)).where(
+        OrderDetails.order_id == Orders.order_id).scalar_subquery()
+    query = select(
+        Orders.order_id,
+        Orders.create_at,
+        Orders.status,
+        Orders.pembayaran,
+        Orders.total_harga,
+        jumlah_item.label('jumlah_item'),
+        Users.user_id,
+        Users.nama_lengkap,
+        Users.email,
+    ).join(Users, Orders.user_id == Users.user_id)
+
+    if params.get('status'):
+        query = query.where(Orders.status == params['status'])
+    if params.get('date_from'):
+        query = query.where(Orders.create_at >= parse_datetime(params['date_from']))
+    if params.get('date_to'):
+        query = query.where(Orders.create_at < parse_datetime(params['date_to'], end_of_day=True))
+    return query.order_by(Orders.create_at, Orders.order_id)
+
+
+def _csv_chunks(partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode('utf-8')
+
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            row = list(row)
+            if row[1] is not None:
+                row[1] = row[1].isoformat()
+            writer.writerow(row)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_chunks(partitions, dumps):
+    for rows in partitions:
+        yield b''.join(dumps(dict(zip(COLUMNS, row))) + b'\n' for row in rows)
+
+
+def _stream(session_factory, query, fmt, batch_size, dumps):
+    """Jalankan query dengan sesi sendiri dan kirim hasilnya per batch.
+
+    Sesi request (``request.dbsession``) sudah ditutup pyramid_tm sebelum
+    ``app_iter`` dibaca server, sehingga export memakai sesi terpisah yang
+    ditutup setelah baris terakhir terkirim atau saat klien memutus koneksi.
+    Baris NDJSON ditulis dengan ``dumps`` milik renderer aplikasi.
+    """
+    dbsession = session_factory()
+    try:
+        def partitions():
+            result = dbsession.execute(
+                query.execution_options(yield_per=batch_size))
+            yield from result.partitions()
+
+        if fmt == 'csv':
+            yield from _csv_chunks(partitions())
+        else:
+            yield from _ndjson_chunks(partitions(), dumps)
+    finally:
+        dbsession.close()
+
+
+@view_config(route_name='order_export', request_method='GET', permission='admin')
+def order_export(request):
+    """View untuk mengunduh semua order sebagai CSV atau NDJSON
+
+    Parameter: ``format`` (``csv`` atau ``ndjson``, default ``csv``) serta
+    filter opsional ``status``, ``date_from`` dan ``date_to``. Baris dibaca
+    dari database per ``orders.export.batch_size`` (server-side cursor) dan
+    langsung dikirim, sehingga memori tetap konstan berapa pun jumlah order.
+    """
+    settings = request.registry.settings or {}
+    params = request.params
+
+    fmt = params.get('format', 'csv')
+    if fmt not in FORMATS:
+        return HTTPBadRequest(json_body={'error': 'Parameter format harus csv atau ndjson'})
+    try:
+        query = _export_query(params)
+    except ValueError as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+
+    filename = 'orders-{}.{}'.format(datetime.date.today().strftime('%Y%m%d'), fmt)
+    response = Response(content_type=FORMATS[fmt], charset='utf-8')
+    response.content_disposition = 'attachment; filename="{}"'.format(filename)
+    response.cache_control = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.app_iter = _stream(
+        request.registry['dbsession_factory'],
+        query,
+        fmt,
+        int(settings.get('orders.export.batch_size', DEFAULT_BATCH_SIZE)),
+        get_json_dumps(request.registry),
+    )
+    return response
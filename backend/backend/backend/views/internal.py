@@ -0,0 +1,41 @@
+from pyramid.httpexceptions import HTTPForbidden, HTTPNotFound
+from pyramid.response import Response
+from pyramid.view import view_config
+
+from ..cache import get_catalog_cache
+from ..cart import get_cart_store
+from ..metrics import CONTENT_TYPE, get_metrics, scrape_allowed
+from ..pool import pool_status
+
+
+@view_config(route_name='internal_cache', renderer='json', permission='admin')
+def internal_cache(request):
+    """View statistik cache katalog (hit, miss, eviction) dan tier memori
+    keranjang untuk monitoring"""
+    cache = get_catalog_cache(request.registry)
+    carts = get_cart_store(request.registry)
+    return {
+        'catalog_cache': cache.stats() if cache is not None else None,
+        'cart_store': carts.stats() if carts is not None else None,
+    }
+
+
+@view_config(route_name='internal_pool', renderer='json', permission='admin')
+def internal_pool(request):
+    """View keadaan pool koneksi database (checked-out, overflow, waktu tunggu)"""
+    engine = request.registry.get('dbengine')
+    return {'pool': pool_status(engine) if engine is not None else None}
+
+
+@view_config(route_name='metrics')
+def metrics(request):
+    """View metrik request per route dalam format teks Prometheus.
+
+    Scraper mengirim ``Authorization: Bearer <metrics.scrape_token>``; admin
+    yang login juga boleh membacanya."""
+    request_metrics = get_metrics(request.registry)
+    if request_metrics is None:
+        raise HTTPNotFound()
+    if not scrape_allowed(request):
+        raise HTTPForbidden()
+    return Response(request_metrics.render(), content_type=CONTENT_TYPE, charset='utf-8')
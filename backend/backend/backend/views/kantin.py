@@ -1,24 +1,79 @@
 import datetime
+import logging
 from pyramid.view import view_config
 from pyramid.httpexceptions import (
     HTTPFound,
     HTTPNotFound,
     HTTPBadRequest,
+    HTTPConflict,
+    HTTPForbidden,
+    HTTPUnprocessableEntity,
 )
 from ..models import Menu, Kategori, Users, Orders, OrderDetails, Keranjang, Roles
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from ..models.daily_sales import counts_as_sale, record_order_sales
+from ..models.idempotency import find_response, fingerprint, get_ttl, store_response
+from ..cart import (
+    cart_cleared,
+    cart_lines,
+    clear_cart,
+    line_removed,
+    lines_changed,
+    lookup_prices,
+    menu_price_changed,
+    remove_item,
+    set_quantity,
+    upsert_items,
+)
+from ..cache import cached_catalog, conditional_response, invalidate_catalog
+from ..search import DEFAULT_LIMIT as SEARCH_LIMIT, reindex_menu, search_menus, unindex_menu
+from ..events import ORDER_CREATED, ORDER_DELETED, ORDER_STATUS_CHANGED, publish_after_commit
+from ..passwords import PasswordHasherBusy, busy_response, get_password_hasher
+from ..pagination import (
+    DEFAULT_LIMIT as DEFAULT_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    parse_datetime,
+    parse_limit,
+)
+from ..serializers import Fieldset, Serializer
+from sqlalchemy.orm import sessionmaker, joinedload, selectinload
+from sqlalchemy import create_engine, and_, insert, or_
+from sqlalchemy.exc import IntegrityError
 from pyramid.response import Response
-import transaction
+
+log = logging.getLogger(__name__)
+
+
+def _menu_query(dbsession, fieldset):
+    """Query menu yang hanya memuat kolom dan relasi yang diminta"""
+    query = fieldset.load_only(dbsession.query(Menu), Menu)
+    if fieldset.expands('kategori'):
+        query = query.options(joinedload(Menu.kategori))
+    return query
 
 
 # ===== MENU VIEWS =====
 @view_config(route_name='menu_list', renderer='json')
 def menu_list(request):
-    """View untuk menampilkan daftar menu"""
+    """View untuk menampilkan daftar menu
+
+    Parameter opsional ``fields`` dan ``expand`` memilih kolom dan relasi
+    yang dikirim, mis. ``?fields=nama_menu,harga&expand=``.
+    """
+    try:
+        fieldset = Fieldset.from_params(request.params, 'menu')
+    except ValueError as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+    
     dbsession = request.dbsession
-    menus = dbsession.query(Menu).all()
-    return {'menus': [m.to_dict() for m in menus]}
+    
+    def load():
+        menus = _menu_query(dbsession, fieldset).all()
+        serializer = fieldset.serializer()
+        return {'menus': [serializer.menu(m) for m in menus]}
+    
+    body, etag = cached_catalog(request, ('menu_list',) + fieldset.key, load)
+    return conditional_response(request, body, etag)
 
 
 @view_config(route_name='menu_detail', renderer='json')
@@ -26,15 +81,99 @@ def menu_detail(request):
     """View untuk melihat detail satu menu"""
     dbsession = request.dbsession
     menu_id = request.matchdict['id']
-    menu = dbsession.query(Menu).filter_by(menu_id=menu_id).first()
     
-    if menu is None:
+    def load():
+        menu = dbsession.query(Menu).filter_by(menu_id=menu_id).first()
+        return {'menu': Serializer().menu(menu)} if menu is not None else None
+    
+    body, etag = cached_catalog(request, ('menu_detail', menu_id), load)
+    if body is None:
         return HTTPNotFound(json_body={'error': 'Menu tidak ditemukan'})
     
-    return {'menu': menu.to_dict()}
+    return conditional_response(request, body, etag)
+
 
+@view_config(route_name='menu_search', renderer='json')
+def menu_search(request):
+    """View untuk mencari menu berdasarkan nama dan deskripsi
 
-@view_config(route_name='menu_add', request_method='POST', renderer='json')
+    Pencarian tidak peka huruf besar/kecil maupun diakritik, menoleransi
+    salah ketik, dan hasilnya diurutkan dari yang paling relevan.
+    """
+    query = (request.params.get('q') or '').strip()
+    if not query:
+        return HTTPBadRequest(json_body={'error': 'Parameter q wajib diisi'})
+    
+    try:
+        limit = parse_limit(request.params, default=SEARCH_LIMIT)
+        fieldset = Fieldset.from_params(request.params, 'menu')
+    except ValueError as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+    
+    total, menus = search_menus(request, query, limit)
+    serializer = fieldset.serializer()
+    menus = [serializer.project('menu', m) for m in menus]
+    return {'menus': menus, 'total': total}
+
+
+@view_config(route_name='menu_by_kategori', renderer='json')
+def menu_by_kategori(request):
+    """View untuk menampilkan menu dalam satu kategori
+
+    Parameter opsional: ``status`` (mis. ``tersedia``) serta ``limit`` dan
+    ``cursor`` untuk pagination berdasarkan ``menu_id``.
+    """
+    try:
+        kategori_id = int(request.matchdict['kategori_id'])
+    except ValueError:
+        return HTTPBadRequest(json_body={'error': 'ID kategori tidak valid'})
+    
+    try:
+        params = request.params
+        limit = parse_limit(params)
+        fieldset = Fieldset.from_params(request.params, 'menu')
+        status = params.get('status') or None
+        after_id = None
+        if params.get('cursor'):
+            after_id, = decode_cursor(params['cursor'], 1)
+            if not isinstance(after_id, int):
+                raise ValueError('Cursor tidak valid')
+    except ValueError as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+    
+    dbsession = request.dbsession
+    
+    def load():
+        query = _menu_query(dbsession, fieldset).filter(Menu.kategori_id == kategori_id)
+        if status:
+            query = query.filter(Menu.status == status)
+        if after_id is not None:
+            query = query.filter(Menu.menu_id > after_id)
+        menus = query.order_by(Menu.menu_id).limit(limit + 1).all()
+        
+        if not menus and after_id is None:
+            if dbsession.query(Kategori.kategori_id).filter_by(kategori_id=kategori_id).first() is None:
+                return None
+        
+        next_cursor = None
+        if len(menus) > limit:
+            menus = menus[:limit]
+            next_cursor = encode_cursor(menus[-1].menu_id)
+        serializer = fieldset.serializer()
+        return {'menus': [serializer.menu(m) for m in menus], 'next_cursor': next_cursor}
+    
+    body, etag = cached_catalog(
+        request,
+        ('menu_by_kategori', kategori_id, status, limit, after_id) + fieldset.key,
+        load,
+    )
+    if body is None:
+        return HTTPNotFound(json_body={'error': 'Kategori tidak ditemukan'})
+    
+    return conditional_response(request, body, etag)
+
+
+@view_config(route_name='menu_add', request_method='POST', renderer='json', permission='admin')
 def menu_add(request):
     """View untuk menambahkan menu baru"""
     try:
@@ -69,6 +208,8 @@ def menu_add(request):
         
         dbsession.add(menu)
         dbsession.flush()
+        invalidate_catalog(request)
+        reindex_menu(request, menu)
         
         return {'success': True, 'menu': menu.to_dict()}
             
@@ -76,16 +217,9 @@ def menu_add(request):
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='menu_delete', request_method='DELETE', renderer='json')
+@view_config(route_name='menu_delete', request_method='DELETE', renderer='json', permission='admin')
 def menu_delete(request):
     """View untuk menghapus menu"""
-    # Add CORS headers
-    request.response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'DELETE',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept'
-    })
-    
     try:
         menu_id = request.matchdict['id']
         dbsession = request.dbsession
@@ -96,6 +230,9 @@ def menu_delete(request):
         
         dbsession.delete(menu)
         dbsession.flush()  # Pastikan perubahan tersimpan ke database
+        invalidate_catalog(request)
+        unindex_menu(request, menu.menu_id)
+        menu_price_changed(request, menu.menu_id)
         
         return {'success': True, 'message': 'Menu berhasil dihapus'}
             
@@ -104,29 +241,9 @@ def menu_delete(request):
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='menu_delete', request_method='OPTIONS', renderer='json')
-def menu_delete_options(request):
-    """Handle OPTIONS request for CORS preflight"""
-    response = request.response
-    response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'DELETE',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept',
-        'Access-Control-Max-Age': '3600'
-    })
-    return {}
-
-
-@view_config(route_name='menu_update', request_method='PUT', renderer='json')
+@view_config(route_name='menu_update', request_method='PUT', renderer='json', permission='admin')
 def menu_update(request):
     """View untuk mengupdate menu"""
-    # Add CORS headers
-    request.response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'PUT',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept'
-    })
-    
     try:
         menu_id = request.matchdict['id']
         json_data = request.json_body
@@ -165,6 +282,9 @@ def menu_update(request):
         menu.status = json_data.get('status', menu.status)
         
         dbsession.flush()
+        invalidate_catalog(request)
+        reindex_menu(request, menu)
+        menu_price_changed(request, menu.menu_id)
         
         return {'success': True, 'menu': menu.to_dict()}
             
@@ -173,40 +293,27 @@ def menu_update(request):
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='menu_update', request_method='OPTIONS', renderer='json')
-def menu_update_options(request):
-    """Handle OPTIONS request for CORS preflight"""
-    response = request.response
-    response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'PUT',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept',
-        'Access-Control-Max-Age': '3600'
-    })
-    return {}
-
-
 # ===== KATEGORI VIEWS =====
 @view_config(route_name='kategori_list', renderer='json')
 def kategori_list(request):
     """View untuk menampilkan daftar kategori"""
-    # Add CORS headers
-    request.response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept'
-    })
-    
     try:
         dbsession = request.dbsession
-        kategoris = dbsession.query(Kategori).all()
-        return {'kategoris': [k.to_dict() for k in kategoris]}
+        fieldset = Fieldset.from_params(request.params, 'kategori')
+        
+        def load():
+            query = fieldset.load_only(dbsession.query(Kategori), Kategori)
+            serializer = fieldset.serializer()
+            return {'kategoris': [serializer.kategori(k) for k in query.all()]}
+        
+        body, etag = cached_catalog(request, ('kategori_list',) + fieldset.key, load)
+        return conditional_response(request, body, etag)
     except Exception as e:
         print("Error fetching categories:", str(e))
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='kategori_add', request_method='POST', renderer='json')
+@view_config(route_name='kategori_add', request_method='POST', renderer='json', permission='admin')
 def kategori_add(request):
     """View untuk menambahkan kategori baru"""
     try:
@@ -223,6 +330,7 @@ def kategori_add(request):
         dbsession = request.dbsession
         dbsession.add(kategori)
         dbsession.flush()
+        invalidate_catalog(request)
         
         return {'success': True, 'kategori': kategori.to_dict()}
             
@@ -231,26 +339,26 @@ def kategori_add(request):
 
 
 # ===== USER VIEWS =====
-@view_config(route_name='user_list', renderer='json')
+@view_config(route_name='user_list', renderer='json', permission='admin')
 def user_list(request):
     """View untuk menampilkan daftar users"""
+    try:
+        fieldset = Fieldset.from_params(request.params, 'user')
+    except ValueError as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+    
     dbsession = request.dbsession
-    users = dbsession.query(Users).all()
-    return {'users': [u.to_dict() for u in users]}
+    query = fieldset.load_only(dbsession.query(Users), Users)
+    if fieldset.expands('role'):
+        query = query.options(joinedload(Users.role))
+    serializer = fieldset.serializer()
+    return {'users': [serializer.user(u) for u in query.all()]}
 
 
 @view_config(route_name='user_register', request_method='POST', renderer='json')
 def user_register(request):
     """View untuk registrasi user baru"""
     try:
-        # Add CORS headers
-        request.response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'POST',
-            'Access-Control-Allow-Headers': 'Content-Type,Accept'
-        })
-
-        print("Received registration data:", request.json_body)  # Debug print
         json_data = request.json_body
         
         required_fields = ['nama_lengkap', 'email', 'password']
@@ -275,7 +383,7 @@ def user_register(request):
         user = Users(
             nama_lengkap=json_data['nama_lengkap'],
             email=json_data['email'],
-            password=json_data['password'],  # Should be hashed in production
+            password=get_password_hasher(request.registry).hash(json_data['password']),
             role_id=1,  # Set role_id 1 untuk pembeli
             is_active=True
         )
@@ -289,6 +397,8 @@ def user_register(request):
             'user': user.to_dict()
         }
             
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         print("Registration error:", str(e))  # Debug print
         import traceback
@@ -296,18 +406,10 @@ def user_register(request):
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='user_create', request_method='POST', renderer='json')
+@view_config(route_name='user_create', request_method='POST', renderer='json', permission='admin')
 def user_create(request):
     """View untuk admin membuat user baru"""
     try:
-        # Add CORS headers
-        request.response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'POST',
-            'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization'
-        })
-
-        print("Received user creation data:", request.json_body)  # Debug print
         json_data = request.json_body
         
         required_fields = ['nama_lengkap', 'email', 'password', 'role_id']
@@ -337,7 +439,7 @@ def user_create(request):
         user = Users(
             nama_lengkap=json_data['nama_lengkap'],
             email=json_data['email'],
-            password=json_data['password'],  # Should be hashed in production
+            password=get_password_hasher(request.registry).hash(json_data['password']),
             role_id=json_data['role_id'],
             is_active=True
         )
@@ -351,6 +453,8 @@ def user_create(request):
             'user': user.to_dict()
         }
             
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         print("User creation error:", str(e))  # Debug print
         import traceback
@@ -359,54 +463,94 @@ def user_create(request):
 
 
 # ===== ORDER VIEWS =====
-@view_config(route_name='order_list', renderer='json')
+@view_config(route_name='order_list', renderer='json', permission='authenticated')
 def order_list(request):
-    """View untuk menampilkan daftar orders"""
+    """View untuk menampilkan daftar orders
+
+    Hasil diurutkan dari yang terbaru. Dengan ``limit`` (atau ``cursor``)
+    hasil dipaginasi dan ``next_cursor`` menunjuk halaman berikutnya; tanpa
+    keduanya semua order dikirim seperti sebelumnya. Filter opsional: ``status``, ``user_id``,
+    ``date_from`` dan ``date_to`` (tanggal akhir inklusif). ``fields`` dan
+    ``expand`` (``user``, ``order_details``, ``items``, ``menu``,
+    ``kategori``) memilih kolom dan relasi yang dikirim.
+    """
     try:
-        # Add CORS headers
-        request.response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET',
-            'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization'
-        })
-
         dbsession = request.dbsession
+        params = request.params
+        # Tanpa limit maupun cursor: tidak dipaginasi (kompatibel dengan
+        # klien lama yang tidak mengikuti next_cursor)
+        limit = parse_limit(params, default=DEFAULT_PAGE_SIZE if params.get('cursor') else None)
+        fieldset = Fieldset.from_params(request.params, 'order')
+        
+        # Query orders beserta relasi yang diminta dalam jumlah query tetap
+        # (tanpa query tambahan per order maupun per item); create_at selalu
+        # dimuat untuk cursor
+        query = fieldset.load_only(dbsession.query(Orders), Orders, 'create_at')
+        if fieldset.expands('user'):
+            query = query.options(joinedload(Orders.user, innerjoin=True))
+        with_details = fieldset.expands('order_details')
+        if with_details or fieldset.expands('items'):
+            details = selectinload(Orders.order_details)
+            if fieldset.expands('items') or (with_details and fieldset.expands('menu')):
+                details = details.joinedload(OrderDetails.menu)
+                if with_details and fieldset.expands('menu') and fieldset.expands('kategori'):
+                    details = details.joinedload(Menu.kategori)
+            query = query.options(details)
+        
+        # Filter opsional
+        if params.get('status'):
+            query = query.filter(Orders.status == params['status'])
+        if params.get('user_id'):
+            try:
+                user_id = int(params['user_id'])
+            except ValueError:
+                return HTTPBadRequest(json_body={'error': 'Parameter user_id harus berupa angka'})
+            query = query.filter(Orders.user_id == user_id)
+        if params.get('date_from'):
+            query = query.filter(Orders.create_at >= parse_datetime(params['date_from']))
+        if params.get('date_to'):
+            query = query.filter(Orders.create_at < parse_datetime(params['date_to'], end_of_day=True))
+        
+        # Keyset pagination: lanjutkan setelah (create_at, order_id) terakhir
+        if params.get('cursor'):
+            last_create_at, last_order_id = decode_cursor(params['cursor'], 2)
+            if not isinstance(last_order_id, int):
+                return HTTPBadRequest(json_body={'error': 'Cursor tidak valid'})
+            if last_create_at is None:
+                query = query.filter(
+                    Orders.create_at.is_(None), Orders.order_id < last_order_id)
+            else:
+                last_create_at = parse_datetime(last_create_at)
+                query = query.filter(or_(
+                    Orders.create_at < last_create_at,
+                    and_(Orders.create_at == last_create_at, Orders.order_id < last_order_id),
+                    Orders.create_at.is_(None),
+                ))
+        
+        query = query.order_by(
+            Orders.create_at.desc().nulls_last(),
+            Orders.order_id.desc(),
+        )
+        if limit is not None:
+            query = query.limit(limit + 1)
+        orders = query.all()
+        
+        next_cursor = None
+        if limit is not None and len(orders) > limit:
+            orders = orders[:limit]
+            last = orders[-1]
+            next_cursor = encode_cursor(
+                last.create_at.isoformat() if last.create_at else None,
+                last.order_id,
+            )
         
-        # Query orders dengan join ke user untuk mendapatkan informasi pembeli
-        orders = dbsession.query(Orders).join(Users, Orders.user_id == Users.user_id).all()
-        
-        # Format response dengan informasi lengkap
-        order_list = []
-        for order in orders:
-            order_data = order.to_dict()
-            
-            # Tambahkan informasi user
-            order_data['user'] = {
-                'user_id': order.user.user_id,
-                'nama_lengkap': order.user.nama_lengkap,
-                'email': order.user.email
-            }
-            
-            # Tambahkan detail items
-            order_details = dbsession.query(OrderDetails).filter_by(order_id=order.order_id).all()
-            order_data['items'] = []
-            
-            for detail in order_details:
-                menu = dbsession.query(Menu).filter_by(menu_id=detail.menu_id).first()
-                if menu:
-                    order_data['items'].append({
-                        'menu_id': menu.menu_id,
-                        'nama_menu': menu.nama_menu,
-                        'jumlah': detail.jumlah,
-                        'harga': menu.harga,
-                        'subtotal': detail.subtotal
-                    })
-            
-            order_list.append(order_data)
-            
+        # Format response dengan informasi user dan detail items; menu yang
+        # sama di banyak order hanya diserialisasi sekali
+        serializer = fieldset.serializer()
         return {
             'success': True,
-            'orders': order_list
+            'orders': [serializer.order_summary(order) for order in orders],
+            'next_cursor': next_cursor
         }
             
     except Exception as e:
@@ -414,119 +558,153 @@ def order_list(request):
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='order_create', request_method='POST', renderer='json')
+@view_config(route_name='order_create', request_method='POST', renderer='json', permission='authenticated')
 def order_create(request):
-    """View untuk membuat order baru"""
+    """View untuk membuat order baru
+
+    ``user_id`` harus pemilik token (kecuali admin), karena order dibuat
+    atas nama user itu dan keranjangnya dikosongkan.
+    """
     try:
-        # Add CORS headers
-        request.response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'POST',
-            'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization'
-        })
-
-        print("Received order data:", request.json_body)  # Debug print
         json_data = request.json_body
         
         # Validasi data yang diperlukan
         required_fields = ['user_id', 'items', 'pembayaran']
         for field in required_fields:
             if field not in json_data:
-                print(f"Missing required field: {field}")  # Debug print
                 return HTTPBadRequest(json_body={'error': f'Field {field} wajib diisi'})
         
+        try:
+            user_id = int(json_data['user_id'])
+        except (TypeError, ValueError):
+            return HTTPBadRequest(json_body={'error': 'ID user tidak valid'})
+        forbidden = _cart_forbidden(request, user_id)
+        if forbidden is not None:
+            return forbidden
+        
         dbsession = request.dbsession
         
+        # Request ulang dengan Idempotency-Key yang sama mendapat response
+        # tersimpan tanpa memproses pesanan lagi
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key:
+            if len(idempotency_key) > 255:
+                return HTTPBadRequest(json_body={'error': 'Idempotency-Key maksimal 255 karakter'})
+            idempotency_ttl = get_ttl(request.registry.settings)
+            request_fingerprint = fingerprint(json_data)
+            stored = find_response(dbsession, idempotency_key, idempotency_ttl)
+            if stored is not None:
+                stored_fingerprint, stored_response = stored
+                if stored_fingerprint != request_fingerprint:
+                    return HTTPUnprocessableEntity(json_body={
+                        'error': 'Idempotency-Key sudah dipakai untuk pesanan lain'})
+                request.response.headers['Idempotent-Replayed'] = 'true'
+                return stored_response
+        
+        if not isinstance(json_data['items'], list):
+            return HTTPBadRequest(json_body={'error': 'Field items harus berupa daftar'})
+        try:
+            items = [
+                {'menu_id': int(item['menu_id']), 'jumlah': int(item['jumlah'])}
+                for item in json_data['items']
+            ]
+        except (KeyError, TypeError, ValueError):
+            return HTTPBadRequest(json_body={'error': 'Setiap item wajib memiliki menu_id dan jumlah berupa angka'})
+        
         # Validasi user exists
-        user = dbsession.query(Users).filter_by(user_id=json_data['user_id']).first()
+        user = dbsession.query(Users).filter_by(user_id=user_id).first()
         if not user:
-            print(f"User not found: {json_data['user_id']}")  # Debug print
             return HTTPBadRequest(json_body={'error': 'User tidak ditemukan'})
         
+        # Ambil harga semua menu dalam satu query
+        menu_ids = {item['menu_id'] for item in items}
+        harga_menu = dict(
+            dbsession.query(Menu.menu_id, Menu.harga).filter(Menu.menu_id.in_(menu_ids)).all()
+        ) if menu_ids else {}
+        for item in items:
+            if item['menu_id'] not in harga_menu:
+                return HTTPBadRequest(json_body={'error': f'Menu dengan ID {item["menu_id"]} tidak ditemukan'})
+        
+        order_details = [
+            {
+                'menu_id': item['menu_id'],
+                'jumlah': item['jumlah'],
+                'subtotal': harga_menu[item['menu_id']] * item['jumlah']
+            }
+            for item in items
+        ]
+        
         # Create order
-        try:
-            order = Orders(
-                user_id=json_data['user_id'],
-                status='menunggu',  # Mengubah status default menjadi 'menunggu'
-                total_harga=0,
-                pembayaran=json_data['pembayaran'],
-                create_at=datetime.datetime.now()
-            )
-            
-            dbsession.add(order)
-            dbsession.flush()  # Flush untuk mendapatkan order_id
-            
-            print(f"Order created with ID: {order.order_id}")  # Debug print
-            
-            total_harga = 0
-            
-            # Create order details
-            for item in json_data['items']:
-                menu = dbsession.query(Menu).filter_by(menu_id=item['menu_id']).first()
-                if not menu:
-                    print(f"Menu not found: {item['menu_id']}")  # Debug print
-                    raise Exception(f'Menu dengan ID {item["menu_id"]} tidak ditemukan')
-                
-                subtotal = menu.harga * item['jumlah']
-                total_harga += subtotal
-                
-                order_detail = OrderDetails(
-                    order_id=order.order_id,
-                    menu_id=item['menu_id'],
-                    jumlah=item['jumlah'],
-                    subtotal=subtotal
-                )
-                
-                dbsession.add(order_detail)
-                print(f"Added order detail for menu {menu.menu_id}")  # Debug print
-            
-            # Update total harga
-            order.total_harga = total_harga
-            
-            # Kosongkan keranjang setelah order berhasil dibuat
-            dbsession.query(Keranjang).filter_by(user_id=json_data['user_id']).delete()
-            
-            # Commit transaction
-            transaction.commit()
-            
-            print(f"Order completed with total: {total_harga}")  # Debug print
-            
-            return {
-                'success': True,
-                'message': 'Pesanan berhasil dibuat',
-                'order': {
-                    'order_id': order.order_id,
-                    'user_id': order.user_id,
-                    'status': order.status,
-                    'total_harga': order.total_harga,
-                    'pembayaran': order.pembayaran,
-                    'create_at': order.create_at.isoformat() if order.create_at else None
-                }
+        order = Orders(
+            user_id=user_id,
+            status='menunggu',  # Mengubah status default menjadi 'menunggu'
+            total_harga=sum(detail['subtotal'] for detail in order_details),
+            pembayaran=json_data['pembayaran'],
+            create_at=datetime.datetime.now()
+        )
+        
+        dbsession.add(order)
+        dbsession.flush()  # Flush untuk mendapatkan order_id
+        
+        # Simpan semua order details dalam satu bulk insert
+        if order_details:
+            for detail in order_details:
+                detail['order_id'] = order.order_id
+            dbsession.execute(insert(OrderDetails), order_details)
+        
+        # Perbarui rollup penjualan harian dalam transaksi yang sama
+        record_order_sales(dbsession, order, order_details)
+        
+        # Kosongkan keranjang setelah order berhasil dibuat
+        clear_cart(dbsession, user_id)
+        cart_cleared(request, user_id)
+        
+        # Siapkan response sebelum commit agar order tidak perlu dimuat ulang
+        response = {
+            'success': True,
+            'message': 'Pesanan berhasil dibuat',
+            'order': {
+                'order_id': order.order_id,
+                'user_id': order.user_id,
+                'status': order.status,
+                'total_harga': order.total_harga,
+                'pembayaran': order.pembayaran,
+                'create_at': order.create_at.isoformat() if order.create_at else None
             }
-            
-        except Exception as e:
-            print(f"Error creating order: {str(e)}")  # Debug print
-            transaction.abort()
-            raise
-            
+        }
+        
+        if idempotency_key:
+            # Request lain dengan key yang sama bisa lolos find_response di
+            # atas dan commit lebih dulu; bentrok primary key ditangkap di
+            # savepoint agar bisa dijawab 409, bukan gagal saat commit
+            try:
+                with dbsession.begin_nested():
+                    store_response(dbsession, idempotency_key, request_fingerprint,
+                                   response, idempotency_ttl)
+                    dbsession.flush()
+            except IntegrityError:
+                # Batalkan seluruh transaksi request, termasuk order di atas
+                tm = getattr(request, 'tm', None)
+                if tm is not None:
+                    tm.doom()
+                else:
+                    dbsession.rollback()
+                return HTTPConflict(json_body={
+                    'error': 'Pesanan dengan Idempotency-Key ini sedang diproses, silakan coba lagi'})
+        
+        publish_after_commit(request, ORDER_CREATED, {'order': response['order']})
+        
+        return response
+        
     except Exception as e:
-        print("Order creation error:", str(e))  # Debug print
-        import traceback
-        traceback.print_exc()
+        log.exception('Order creation error')
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='order_update', request_method='PUT', renderer='json')
+@view_config(route_name='order_update', request_method='PUT', renderer='json', permission='admin')
 def order_update(request):
     """View untuk mengupdate status pesanan"""
     try:
-        # Add CORS headers
-        request.response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'PUT',
-            'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization'
-        })
-
         order_id = request.matchdict['id']
         json_data = request.json_body
         
@@ -539,10 +717,21 @@ def order_update(request):
         if order is None:
             return HTTPNotFound(json_body={'error': 'Pesanan tidak ditemukan'})
             
-        # Update status
+        # Update status, sesuaikan rollup bila order batal/dipulihkan
+        if counts_as_sale(order.status) != counts_as_sale(json_data['status']):
+            record_order_sales(
+                dbsession, order, sign=1 if counts_as_sale(json_data['status']) else -1)
+        previous_status = order.status
         order.status = json_data['status']
         dbsession.flush()
         
+        if previous_status != order.status:
+            publish_after_commit(request, ORDER_STATUS_CHANGED, {
+                'order_id': order.order_id,
+                'status': order.status,
+                'previous_status': previous_status
+            })
+        
         return {'success': True, 'message': 'Status pesanan berhasil diperbarui', 'order': order.to_dict()}
             
     except Exception as e:
@@ -550,17 +739,10 @@ def order_update(request):
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='order_delete', request_method='DELETE', renderer='json')
+@view_config(route_name='order_delete', request_method='DELETE', renderer='json', permission='admin')
 def order_delete(request):
     """View untuk menghapus pesanan"""
     try:
-        # Add CORS headers
-        request.response.headers.update({
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'DELETE',
-            'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization'
-        })
-
         order_id = request.matchdict['id']
         dbsession = request.dbsession
         
@@ -571,14 +753,17 @@ def order_delete(request):
             return HTTPNotFound(json_body={'error': 'Pesanan tidak ditemukan'})
         
         # Hapus detail pesanan terlebih dahulu (foreign key constraint)
-        order_details = dbsession.query(OrderDetails).filter_by(order_id=order_id).all()
-        for detail in order_details:
+        if counts_as_sale(order.status):
+            record_order_sales(dbsession, order, sign=-1)
+        for detail in order.order_details:
             dbsession.delete(detail)
         
         # Hapus pesanan
         dbsession.delete(order)
         dbsession.flush()
         
+        publish_after_commit(request, ORDER_DELETED, {'order_id': order.order_id})
+        
         return {
             'success': True, 
             'message': f'Pesanan #{order_id} berhasil dihapus'
@@ -591,70 +776,192 @@ def order_delete(request):
         return HTTPBadRequest(json_body={'error': str(e)})
 
 
-@view_config(route_name='order_update', request_method='OPTIONS', renderer='json')
-def order_update_options(request):
-    """Handle OPTIONS request for CORS preflight"""
-    response = request.response
-    response.headers.update({
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'PUT',
-        'Access-Control-Allow-Headers': 'Content-Type,Accept,Authorization',
-        'Access-Control-Max-Age': '3600'
-    })
-    return {}
+# ===== KERANJANG VIEWS =====
+def _cart_owner(request):
+    """User yang keranjangnya boleh diakses request ini; ``None`` untuk admin."""
+    if request.has_permission('admin'):
+        return None
+    return request.authenticated_userid
+
 
+def _cart_forbidden(request, user_id):
+    """Response 403 bila ``user_id`` bukan pemilik token (kecuali admin)."""
+    owner = _cart_owner(request)
+    if owner is not None and owner != user_id:
+        return HTTPForbidden(json_body={'error': 'Akses ditolak'})
+    return None
 
-# ===== KERANJANG VIEWS =====
-@view_config(route_name='keranjang_list', renderer='json')
+
+@view_config(route_name='keranjang_list', renderer='json', permission='authenticated')
 def keranjang_list(request):
-    """View untuk menampilkan isi keranjang user"""
-    user_id = request.matchdict.get('user_id')
+    """View untuk menampilkan isi keranjang user
+
+    Parameter opsional ``fields`` dan ``expand`` (``menu``, ``kategori``,
+    ``user``, ``role``) memilih kolom dan relasi yang dikirim. Dengan
+    ``expand=`` kosong keranjang dibaca dari tier memori bila aktif.
+    """
+    try:
+        fieldset = Fieldset.from_params(request.params, 'keranjang')
+    except ValueError as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+    try:
+        user_id = int(request.matchdict.get('user_id'))
+    except (TypeError, ValueError):
+        return HTTPBadRequest(json_body={'error': 'ID user tidak valid'})
+    forbidden = _cart_forbidden(request, user_id)
+    if forbidden is not None:
+        return forbidden
+    
     dbsession = request.dbsession
+    serializer = fieldset.serializer()
+    
+    if fieldset.expand is not None and not fieldset.expand:
+        lines = cart_lines(request, user_id)
+        return {'keranjang': [serializer.project('keranjang', line) for line in lines]}
+    
+    query = fieldset.load_only(dbsession.query(Keranjang), Keranjang)
+    if fieldset.expands('menu'):
+        menu = joinedload(Keranjang.menu)
+        if fieldset.expands('kategori'):
+            menu = menu.joinedload(Menu.kategori)
+        query = query.options(menu)
+    if fieldset.expands('user'):
+        user = joinedload(Keranjang.user)
+        if fieldset.expands('role'):
+            user = user.joinedload(Users.role)
+        query = query.options(user)
     
-    keranjangs = dbsession.query(Keranjang).filter_by(user_id=user_id).all()
-    return {'keranjang': [k.to_dict() for k in keranjangs]}
+    keranjangs = query.filter_by(user_id=user_id).all()
+    return {'keranjang': [serializer.keranjang(k) for k in keranjangs]}
 
 
-@view_config(route_name='keranjang_add', request_method='POST', renderer='json')
+@view_config(route_name='keranjang_add', request_method='POST', renderer='json', permission='authenticated')
 def keranjang_add(request):
-    """View untuk menambah item ke keranjang"""
+    """View untuk menambah item ke keranjang
+
+    Satu item: ``{user_id, order_id, menu_id, jumlah}``. Beberapa item
+    sekaligus: ``{user_id, items: [{menu_id, jumlah}, ...]}``; responsenya
+    berisi daftar baris keranjang. Menu yang sudah ada di keranjang
+    jumlahnya ditambahkan (upsert atomik, lihat :mod:`backend.cart`).
+    """
     try:
         json_data = request.json_body
         
-        required_fields = ['user_id', 'order_id', 'menu_id', 'jumlah']
+        batch = 'items' in json_data
+        required_fields = ['user_id', 'items'] if batch else ['user_id', 'order_id', 'menu_id', 'jumlah']
         for field in required_fields:
             if field not in json_data:
                 return HTTPBadRequest(json_body={'error': f'Field {field} wajib diisi'})
         
-        dbsession = request.dbsession
+        items = json_data['items'] if batch else [json_data]
+        if not isinstance(items, list):
+            return HTTPBadRequest(json_body={'error': 'Field items harus berupa daftar'})
+        if not items:
+            return HTTPBadRequest(json_body={'error': 'Field items tidak boleh kosong'})
         
-        # Check if item already exists in cart
-        existing_item = dbsession.query(Keranjang).filter_by(
-            user_id=json_data['user_id'],
-            menu_id=json_data['menu_id']
-        ).first()
+        try:
+            user_id = int(json_data['user_id'])
+        except (TypeError, ValueError):
+            return HTTPBadRequest(json_body={'error': 'ID user tidak valid'})
+        forbidden = _cart_forbidden(request, user_id)
+        if forbidden is not None:
+            return forbidden
+        
+        # Menu yang sama dalam satu request digabung menjadi satu baris
+        quantities = {}
+        try:
+            for item in items:
+                menu_id = int(item['menu_id'])
+                quantities[menu_id] = quantities.get(menu_id, 0) + int(item['jumlah'])
+        except (KeyError, TypeError, ValueError):
+            return HTTPBadRequest(json_body={'error': 'Setiap item wajib memiliki menu_id dan jumlah berupa angka'})
+        if min(quantities.values()) < 1:
+            return HTTPBadRequest(json_body={'error': 'Jumlah minimal 1'})
+        
+        # Cache harga hanya untuk memastikan menu ada; subtotal dihitung
+        # dari harga di database oleh upsert_items
+        if len(lookup_prices(request, quantities)) != len(quantities):
+            return HTTPBadRequest(json_body={'error': 'Menu tidak ditemukan'})
         
-        if existing_item:
-            existing_item.jumlah += json_data['jumlah']
-            existing_item.subtotal = existing_item.jumlah * existing_item.menu.harga
-            return {'success': True, 'keranjang': existing_item.to_dict()}
+        lines = upsert_items(request.dbsession, user_id, quantities,
+                             order_id=None if batch else json_data['order_id'])
+        lines_changed(request, user_id, lines)
         
-        menu = dbsession.query(Menu).filter_by(menu_id=json_data['menu_id']).first()
-        if not menu:
-            return HTTPBadRequest(json_body={'error': 'Menu tidak ditemukan'})
+        return {'success': True, 'keranjang': lines if batch else lines[0]}
+            
+    except Exception as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+
+
+@view_config(route_name='keranjang_update', request_method='PUT', renderer='json', permission='authenticated')
+def keranjang_update(request):
+    """View untuk mengubah jumlah satu item keranjang
+
+    Item milik user lain dianggap tidak ada (404), kecuali untuk admin.
+    """
+    try:
+        json_data = request.json_body
+        if 'jumlah' not in json_data:
+            return HTTPBadRequest(json_body={'error': 'Field jumlah wajib diisi'})
         
-        keranjang = Keranjang(
-            user_id=json_data['user_id'],
-            order_id=json_data['order_id'],
-            menu_id=json_data['menu_id'],
-            jumlah=json_data['jumlah'],
-            subtotal=menu.harga * json_data['jumlah']
-        )
+        try:
+            keranjang_id = int(request.matchdict['id'])
+            jumlah = int(json_data['jumlah'])
+        except (TypeError, ValueError):
+            return HTTPBadRequest(json_body={'error': 'ID item dan jumlah harus berupa angka'})
+        if jumlah < 1:
+            return HTTPBadRequest(json_body={'error': 'Jumlah minimal 1'})
+        
+        line = set_quantity(request.dbsession, keranjang_id, jumlah, user_id=_cart_owner(request))
+        if line is None:
+            return HTTPNotFound(json_body={'error': 'Item keranjang tidak ditemukan'})
+        lines_changed(request, line['user_id'], [line])
+        
+        return {'success': True, 'keranjang': line}
+            
+    except Exception as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+
+
+@view_config(route_name='keranjang_delete', request_method='DELETE', renderer='json', permission='authenticated')
+def keranjang_delete(request):
+    """View untuk menghapus satu item dari keranjang
+
+    Item milik user lain dianggap tidak ada (404), kecuali untuk admin.
+    """
+    try:
+        try:
+            keranjang_id = int(request.matchdict['id'])
+        except ValueError:
+            return HTTPBadRequest(json_body={'error': 'ID item tidak valid'})
         
-        dbsession.add(keranjang)
-        dbsession.flush()
+        line = remove_item(request.dbsession, keranjang_id, user_id=_cart_owner(request))
+        if line is None:
+            return HTTPNotFound(json_body={'error': 'Item keranjang tidak ditemukan'})
+        line_removed(request, line)
+        
+        return {'success': True, 'message': 'Item berhasil dihapus dari keranjang'}
+            
+    except Exception as e:
+        return HTTPBadRequest(json_body={'error': str(e)})
+
+
+@view_config(route_name='keranjang_clear', request_method='DELETE', renderer='json', permission='authenticated')
+def keranjang_clear(request):
+    """View untuk mengosongkan keranjang user"""
+    try:
+        try:
+            user_id = int(request.matchdict['user_id'])
+        except ValueError:
+            return HTTPBadRequest(json_body={'error': 'ID user tidak valid'})
+        forbidden = _cart_forbidden(request, user_id)
+        if forbidden is not None:
+            return forbidden
+        
+        deleted = clear_cart(request.dbsession, user_id)
+        cart_cleared(request, user_id)
         
-        return {'success': True, 'keranjang': keranjang.to_dict()}
+        return {'success': True, 'deleted': deleted}
             
     except Exception as e:
         return HTTPBadRequest(json_body={'error': str(e)})
\ No newline at end of file
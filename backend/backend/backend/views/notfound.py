@@ -5,3 +5,9 @@ from pyramid.view import notfound_view_config
 def notfound_view(request):
     request.response.status = 404
     return {}
+
+
+def notfound_json(request):
+    """Halaman 404 untuk mode production (tanpa template jinja2)"""
+    request.response.status = 404
+    return {'error': 'Tidak ditemukan'}
@@ -0,0 +1,124 @@
+import json
+import threading
+
+from pyramid.response import Response
+from pyramid.view import view_config
+
+from ..events import get_broker
+
+DEFAULT_MAX_WAIT = 15
+DEFAULT_MAX_WAITERS = 1
+DEFAULT_RETRY = 2000
+# Thread waitress yang tidak boleh dipakai koneksi yang menunggu event
+RESERVED_THREADS = 3
+
+# Batas jumlah koneksi yang boleh menahan thread worker sambil menunggu event
+_waiters = {}
+_waiters_lock = threading.Lock()
+
+
+def waiter_capacity(max_waiters=None, threads=None):
+    """Jumlah koneksi yang boleh menunggu event bersamaan.
+
+    Bila ``threads`` (thread waitress) diketahui, paling banyak
+    ``threads - RESERVED_THREADS`` (bisa 0: koneksi langsung ditutup dan
+    klien tersambung ulang), sehingga request biasa selalu punya thread.
+    """
+    if max_waiters is None:
+        max_waiters = DEFAULT_MAX_WAITERS if threads is None else threads
+    if threads is not None:
+        max_waiters = min(max_waiters, threads - RESERVED_THREADS)
+    return max(max_waiters, 0)
+
+
+def _waiter_slots(settings):
+    max_waiters = settings.get('orders.stream.max_waiters')
+    threads = settings.get('waitress.threads')
+    limit = waiter_capacity(
+        int(max_waiters) if max_waiters is not None else None,
+        threads=int(threads) if threads is not None else None,
+    )
+    with _waiters_lock:
+        if limit not in _waiters:
+            _waiters[limit] = threading.BoundedSemaphore(limit) if limit else None
+        return _waiters[limit]
+
+
+def _format_event(event):
+    return 'id: {}\nevent: {}\ndata: {}\n\n'.format(
+        event.id, event.type, json.dumps(event.data, separators=(',', ':')))
+
+
+def _stream(broker, last_id, events, retry, max_wait, slots):
+    yield 'retry: {}\n'.format(retry)
+    if events is None:
+        # Event yang terlewat sudah terbuang dari buffer
+        last_id = broker.latest_id()
+        yield 'id: {}\nevent: resync\ndata: {{}}\n\n'.format(last_id)
+    elif events:
+        yield ''.join(_format_event(e) for e in events)
+        return
+    else:
+        # Perbarui lastEventId klien tanpa memicu event
+        yield 'id: {}\n\n'.format(last_id)
+
+    # Tahan koneksi sebentar hanya bila masih ada slot, selebihnya klien
+    # tersambung ulang setelah ``retry`` milidetik
+    if max_wait <= 0 or slots is None or not slots.acquire(blocking=False):
+        return
+    try:
+        events = broker.wait(last_id, max_wait)
+    finally:
+        slots.release()
+    if events is None:
+        yield 'id: {}\nevent: resync\ndata: {{}}\n\n'.format(broker.latest_id())
+    elif events:
+        yield ''.join(_format_event(e) for e in events)
+
+
+@view_config(route_name='order_stream', request_method='GET', permission='admin')
+def order_stream(request):
+    """View Server-Sent Events untuk event pesanan baru dan perubahan status
+
+    Setiap koneksi mengirim event yang tertunda sejak ``Last-Event-ID``
+    lalu menunggu event baru paling lama ``orders.stream.max_wait`` detik
+    sebelum ditutup; klien tersambung ulang setelah ``retry``. Jumlah
+    koneksi yang menunggu dibatasi :func:`waiter_capacity` (dari
+    ``waitress.threads``, atau ``orders.stream.max_waiters`` bila lebih
+    kecil) agar thread worker waitress tidak habis oleh klien yang idle.
+
+    Event berisi data pesanan semua user, jadi hanya untuk admin; klien
+    perlu mengirim header ``Authorization`` (mis. lewat ``fetch`` dengan
+    stream body, karena ``EventSource`` bawaan browser tidak bisa).
+    """
+    settings = request.registry.settings or {}
+    broker = get_broker(request.registry)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.params.get('last_event_id')
+    try:
+        last_id = int(last_event_id)
+    except (TypeError, ValueError):
+        last_id = None
+
+    if last_id is None or last_id > broker.latest_id():
+        # Koneksi baru (atau broker sudah di-restart): mulai dari event terbaru
+        last_id = broker.latest_id()
+        events = []
+    else:
+        events = broker.events_after(last_id)
+
+    response = Response(
+        content_type='text/event-stream',
+        charset='utf-8',
+        cache_control='no-cache',
+    )
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.app_iter = (chunk.encode('utf-8') for chunk in _stream(
+        broker,
+        last_id,
+        events,
+        int(settings.get('orders.stream.retry', DEFAULT_RETRY)),
+        float(settings.get('orders.stream.max_wait', DEFAULT_MAX_WAIT)),
+        _waiter_slots(settings),
+    ))
+    return response
@@ -10,13 +10,14 @@ with open(os.path.join(here, 'CHANGES.txt')) as f:
 
 requires = [
     'alembic',
+    'bcrypt',
     'plaster_pastedeploy',
     'pyramid >= 1.9',
     'pyramid_debugtoolbar',
     'pyramid_jinja2',
-    'pyramid_jwt',
     'pyramid_retry',
     'pyramid_tm',
+    'PyJWT',
     'SQLAlchemy',
     'transaction',
     'zope.sqlalchemy',
@@ -49,6 +50,7 @@ setup(
     zip_safe=False,
     extras_require={
         'testing': tests_require,
+        'fast': ['orjson'],
     },
     install_requires=requires,
     entry_points={
@@ -57,6 +59,8 @@ setup(
         ],
         'console_scripts': [
             'initialize_backend_db = backend.scripts.initialize_db:main',
+            'backfill_backend_daily_sales = backend.scripts.backfill_daily_sales:main',
+            'bench_backend_passwords = backend.scripts.bench_passwords:main',
         ],
     },
 )
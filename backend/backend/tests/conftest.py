@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from backend.models.meta import Base
 
@@ -15,3 +15,19 @@ def dbsession():
     
     session.close()
     Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def query_counter(dbsession):
+    """Catat setiap statement SQL yang dikirim ke database selama test"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = dbsession.get_bind()
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+
+    yield statements
+
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
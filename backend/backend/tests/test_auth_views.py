@@ -1,7 +1,6 @@
 import pytest
 from pyramid.testing import DummyRequest
 from pyramid.httpexceptions import HTTPBadRequest, HTTPNotFound
-from unittest.mock import patch
 
 from backend.views.auth import (
     login,
@@ -9,6 +8,7 @@ from backend.views.auth import (
     user_update
 )
 from backend.models import Users, Roles
+from backend.security import get_token_service
 
 
 @pytest.fixture
@@ -68,13 +68,11 @@ def test_login_success(dbsession, setup_users):
     req = DummyRequest(json_body=login_data)
     req.dbsession = dbsession
     
-    # Mock uuid.uuid4() untuk mendapatkan token yang predictable
-    with patch('backend.views.auth.uuid.uuid4') as mock_uuid:
-        mock_uuid.return_value = 'dummy-token'
-        response = login(req)
+    response = login(req)
     
-    assert 'token' in response
-    assert response['token'] == 'dummy-token'
+    claims = get_token_service(req.registry).verify(response['token'])
+    assert claims['sub'] == '1'
+    assert claims['role'] == 'customer'
     assert response['user']['email'] == login_data['email']
     assert response['user']['nama_lengkap'] == 'Customer User'
     assert response['user']['role_name'] == 'customer'
@@ -0,0 +1,206 @@
+from pyramid.httpexceptions import HTTPBadRequest, HTTPNotFound
+from pyramid.registry import Registry
+from pyramid.testing import DummyRequest
+
+from backend.cart import CartStore, load_lines, menu_prices, upsert_items
+from backend.models import Kategori, Keranjang, Menu, Roles, Users
+from backend.views.kantin import (
+    keranjang_add,
+    keranjang_clear,
+    keranjang_delete,
+    keranjang_list,
+    keranjang_update,
+    menu_update,
+)
+
+
+def _data(dbsession):
+    dbsession.add(Roles(role_id=1, role_name='customer', permissions='read,order'))
+    dbsession.add(Users(user_id=1, role_id=1, nama_lengkap='Test User', email='test@test.com',
+                        password='password123', is_active=True))
+    dbsession.add(Kategori(kategori_id=1, nama_kategori='Makanan'))
+    dbsession.add(Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000))
+    dbsession.add(Menu(menu_id=2, kategori_id=1, nama_menu='Es Teh', harga=8000))
+    dbsession.flush()
+
+
+def _request(dbsession, store=None, **kw):
+    registry = Registry()
+    if store is not None:
+        registry['cart_store'] = store
+    req = DummyRequest(**kw)
+    req.registry = registry
+    req.dbsession = dbsession
+    return req
+
+
+def test_upsert_merges_existing_line(dbsession, query_counter):
+    """Test tambah menu yang sudah ada menjumlahkan baris yang sama dalam satu statement"""
+    _data(dbsession)
+    upsert_items(dbsession, 1, {1: 2})
+    del query_counter[:]
+
+    lines = upsert_items(dbsession, 1, {1: 3})
+
+    assert len(query_counter) == 1
+    assert lines[0]['jumlah'] == 5
+    assert lines[0]['subtotal'] == 125000
+    assert dbsession.query(Keranjang).count() == 1
+
+
+def test_upsert_uses_current_price_for_existing_line(dbsession):
+    """Test subtotal baris yang sudah ada dihitung ulang dari harga menu saat ini"""
+    _data(dbsession)
+    upsert_items(dbsession, 1, {1: 1})
+    dbsession.get(Menu, 1).harga = 30000
+    dbsession.flush()
+
+    lines = upsert_items(dbsession, 1, {1: 1})
+
+    assert lines[0]['subtotal'] == 60000
+
+
+def test_new_line_ignores_stale_cached_price(dbsession):
+    """Test baris baru memakai harga di database walau harga di cache sudah basi"""
+    _data(dbsession)
+    store = CartStore()
+    assert store.prices(dbsession, [1]) == {1: 25000}
+    # Harga berubah tanpa lewat view, cache tier memori belum tahu
+    dbsession.get(Menu, 1).harga = 30000
+    dbsession.flush()
+
+    response = keranjang_add(_request(dbsession, store, json_body={
+        'user_id': 1, 'items': [{'menu_id': 1, 'jumlah': 2}]}))
+
+    assert response['keranjang'][0]['subtotal'] == 60000
+
+
+def test_menu_prices_single_query(dbsession, query_counter):
+    """Test harga beberapa menu dibaca dengan satu query"""
+    _data(dbsession)
+    del query_counter[:]
+
+    assert menu_prices(dbsession, [1, 2, 99]) == {1: 25000, 2: 8000}
+    assert len(query_counter) == 1
+
+
+def test_keranjang_add_batch(dbsession):
+    """Test tambah beberapa item sekaligus; menu yang sama digabung"""
+    _data(dbsession)
+    req = _request(dbsession, json_body={'user_id': 1, 'items': [
+        {'menu_id': 1, 'jumlah': 1}, {'menu_id': 2, 'jumlah': 2}, {'menu_id': 1, 'jumlah': 1}]})
+
+    response = keranjang_add(req)
+
+    lines = {line['menu_id']: line for line in response['keranjang']}
+    assert lines[1]['jumlah'] == 2 and lines[1]['subtotal'] == 50000
+    assert lines[2]['jumlah'] == 2 and lines[2]['subtotal'] == 16000
+
+
+def test_keranjang_add_rejects_unknown_menu(dbsession):
+    """Test tambah item gagal tanpa menulis apa pun bila ada menu yang tidak ada"""
+    _data(dbsession)
+    req = _request(dbsession, json_body={'user_id': 1, 'items': [
+        {'menu_id': 1, 'jumlah': 1}, {'menu_id': 99, 'jumlah': 1}]})
+
+    response = keranjang_add(req)
+
+    assert isinstance(response, HTTPBadRequest)
+    assert response.json_body['error'] == 'Menu tidak ditemukan'
+    assert dbsession.query(Keranjang).count() == 0
+
+
+def test_keranjang_add_invalid_jumlah(dbsession):
+    """Test jumlah kurang dari 1 ditolak"""
+    _data(dbsession)
+    req = _request(dbsession, json_body={'user_id': 1, 'order_id': None, 'menu_id': 1,
+                                         'jumlah': 0})
+
+    response = keranjang_add(req)
+
+    assert isinstance(response, HTTPBadRequest)
+    assert response.json_body['error'] == 'Jumlah minimal 1'
+
+
+def test_keranjang_update_and_delete(dbsession):
+    """Test ubah jumlah item lalu hapus item keranjang"""
+    _data(dbsession)
+    line = upsert_items(dbsession, 1, {2: 1})[0]
+
+    req = _request(dbsession, json_body={'jumlah': 3},
+                   matchdict={'id': str(line['keranjang_id'])})
+    response = keranjang_update(req)
+    assert response['keranjang']['jumlah'] == 3
+    assert response['keranjang']['subtotal'] == 24000
+
+    req = _request(dbsession, matchdict={'id': str(line['keranjang_id'])})
+    assert keranjang_delete(req)['success'] is True
+    assert isinstance(keranjang_delete(req), HTTPNotFound)
+    assert load_lines(dbsession, 1) == []
+
+
+def test_keranjang_update_not_found(dbsession):
+    """Test ubah item yang tidak ada"""
+    _data(dbsession)
+    req = _request(dbsession, json_body={'jumlah': 1}, matchdict={'id': '99'})
+
+    assert isinstance(keranjang_update(req), HTTPNotFound)
+
+
+def test_keranjang_clear(dbsession):
+    """Test kosongkan keranjang user"""
+    _data(dbsession)
+    upsert_items(dbsession, 1, {1: 1, 2: 1})
+
+    response = keranjang_clear(_request(dbsession, matchdict={'user_id': '1'}))
+
+    assert response == {'success': True, 'deleted': 2}
+    assert load_lines(dbsession, 1) == []
+
+
+def test_memory_tier_serves_list_and_prices(dbsession, query_counter):
+    """Test tier memori: list tanpa relasi dan harga dibaca dari memori"""
+    _data(dbsession)
+    store = CartStore()
+    add = {'user_id': 1, 'order_id': None, 'menu_id': 1, 'jumlah': 1}
+    keranjang_add(_request(dbsession, store, json_body=add))
+    list_request = _request(dbsession, store, matchdict={'user_id': '1'},
+                            params={'expand': ''})
+    keranjang_list(list_request)
+    del query_counter[:]
+
+    # Harga dari cache: menambah item cukup satu statement upsert
+    keranjang_add(_request(dbsession, store, json_body=add))
+    assert len(query_counter) == 1
+    del query_counter[:]
+
+    response = keranjang_list(list_request)
+    assert query_counter == []
+    assert [(k['menu_id'], k['jumlah'], k['subtotal']) for k in response['keranjang']] == [
+        (1, 2, 50000)]
+
+    keranjang_clear(_request(dbsession, store, matchdict={'user_id': '1'}))
+    assert keranjang_list(list_request) == {'keranjang': []}
+
+
+def test_memory_tier_forgets_changed_price(dbsession):
+    """Test harga menu di cache dibuang setelah menu diubah"""
+    _data(dbsession)
+    store = CartStore()
+    assert store.prices(dbsession, [1]) == {1: 25000}
+
+    menu_update(_request(dbsession, store, matchdict={'id': '1'}, json_body={
+        'nama_menu': 'Nasi Goreng', 'kategori_id': 1, 'harga': 30000}))
+
+    assert store.prices(dbsession, [1]) == {1: 30000}
+
+
+def test_store_ignores_load_older_than_change():
+    """Test hasil baca yang mendahului perubahan tidak disimpan ke memori"""
+    store = CartStore()
+    version = store.version(1)
+    store.clear(1)
+
+    store.load(1, [{'keranjang_id': 1, 'menu_id': 1, 'jumlah': 1}], version)
+
+    assert store.lines(1) is None
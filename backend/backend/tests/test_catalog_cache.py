@@ -0,0 +1,123 @@
+import pytest
+from pyramid.testing import DummyRequest
+from pyramid.httpexceptions import HTTPNotFound, HTTPNotModified
+from pyramid.registry import Registry
+
+from backend import cache as cache_module
+from backend.cache import CatalogCache
+from backend.views.kantin import menu_list, menu_detail, menu_add, kategori_list
+from backend.views.internal import internal_cache
+from backend.models import Menu, Kategori
+
+
+@pytest.fixture
+def catalog_registry():
+    registry = Registry()
+    registry.settings = {}
+    registry['catalog_cache'] = CatalogCache(ttl=60, max_entries=8)
+    return registry
+
+
+@pytest.fixture
+def setup_menu(dbsession):
+    dbsession.add(Kategori(kategori_id=1, nama_kategori='Makanan', icon='🍽️'))
+    dbsession.add(Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000))
+    dbsession.flush()
+
+
+def _request(dbsession, registry, **kwargs):
+    req = DummyRequest(**kwargs)
+    req.registry = registry
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    return req
+
+
+def test_cache_ttl_expiry(monkeypatch):
+    """Test entri kedaluwarsa setelah TTL"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = CatalogCache(ttl=10)
+
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    now[0] += 11
+    assert cache.get('a') is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_cache_lru_eviction():
+    """Test entri paling lama tidak dipakai dibuang saat penuh"""
+    cache = CatalogCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
+
+
+def test_menu_list_served_from_cache(dbsession, setup_menu, catalog_registry, query_counter):
+    """Test request kedua menu_list tidak menyentuh database"""
+    first = menu_list(_request(dbsession, catalog_registry))
+    del query_counter[:]
+    second = menu_list(_request(dbsession, catalog_registry))
+
+    assert second.body == first.body
+    assert second.content_type == 'application/json'
+    assert query_counter == []
+
+
+def test_menu_add_invalidates_cache(dbsession, setup_menu, catalog_registry):
+    """Test menambah menu mengosongkan cache katalog"""
+    assert len(menu_list(_request(dbsession, catalog_registry)).json_body['menus']) == 1
+    kategori_list(_request(dbsession, catalog_registry))
+
+    menu_add(_request(dbsession, catalog_registry, json_body={
+        'nama_menu': 'Es Teh', 'kategori_id': 1, 'harga': 8000}))
+
+    assert len(menu_list(_request(dbsession, catalog_registry)).json_body['menus']) == 2
+    stats = internal_cache(_request(dbsession, catalog_registry))['catalog_cache']
+    assert stats['entries'] == 1
+    assert stats['invalidations'] == 1
+
+
+def test_menu_list_etag_not_modified(dbsession, setup_menu, catalog_registry, query_counter):
+    """Test If-None-Match yang cocok dijawab 304 tanpa query"""
+    etag = menu_list(_request(dbsession, catalog_registry)).headers['ETag']
+
+    del query_counter[:]
+    response = menu_list(_request(dbsession, catalog_registry, headers={'If-None-Match': etag}))
+
+    assert isinstance(response, HTTPNotModified)
+    assert response.headers['ETag'] == etag
+    assert query_counter == []
+
+
+def test_menu_detail_etag_changes_after_update(dbsession, setup_menu):
+    """Test ETag berubah ketika isi menu berubah (tanpa cache)"""
+    registry = Registry()
+    registry.settings = {}
+    etag = menu_detail(_request(dbsession, registry, matchdict={'id': '1'})).headers['ETag']
+
+    response = menu_detail(_request(dbsession, registry, matchdict={'id': '1'},
+                                    headers={'If-None-Match': 'W/' + etag}))
+    assert isinstance(response, HTTPNotModified)
+
+    dbsession.query(Menu).filter_by(menu_id=1).update({'harga': 27000})
+    response = menu_detail(_request(dbsession, registry, matchdict={'id': '1'},
+                                    headers={'If-None-Match': etag}))
+    assert response.json_body['menu']['harga'] == 27000
+    assert response.headers['ETag'] != etag
+
+
+def test_menu_detail_not_found_not_cached(dbsession, catalog_registry):
+    """Test menu yang tidak ada tidak disimpan di cache"""
+    response = menu_detail(_request(dbsession, catalog_registry, matchdict={'id': '999'}))
+
+    assert isinstance(response, HTTPNotFound)
+    assert catalog_registry['catalog_cache'].stats()['entries'] == 0
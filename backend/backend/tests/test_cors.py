@@ -0,0 +1,115 @@
+import pytest
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+
+from backend.cors import CORSPolicy, cors_tween_factory
+
+ORIGIN = 'http://localhost:5173'
+
+
+def _tween(**settings):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return Response('ok')
+
+    registry = Registry()
+    registry.settings = settings
+    return cors_tween_factory(handler, registry), calls
+
+
+def _request(method='GET', origin=ORIGIN, **headers):
+    request = Request.blank('/api/menu/1', method=method, headers=headers)
+    if origin:
+        request.headers['Origin'] = origin
+    return request
+
+
+def test_preflight_short_circuit():
+    """Test preflight OPTIONS dijawab tanpa memanggil handler (routing)"""
+    tween, calls = _tween(**{'cors.allow_origins': ORIGIN})
+
+    response = tween(_request('OPTIONS', **{'Access-Control-Request-Method': 'DELETE'}))
+
+    assert calls == []
+    assert response.status_code == 204
+    assert response.headers['Access-Control-Allow-Origin'] == ORIGIN
+    assert 'DELETE' in response.headers['Access-Control-Allow-Methods']
+    assert 'Idempotency-Key' in response.headers['Access-Control-Allow-Headers']
+    assert response.headers['Vary'] == 'Origin'
+
+
+def test_simple_request_allowed_origin():
+    """Test response biasa mendapat header CORS untuk origin yang diizinkan"""
+    tween, calls = _tween(**{'cors.allow_origins': 'http://a.test ' + ORIGIN})
+
+    response = tween(_request())
+
+    assert len(calls) == 1
+    assert response.headers['Access-Control-Allow-Origin'] == ORIGIN
+    assert response.headers['Access-Control-Expose-Headers'] == 'ETag, Idempotent-Replayed'
+    assert 'Access-Control-Allow-Methods' not in response.headers
+
+
+def test_disallowed_origin():
+    """Test origin yang tidak terdaftar tidak mendapat header CORS"""
+    tween, calls = _tween(**{'cors.allow_origins': ORIGIN})
+
+    response = tween(_request(origin='http://evil.test'))
+    assert 'Access-Control-Allow-Origin' not in response.headers
+    assert response.headers['Vary'] == 'Origin'
+
+    response = tween(_request('OPTIONS', origin='http://evil.test'))
+    assert response.status_code == 204
+    assert 'Access-Control-Allow-Origin' not in response.headers
+    assert response.headers['Vary'] == 'Origin'
+    assert len(calls) == 1
+
+
+def test_missing_origin_still_varies():
+    """Test request tanpa Origin tetap mendapat Vary: Origin pada policy eksplisit"""
+    tween, _ = _tween(**{'cors.allow_origins': ORIGIN})
+
+    response = tween(_request(origin=None))
+
+    assert 'Access-Control-Allow-Origin' not in response.headers
+    assert response.headers['Vary'] == 'Origin'
+
+
+def test_wildcard_origin():
+    """Test '*' dikirim literal tanpa credentials, origin tidak dipantulkan"""
+    tween, _ = _tween(**{'cors.allow_origins': '*'})
+
+    response = tween(_request())
+
+    assert response.headers['Access-Control-Allow-Origin'] == '*'
+    assert 'Access-Control-Allow-Credentials' not in response.headers
+    assert 'Vary' not in response.headers
+
+
+def test_wildcard_with_credentials_rejected():
+    """Test '*' bersama credentials ditolak saat startup"""
+    with pytest.raises(ValueError):
+        _tween(**{'cors.allow_origins': '*', 'cors.allow_credentials': 'true'})
+
+
+def test_credentials_with_explicit_origin():
+    """Test credentials hanya dikirim untuk origin yang terdaftar"""
+    tween, _ = _tween(**{'cors.allow_origins': ORIGIN, 'cors.allow_credentials': 'true'})
+
+    response = tween(_request())
+    assert response.headers['Access-Control-Allow-Origin'] == ORIGIN
+    assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+
+    response = tween(_request(origin='http://evil.test'))
+    assert 'Access-Control-Allow-Origin' not in response.headers
+
+
+def test_policy_headers_precomputed():
+    """Test daftar header untuk origin terdaftar dipakai ulang, bukan dibuat per request"""
+    policy = CORSPolicy(allow_origins=[ORIGIN])
+
+    assert policy.headers(ORIGIN) is policy.headers(ORIGIN)
+    assert policy.headers(None) == [('Vary', 'Origin')]
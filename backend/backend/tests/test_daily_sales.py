@@ -0,0 +1,114 @@
+import pytest
+import datetime
+from pyramid.testing import DummyRequest
+
+from backend.views.kantin import order_create, order_update, order_delete
+from backend.models import Menu, Kategori, Users, Orders, OrderDetails, Roles, DailySales
+from backend.models.daily_sales import record_order_sales, rebuild_daily_sales
+
+
+@pytest.fixture
+def setup_sales_data(dbsession):
+    """Setup user dan menu untuk pengujian rollup"""
+    dbsession.add(Roles(role_id=1, role_name='customer', permissions='read,order'))
+    dbsession.add(Kategori(kategori_id=1, nama_kategori='Makanan', icon='🍽️'))
+    dbsession.add(Users(user_id=1, role_id=1, nama_lengkap='Test User',
+                        email='test@test.com', password='password123', is_active=True))
+    dbsession.add(Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000))
+    dbsession.add(Menu(menu_id=2, kategori_id=1, nama_menu='Es Teh', harga=8000))
+    dbsession.flush()
+
+
+def _request(dbsession, **kwargs):
+    req = DummyRequest(**kwargs)
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    return req
+
+
+def _rollup(dbsession):
+    dbsession.expire_all()
+    return {
+        (s.tanggal, s.menu_id): (s.jumlah, s.total)
+        for s in dbsession.query(DailySales).all()
+    }
+
+
+def _create_order(dbsession, items):
+    response = order_create(_request(dbsession, json_body={
+        'user_id': 1, 'pembayaran': 'cash', 'items': items}))
+    return response['order']['order_id']
+
+
+def test_record_order_sales_accumulates(dbsession, setup_sales_data):
+    """Test rollup menjumlahkan penjualan pada tanggal dan menu yang sama"""
+    create_at = datetime.datetime(2025, 5, 28, 12, 0)
+    for _ in range(2):
+        order = Orders(user_id=1, status='menunggu', total_harga=33000, pembayaran='cash',
+                       create_at=create_at)
+        order.order_details = [OrderDetails(menu_id=1, jumlah=1, subtotal=25000),
+                               OrderDetails(menu_id=1, jumlah=1, subtotal=25000)]
+        dbsession.add(order)
+        record_order_sales(dbsession, order)
+
+    assert _rollup(dbsession) == {(datetime.date(2025, 5, 28), 1): (4, 100000)}
+
+
+def test_order_create_updates_rollup(dbsession, setup_sales_data):
+    """Test order baru langsung tercatat di rollup"""
+    _create_order(dbsession, [{'menu_id': 1, 'jumlah': 2}, {'menu_id': 2, 'jumlah': 1}])
+
+    today = datetime.date.today()
+    assert _rollup(dbsession) == {
+        (today, 1): (2, 50000),
+        (today, 2): (1, 8000),
+    }
+
+
+def test_order_cancel_and_delete_update_rollup(dbsession, setup_sales_data):
+    """Test pembatalan dan penghapusan order mengurangi rollup"""
+    first = _create_order(dbsession, [{'menu_id': 1, 'jumlah': 2}])
+    second = _create_order(dbsession, [{'menu_id': 1, 'jumlah': 1}])
+    today = datetime.date.today()
+
+    order_update(_request(dbsession, matchdict={'id': str(first)},
+                          json_body={'status': 'cancelled'}))
+    assert _rollup(dbsession) == {(today, 1): (1, 25000)}
+
+    # Menghapus order yang sudah batal tidak mengurangi rollup lagi
+    order_delete(_request(dbsession, matchdict={'id': str(first)}))
+    assert _rollup(dbsession) == {(today, 1): (1, 25000)}
+
+    order_delete(_request(dbsession, matchdict={'id': str(second)}))
+    assert _rollup(dbsession) == {(today, 1): (0, 0)}
+
+
+def test_rebuild_daily_sales(dbsession, setup_sales_data):
+    """Test backfill menghitung ulang rollup dari orders"""
+    create_at = datetime.datetime(2025, 5, 28, 12, 0)
+    dbsession.add(Orders(user_id=1, status='selesai', total_harga=33000, pembayaran='cash',
+                         create_at=create_at, order_details=[
+                             OrderDetails(menu_id=1, jumlah=1, subtotal=25000),
+                             OrderDetails(menu_id=2, jumlah=1, subtotal=8000)]))
+    dbsession.add(Orders(user_id=1, status='cancelled', total_harga=8000, pembayaran='cash',
+                         create_at=create_at, order_details=[
+                             OrderDetails(menu_id=2, jumlah=1, subtotal=8000)]))
+    dbsession.add(DailySales(tanggal=datetime.date(2020, 1, 1), menu_id=1, jumlah=9, total=9))
+    dbsession.flush()
+
+    rebuild_daily_sales(dbsession)
+
+    assert _rollup(dbsession) == {
+        (datetime.date(2025, 5, 28), 1): (1, 25000),
+        (datetime.date(2025, 5, 28), 2): (1, 8000),
+    }
+
+
+def test_backfill_parse_args():
+    """Test argumen script backfill"""
+    from backend.scripts import backfill_daily_sales
+
+    args = backfill_daily_sales.parse_args(['progname', 'development.ini'])
+
+    assert args.config_uri == 'development.ini'
@@ -0,0 +1,108 @@
+import pytest
+import datetime
+from pyramid.testing import DummyRequest
+from pyramid.httpexceptions import HTTPBadRequest
+
+from backend.views.dashboard import admin_dashboard
+from backend.models import Menu, Kategori, Users, Orders, OrderDetails, Roles
+from backend.models.daily_sales import rebuild_daily_sales
+
+
+@pytest.fixture
+def setup_dashboard_data(dbsession):
+    """Setup user, menu, dan beberapa order untuk dashboard"""
+    dbsession.add(Roles(role_id=1, role_name='customer', permissions='read,order'))
+    dbsession.add(Kategori(kategori_id=1, nama_kategori='Makanan', icon='🍽️'))
+    dbsession.add(Users(user_id=1, role_id=1, nama_lengkap='Pembeli Satu',
+                        email='satu@test.com', password='password123', is_active=True))
+    dbsession.add(Users(user_id=2, role_id=1, nama_lengkap='Pembeli Dua',
+                        email='dua@test.com', password='password123', is_active=False))
+    dbsession.add(Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000))
+    dbsession.add(Menu(menu_id=2, kategori_id=1, nama_menu='Es Teh', harga=8000))
+    dbsession.flush()
+
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time(12, 0))
+    orders = [
+        (1, 'selesai', today - datetime.timedelta(days=1), [(1, 2), (2, 1)]),
+        (1, 'menunggu', today, [(2, 3)]),
+        (2, 'selesai', today, [(1, 1)]),
+        (2, 'cancelled', today, [(1, 4)]),
+    ]
+    for user_id, status, create_at, items in orders:
+        details = [
+            OrderDetails(menu_id=menu_id, jumlah=jumlah,
+                         subtotal=jumlah * (25000 if menu_id == 1 else 8000))
+            for menu_id, jumlah in items
+        ]
+        dbsession.add(Orders(
+            user_id=user_id, status=status, pembayaran='cash', create_at=create_at,
+            total_harga=sum(d.subtotal for d in details), order_details=details))
+    dbsession.flush()
+    rebuild_daily_sales(dbsession)
+
+
+def test_admin_dashboard_empty(dbsession):
+    """Test dashboard tanpa data"""
+    req = DummyRequest()
+    req.dbsession = dbsession
+
+    response = admin_dashboard(req)
+
+    assert response['success'] is True
+    assert response['totals']['pesanan'] == 0
+    assert response['totals']['penghasilan'] == 0
+    assert response['revenue_per_day'] == []
+    assert response['top_menus'] == []
+
+
+def test_admin_dashboard_aggregates(dbsession, setup_dashboard_data):
+    """Test agregasi dashboard dihitung dengan benar"""
+    req = DummyRequest()
+    req.dbsession = dbsession
+
+    response = admin_dashboard(req)
+
+    totals = response['totals']
+    assert totals['pesanan'] == 4
+    assert totals['penghasilan'] == 58000 + 24000 + 25000
+    assert totals['menu'] == 2
+    assert totals['pengguna'] == 2
+    assert totals['pengguna_aktif'] == 1
+    assert totals['pembeli_aktif'] == 2
+    assert response['orders_by_status'] == {'selesai': 2, 'menunggu': 1, 'cancelled': 1}
+
+    today = datetime.date.today()
+    assert response['revenue_per_day'] == [
+        {'tanggal': (today - datetime.timedelta(days=1)).isoformat(), 'total': 58000,
+         'jumlah_pesanan': 1, 'jumlah': 3},
+        {'tanggal': today.isoformat(), 'total': 49000, 'jumlah_pesanan': 2, 'jumlah': 4},
+    ]
+
+    assert [m['nama_menu'] for m in response['top_menus']] == ['Es Teh', 'Nasi Goreng']
+    # Pesanan yang dibatalkan tidak dihitung, sama dengan revenue_per_day
+    assert response['top_menus'][0]['jumlah'] == 4
+    assert response['top_menus'][1]['jumlah'] == 3
+    assert len(response['recent_orders']) == 4
+    assert {'nama_lengkap', 'email'} <= set(response['recent_orders'][0])
+
+
+def test_admin_dashboard_params(dbsession, setup_dashboard_data):
+    """Test parameter days dan top membatasi hasil"""
+    req = DummyRequest(params={'days': '1', 'top': '1'})
+    req.dbsession = dbsession
+
+    response = admin_dashboard(req)
+
+    assert len(response['revenue_per_day']) == 1
+    assert len(response['top_menus']) == 1
+
+
+def test_admin_dashboard_invalid_param(dbsession):
+    """Test parameter tidak valid ditolak"""
+    req = DummyRequest(params={'days': 'abc'})
+    req.dbsession = dbsession
+
+    response = admin_dashboard(req)
+
+    assert isinstance(response, HTTPBadRequest)
+    assert 'Parameter days harus berupa angka' in response.json_body['error']
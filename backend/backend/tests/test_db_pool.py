@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from pyramid import testing
+from pyramid.registry import Registry
+from sqlalchemy import create_engine, exc, inspect
+from sqlalchemy.pool import SingletonThreadPool
+
+from backend.models import get_engine
+from backend.pool import TimedQueuePool
+
+
+def _engine(tmp_path, **settings):
+    url = 'sqlite:///{}'.format(tmp_path / 'pool.sqlite')
+    return get_engine(dict({'sqlalchemy.url': url}, **{
+        'sqlalchemy.' + key: value for key, value in settings.items()
+    }))
+
+
+def test_pool_settings_applied(tmp_path):
+    """Test setting pool dari ini dikonversi dan diteruskan ke engine"""
+    engine = _engine(tmp_path, pool_size='3', max_overflow='2', pool_timeout='5',
+                     pool_recycle='1800', pool_pre_ping='false', query_cache_size='50')
+    pool = engine.pool
+
+    assert isinstance(pool, TimedQueuePool)
+    assert (pool.size(), pool._max_overflow, pool.timeout()) == (3, 2, 5)
+    assert pool._recycle == 1800
+    assert pool._pre_ping is False
+    assert engine._compiled_cache.capacity == 50
+
+
+def test_queue_pool_options_dropped_for_memory_sqlite():
+    """Test SQLite in-memory tetap bisa dibuat walau ada setting QueuePool"""
+    engine = get_engine({'sqlalchemy.url': 'sqlite://', 'sqlalchemy.max_overflow': '10',
+                         'sqlalchemy.pool_pre_ping': 'true'})
+
+    assert isinstance(engine.pool, SingletonThreadPool)
+    assert engine.pool._pre_ping is True
+
+
+def test_pool_records_wait_and_timeout(tmp_path):
+    """Test waktu tunggu checkout dan timeout tercatat di statistik pool"""
+    engine = _engine(tmp_path, pool_size='1', max_overflow='0', pool_timeout='1')
+    conn = engine.connect()
+
+    def release():
+        time.sleep(0.05)
+        conn.close()
+
+    threading.Thread(target=release).start()
+    engine.connect().close()
+
+    stats = engine.pool.stats.stats()
+    assert stats['checkouts'] == 2
+    assert stats['connects'] == 1
+    assert stats['waits'] == 1
+    assert stats['wait_max_ms'] >= 40
+
+    busy = _engine(tmp_path, pool_size='1', max_overflow='0', pool_timeout='0')
+    held = busy.connect()
+    with pytest.raises(exc.TimeoutError):
+        busy.connect()
+    held.close()
+    assert busy.pool.stats.timeouts == 1
+
+
+def test_pool_stats_survive_dispose(tmp_path):
+    """Test statistik tetap tercatat sekali per checkout setelah engine.dispose()"""
+    engine = _engine(tmp_path)
+    engine.connect().close()
+    engine.dispose()
+    engine.connect().close()
+    engine.connect().close()
+
+    stats = engine.pool.stats.stats()
+    assert stats['checkouts'] == 3
+    assert stats['connects'] == 2
+    assert stats['waits'] == 0
+
+
+def test_pool_listeners_not_duplicated_on_dispose(tmp_path):
+    """Test engine.dispose() berulang tidak menambah listener pool"""
+    engine = _engine(tmp_path)
+    listeners = len(engine.pool.dispatch.checkout), len(engine.pool.dispatch.connect)
+
+    engine.dispose()
+    engine.dispose()
+
+    assert (len(engine.pool.dispatch.checkout), len(engine.pool.dispatch.connect)) == listeners
+    engine.connect().close()
+    assert engine.pool.stats.stats()['checkouts'] == 1
+
+
+def test_pool_debug_logging_silenced(tmp_path, caplog):
+    """Test pool tidak menulis log debug walau logger backend di level DEBUG"""
+    engine = _engine(tmp_path)
+    with caplog.at_level(logging.DEBUG, logger='backend'):
+        engine.connect().close()
+
+    assert not engine.pool.logger.isEnabledFor(logging.INFO)
+    assert not [r for r in caplog.records if r.name.startswith('backend.pool.')]
+
+
+def test_internal_pool_view(tmp_path):
+    """Test endpoint /api/_internal/pool menampilkan keadaan pool"""
+    from backend.views.internal import internal_pool
+
+    engine = _engine(tmp_path, pool_size='2')
+    conn = engine.connect()
+
+    registry = Registry()
+    registry['dbengine'] = engine
+    request = testing.DummyRequest()
+    request.registry = registry
+    info = internal_pool(request)['pool']
+    conn.close()
+
+    assert info['size'] == 2
+    assert info['checked_out'] == 1
+    assert info['checkouts'] == 1
+
+
+def test_alembic_migrates_with_pool_settings(tmp_path):
+    """Test migrasi alembic jalan dengan setting pool di ini (engine dari get_engine)"""
+    url = 'sqlite:///{}'.format(tmp_path / 'migrate.sqlite')
+    ini = tmp_path / 'migrate.ini'
+    ini.write_text('\n'.join([
+        '[app:main]',
+        'use = egg:backend',
+        'sqlalchemy.url = ' + url,
+        'sqlalchemy.pool_size = 2',
+        'sqlalchemy.pool_pre_ping = false',
+        'sqlalchemy.query_cache_size = 50',
+        '',
+        '[alembic]',
+        'script_location = ' + os.path.join(
+            os.path.dirname(__file__), os.pardir, 'backend', 'alembic'),
+        '',
+    ]))
+
+    command.upgrade(Config(str(ini)), 'head')
+
+    assert 'orders' in inspect(create_engine(url)).get_table_names()
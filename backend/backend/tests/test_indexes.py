@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import IntegrityError
+
+from backend.models import Keranjang, OrderDetails, Orders
+
+
+def _plan(dbsession, statement):
+    compiled = statement.compile(dbsession.get_bind(), compile_kwargs={'literal_binds': True})
+    rows = dbsession.execute(text('EXPLAIN QUERY PLAN {}'.format(compiled))).fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize('statement, index', [
+    # detail pesanan untuk /api/orders (selectinload)
+    (select(OrderDetails).where(OrderDetails.order_id.in_([1, 2, 3])),
+     'ix_orderdetails_order_id'),
+    # jumlah item per pesanan pada export
+    (select(func.sum(OrderDetails.jumlah)).where(OrderDetails.order_id == 1),
+     'ix_orderdetails_order_id'),
+    # cek menu yang sudah pernah dipesan
+    (select(OrderDetails.detail_id).where(OrderDetails.menu_id == 1),
+     'ix_orderdetails_menu_id'),
+    # /api/keranjang/{user_id}
+    (select(Keranjang).where(Keranjang.user_id == 1),
+     'ix_keranjang_user_id_menu_id'),
+    # item keranjang yang sudah ada saat menambah menu
+    (select(Keranjang).where(Keranjang.user_id == 1, Keranjang.menu_id == 2),
+     'ix_keranjang_user_id_menu_id'),
+    (select(Keranjang.keranjang_id).where(Keranjang.menu_id == 1),
+     'ix_keranjang_menu_id'),
+    # /api/orders?user_id= dan ?status=
+    (select(Orders).where(Orders.user_id == 1).order_by(Orders.create_at.desc()),
+     'ix_orders_user_id_create_at_order_id'),
+    (select(Orders).where(Orders.status == 'pending').order_by(Orders.create_at.desc()),
+     'ix_orders_status_create_at_order_id'),
+])
+def test_hot_queries_use_index(dbsession, statement, index):
+    """Test query yang sering dipakai memakai index, bukan full table scan"""
+    plan = _plan(dbsession, statement)
+
+    assert 'USING INDEX {}'.format(index) in plan or \
+        'USING COVERING INDEX {}'.format(index) in plan, plan
+
+
+def test_keranjang_user_menu_unique(dbsession):
+    """Test index unik mencegah dua baris keranjang untuk user dan menu yang sama"""
+    dbsession.add(Keranjang(user_id=1, menu_id=1, jumlah=1, subtotal=1000))
+    dbsession.flush()
+    dbsession.add(Keranjang(user_id=1, menu_id=1, jumlah=2, subtotal=2000))
+    with pytest.raises(IntegrityError):
+        dbsession.flush()
@@ -1,7 +1,7 @@
 import pytest
 import datetime
 from pyramid.testing import DummyRequest
-from pyramid.httpexceptions import HTTPBadRequest, HTTPNotFound
+from pyramid.httpexceptions import HTTPBadRequest, HTTPConflict, HTTPNotFound, HTTPUnprocessableEntity
 
 from backend.views.kantin import (
     menu_list,
@@ -9,6 +9,7 @@ from backend.views.kantin import (
     menu_add,
     menu_delete,
     menu_update,
+    menu_by_kategori,
     kategori_list,
     kategori_add,
     user_register,
@@ -76,7 +77,7 @@ def test_menu_list_empty(dbsession):
     req = DummyRequest()
     req.dbsession = dbsession
     
-    response = menu_list(req)
+    response = menu_list(req).json_body
     
     assert 'menus' in response
     assert isinstance(response['menus'], list)
@@ -88,19 +89,44 @@ def test_menu_list_with_data(dbsession, setup_test_data):
     req = DummyRequest()
     req.dbsession = dbsession
     
-    response = menu_list(req)
+    response = menu_list(req).json_body
     
     assert 'menus' in response
     assert len(response['menus']) == 2
     assert response['menus'][0]['nama_menu'] == 'Nasi Goreng'
 
 
+def test_menu_list_sparse_fields(dbsession, setup_test_data, query_counter):
+    """Test fields dan expand membatasi kolom yang dimuat dan dikirim"""
+    req = DummyRequest(params={'fields': 'nama_menu,harga', 'expand': ''})
+    req.dbsession = dbsession
+    dbsession.expire_all()
+    
+    response = menu_list(req).json_body
+    
+    assert response['menus'][0] == {'menu_id': 1, 'nama_menu': 'Nasi Goreng', 'harga': 25000}
+    assert len(query_counter) == 1
+    assert 'deskripsi' not in query_counter[0]
+    assert 'kategori' not in query_counter[0]
+
+
+def test_menu_list_unknown_field(dbsession):
+    """Test field atau relasi yang tidak dikenal ditolak"""
+    for params in ({'fields': 'password'}, {'expand': 'user'}):
+        req = DummyRequest(params=params)
+        req.dbsession = dbsession
+        
+        response = menu_list(req)
+        
+        assert isinstance(response, HTTPBadRequest)
+
+
 def test_menu_detail_success(dbsession, setup_test_data):
     """Test detail menu berhasil"""
     req = DummyRequest(matchdict={'id': '1'})
     req.dbsession = dbsession
     
-    response = menu_detail(req)
+    response = menu_detail(req).json_body
     
     assert 'menu' in response
     assert response['menu']['menu_id'] == 1
@@ -118,6 +144,60 @@ def test_menu_detail_not_found(dbsession):
     assert 'Menu tidak ditemukan' in response.json_body['error']
 
 
+def _menu_by_kategori_request(dbsession, kategori_id, **params):
+    req = DummyRequest(matchdict={'kategori_id': str(kategori_id)}, params=params)
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    return req
+
+
+def test_menu_by_kategori(dbsession, setup_test_data):
+    """Test daftar menu per kategori dengan filter status"""
+    dbsession.add(Menu(menu_id=3, kategori_id=1, nama_menu='Mie Goreng', harga=20000, status='habis'))
+    dbsession.flush()
+    
+    response = menu_by_kategori(_menu_by_kategori_request(dbsession, 1)).json_body
+    assert [m['menu_id'] for m in response['menus']] == [1, 3]
+    assert response['next_cursor'] is None
+    
+    response = menu_by_kategori(_menu_by_kategori_request(dbsession, 1, status='tersedia')).json_body
+    assert [m['menu_id'] for m in response['menus']] == [1]
+
+
+def test_menu_by_kategori_pagination(dbsession, setup_test_data):
+    """Test pagination menu per kategori dengan cursor"""
+    for menu_id in range(3, 8):
+        dbsession.add(Menu(menu_id=menu_id, kategori_id=1, nama_menu='Menu %d' % menu_id, harga=10000))
+    dbsession.flush()
+    
+    seen = []
+    cursor = None
+    while True:
+        params = {'limit': '2'}
+        if cursor:
+            params['cursor'] = cursor
+        response = menu_by_kategori(_menu_by_kategori_request(dbsession, 1, **params)).json_body
+        seen.extend(m['menu_id'] for m in response['menus'])
+        cursor = response['next_cursor']
+        if cursor is None:
+            break
+    
+    assert seen == [1, 3, 4, 5, 6, 7]
+
+
+def test_menu_by_kategori_not_found(dbsession, setup_test_data):
+    """Test kategori tidak ditemukan dan parameter tidak valid"""
+    response = menu_by_kategori(_menu_by_kategori_request(dbsession, 999))
+    assert isinstance(response, HTTPNotFound)
+    
+    response = menu_by_kategori(_menu_by_kategori_request(dbsession, 'abc'))
+    assert isinstance(response, HTTPBadRequest)
+    
+    response = menu_by_kategori(_menu_by_kategori_request(dbsession, 1, cursor='xyz'))
+    assert isinstance(response, HTTPBadRequest)
+
+
 def test_menu_add_success(dbsession, setup_test_data):
     """Test tambah menu berhasil"""
     menu_data = {
@@ -240,7 +320,7 @@ def test_kategori_list(dbsession, setup_test_data):
     req.response = DummyRequest()
     req.response.headers = {}
     
-    response = kategori_list(req)
+    response = kategori_list(req).json_body
     
     assert 'kategoris' in response
     assert len(response['kategoris']) == 2
@@ -381,6 +461,143 @@ def test_order_list(dbsession, setup_test_data):
     assert isinstance(response['orders'], list)
 
 
+def _add_orders(dbsession, count):
+    """Tambahkan sejumlah order, masing-masing dengan dua item"""
+    # Waktu yang sama untuk semua order agar urutan ditentukan oleh order_id
+    create_at = datetime.datetime(2025, 5, 28, 12, 0)
+    for _ in range(count):
+        order = Orders(user_id=1, status='menunggu', total_harga=33000, pembayaran='cash',
+                       create_at=create_at)
+        dbsession.add(order)
+        dbsession.flush()
+        dbsession.add(OrderDetails(order_id=order.order_id, menu_id=1, jumlah=1, subtotal=25000))
+        dbsession.add(OrderDetails(order_id=order.order_id, menu_id=2, jumlah=1, subtotal=8000))
+    dbsession.flush()
+    # Kosongkan identity map agar relasi benar-benar dimuat dari database
+    dbsession.expunge_all()
+
+
+def _count_order_list_queries(dbsession, query_counter):
+    req = DummyRequest()
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    
+    del query_counter[:]
+    response = order_list(req)
+    count = len(query_counter)
+    dbsession.expunge_all()
+    return response, count
+
+
+def test_order_list_items(dbsession, setup_test_data):
+    """Test daftar order menyertakan user dan item pesanan"""
+    _add_orders(dbsession, 1)
+    req = DummyRequest()
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    
+    response = order_list(req)
+    
+    order = response['orders'][0]
+    assert order['user']['email'] == 'test@test.com'
+    assert [item['nama_menu'] for item in order['items']] == ['Nasi Goreng', 'Es Teh']
+    assert order['items'][0]['harga'] == 25000
+
+
+def test_order_list_query_count_constant(dbsession, setup_test_data, query_counter):
+    """Test jumlah query order_list tidak bertambah seiring jumlah order"""
+    _add_orders(dbsession, 2)
+    response, few = _count_order_list_queries(dbsession, query_counter)
+    assert len(response['orders']) == 2
+    
+    _add_orders(dbsession, 20)
+    response, many = _count_order_list_queries(dbsession, query_counter)
+    assert len(response['orders']) == 22
+    
+    assert few == many
+    assert many <= 3
+
+
+def _order_list_request(dbsession, **params):
+    req = DummyRequest(params=params)
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    return req
+
+
+def test_order_list_cursor_pagination(dbsession, setup_test_data):
+    """Test pagination cursor mengembalikan semua order tanpa duplikat"""
+    _add_orders(dbsession, 5)
+    
+    seen = []
+    cursor = None
+    while True:
+        params = {'limit': '2'}
+        if cursor:
+            params['cursor'] = cursor
+        response = order_list(_order_list_request(dbsession, **params))
+        assert len(response['orders']) <= 2
+        seen.extend(o['order_id'] for o in response['orders'])
+        cursor = response['next_cursor']
+        if cursor is None:
+            break
+    
+    assert seen == [5, 4, 3, 2, 1]
+
+
+def test_order_list_without_limit_not_paginated(dbsession, setup_test_data):
+    """Test tanpa limit semua order dikirim (klien lama tidak mengikuti next_cursor)"""
+    _add_orders(dbsession, 60)
+    
+    response = order_list(_order_list_request(dbsession))
+    
+    assert len(response['orders']) == 60
+    assert response['next_cursor'] is None
+
+
+def test_order_list_filters(dbsession, setup_test_data):
+    """Test filter status, user_id, dan rentang tanggal"""
+    dbsession.add(Orders(user_id=1, status='selesai', total_harga=8000, pembayaran='cash',
+                         create_at=datetime.datetime(2025, 5, 1, 12, 0)))
+    dbsession.add(Orders(user_id=1, status='menunggu', total_harga=8000, pembayaran='cash',
+                         create_at=datetime.datetime(2025, 5, 2, 12, 0)))
+    dbsession.flush()
+    
+    response = order_list(_order_list_request(dbsession, status='selesai'))
+    assert [o['status'] for o in response['orders']] == ['selesai']
+    
+    response = order_list(_order_list_request(dbsession, date_from='2025-05-02', date_to='2025-05-02'))
+    assert [o['status'] for o in response['orders']] == ['menunggu']
+    
+    response = order_list(_order_list_request(dbsession, user_id='999'))
+    assert response['orders'] == []
+    assert response['next_cursor'] is None
+
+
+def test_order_list_invalid_cursor(dbsession, setup_test_data):
+    """Test cursor yang rusak ditolak"""
+    response = order_list(_order_list_request(dbsession, cursor='bukan-cursor'))
+    
+    assert isinstance(response, HTTPBadRequest)
+    assert 'Cursor tidak valid' in response.json_body['error']
+
+
+def test_order_list_expand(dbsession, setup_test_data, query_counter):
+    """Test expand memilih relasi yang dikirim pada daftar order"""
+    _add_orders(dbsession, 3)
+    dbsession.expire_all()
+    
+    response = order_list(_order_list_request(dbsession, fields='status,total_harga', expand='items'))
+    
+    order = response['orders'][0]
+    assert set(order) == {'order_id', 'status', 'total_harga', 'items'}
+    assert order['items'][0]['nama_menu'] == 'Nasi Goreng'
+    assert not any('users' in statement for statement in query_counter)
+
+
 def test_order_create_success(dbsession, setup_test_data):
     """Test buat order berhasil"""
     order_data = {
@@ -397,20 +614,148 @@ def test_order_create_success(dbsession, setup_test_data):
     req.response = DummyRequest()
     req.response.headers = {}
     
-    # Mock transaction.commit()
-    import backend.views.kantin
-    original_commit = backend.views.kantin.transaction.commit
-    backend.views.kantin.transaction.commit = lambda: None
-    
     response = order_create(req)
     
-    backend.views.kantin.transaction.commit = original_commit
-    
     assert response['success'] is True
     assert 'Pesanan berhasil dibuat' in response['message']
     assert response['order']['user_id'] == order_data['user_id']
 
 
+def _count_order_create_queries(dbsession, query_counter, items):
+    req = DummyRequest(json_body={'user_id': 1, 'pembayaran': 'cash', 'items': items})
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    
+    del query_counter[:]
+    response = order_create(req)
+    return response, len(query_counter)
+
+
+def test_order_create_query_count(dbsession, setup_test_data, query_counter):
+    """Test jumlah query order_create tidak bergantung pada jumlah item"""
+    items = [{'menu_id': 1 + i % 2, 'jumlah': 1} for i in range(30)]
+    response, many = _count_order_create_queries(dbsession, query_counter, items)
+    
+    assert response['success'] is True
+    assert response['order']['total_harga'] == 15 * 25000 + 15 * 8000
+    assert dbsession.query(OrderDetails).filter_by(
+        order_id=response['order']['order_id']).count() == 30
+    
+    response, few = _count_order_create_queries(
+        dbsession, query_counter, [{'menu_id': 1, 'jumlah': 2}])
+    assert response['success'] is True
+    assert few == many
+    assert many <= 6
+
+
+def test_order_create_invalid_menu(dbsession, setup_test_data):
+    """Test buat order gagal karena menu tidak ditemukan"""
+    order_data = {
+        'user_id': 1,
+        'pembayaran': 'cash',
+        'items': [{'menu_id': 1, 'jumlah': 1}, {'menu_id': 999, 'jumlah': 1}]
+    }
+    
+    req = DummyRequest(json_body=order_data)
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    
+    response = order_create(req)
+    
+    assert isinstance(response, HTTPBadRequest)
+    assert 'Menu dengan ID 999 tidak ditemukan' in response.json_body['error']
+    assert dbsession.query(Orders).count() == 0
+
+
+def _idempotent_order_request(dbsession, key, items):
+    req = DummyRequest(
+        json_body={'user_id': 1, 'pembayaran': 'cash', 'items': items},
+        headers={'Idempotency-Key': key},
+    )
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+    return req
+
+
+def test_order_create_idempotency_replay(dbsession, setup_test_data, query_counter):
+    """Test request ulang dengan Idempotency-Key yang sama tidak membuat order baru"""
+    items = [{'menu_id': 1, 'jumlah': 2}]
+    first = order_create(_idempotent_order_request(dbsession, 'key-1', items))
+    dbsession.flush()
+    
+    del query_counter[:]
+    req = _idempotent_order_request(dbsession, 'key-1', items)
+    second = order_create(req)
+    replay_queries = len(query_counter)
+    
+    other = order_create(_idempotent_order_request(dbsession, 'key-2', items))
+    
+    assert second == first
+    assert req.response.headers['Idempotent-Replayed'] == 'true'
+    assert replay_queries == 1
+    assert other['order']['order_id'] != first['order']['order_id']
+    assert dbsession.query(Orders).count() == 2
+
+
+def test_order_create_idempotency_key_reused(dbsession, setup_test_data):
+    """Test Idempotency-Key yang dipakai untuk isi pesanan berbeda ditolak"""
+    order_create(_idempotent_order_request(dbsession, 'key-1', [{'menu_id': 1, 'jumlah': 1}]))
+    response = order_create(_idempotent_order_request(dbsession, 'key-1', [{'menu_id': 2, 'jumlah': 1}]))
+    
+    assert isinstance(response, HTTPUnprocessableEntity)
+    assert dbsession.query(Orders).count() == 1
+
+
+def test_order_create_idempotency_key_expired(dbsession, setup_test_data):
+    """Test key yang sudah lewat TTL tidak di-replay"""
+    from backend.models import IdempotencyKey
+    items = [{'menu_id': 1, 'jumlah': 1}]
+    order_create(_idempotent_order_request(dbsession, 'key-1', items))
+    dbsession.query(IdempotencyKey).update(
+        {'create_at': datetime.datetime.now() - datetime.timedelta(days=2)})
+    response = order_create(_idempotent_order_request(dbsession, 'key-1', items))
+    
+    assert response['success'] is True
+    assert dbsession.query(Orders).count() == 2
+    assert dbsession.query(IdempotencyKey).count() == 1
+
+
+def test_order_create_idempotency_key_race(dbsession, setup_test_data, monkeypatch):
+    """Test request dengan key sama yang commit lebih dulu dijawab 409 tanpa membuat order"""
+    from backend.models import IdempotencyKey
+    dbsession.add(IdempotencyKey(key='key-1', fingerprint='lain', response='{}'))
+    dbsession.commit()
+    # Request ini sudah melewati find_response sebelum request lain commit
+    monkeypatch.setattr('backend.views.kantin.find_response', lambda *args: None)
+    
+    response = order_create(_idempotent_order_request(dbsession, 'key-1', [{'menu_id': 1, 'jumlah': 1}]))
+    
+    assert isinstance(response, HTTPConflict)
+    assert dbsession.query(Orders).count() == 0
+
+
+def test_order_create_idempotency_key_race_dooms_transaction(dbsession, setup_test_data, monkeypatch):
+    """Test bentrok key membatalkan transaksi request (pyramid_tm) agar order tidak di-commit"""
+    import transaction
+    from backend.models import IdempotencyKey
+    dbsession.add(IdempotencyKey(key='key-1', fingerprint='lain', response='{}'))
+    dbsession.commit()
+    monkeypatch.setattr('backend.views.kantin.find_response', lambda *args: None)
+    req = _idempotent_order_request(dbsession, 'key-1', [{'menu_id': 1, 'jumlah': 1}])
+    req.tm = transaction.TransactionManager(explicit=True)
+    req.tm.begin()
+    
+    try:
+        response = order_create(req)
+        assert isinstance(response, HTTPConflict)
+        assert req.tm.isDoomed()
+    finally:
+        req.tm.abort()
+
+
 def test_order_create_missing_field(dbsession):
     """Test buat order gagal karena field tidak lengkap"""
     incomplete_data = {'user_id': 1}
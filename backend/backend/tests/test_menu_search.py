@@ -0,0 +1,196 @@
+import pytest
+from pyramid.testing import DummyRequest
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.registry import Registry
+
+from backend.search import MenuSearchIndex, edit_distance, fold
+from backend.views.kantin import menu_search, menu_add, menu_delete
+from backend.models import Menu, Kategori
+
+
+def _payload(menu_id, nama_menu, deskripsi=None):
+    return {'menu_id': menu_id, 'nama_menu': nama_menu, 'deskripsi': deskripsi}
+
+
+@pytest.fixture
+def index():
+    index = MenuSearchIndex()
+    index.update(1, _payload(1, 'Nasi Goreng', 'Nasi goreng spesial dengan telur'))
+    index.update(2, _payload(2, 'Sâté Ayam', 'Sate ayam bumbu kacang'))
+    index.update(3, _payload(3, 'Es Teh Manis'))
+    index.update(4, _payload(4, 'Mie Goreng', 'Mie goreng pedas'))
+    index.update(5, _payload(5, 'Ayam Bakar', 'Disajikan dengan nasi'))
+    return index
+
+
+def _ids(result):
+    return [menu['menu_id'] for menu in result[1]]
+
+
+def test_fold_removes_diacritics():
+    """Test normalisasi huruf kecil dan diakritik"""
+    assert fold('Sâté AYAM') == 'sate ayam'
+
+
+def test_edit_distance():
+    """Test jarak edit termasuk transposisi dan batas"""
+    assert edit_distance('goreng', 'goreng', 2) == 0
+    assert edit_distance('gorng', 'goreng', 2) == 1
+    assert edit_distance('gorneg', 'goreng', 2) == 1
+    assert edit_distance('bakso', 'goreng', 2) == 3
+
+
+def test_search_diacritics_and_case(index):
+    """Test pencarian tanpa diakritik menemukan menu berdiakritik"""
+    assert _ids(index.search('SATE')) == [2]
+
+
+def test_search_typo_tolerance(index):
+    """Test pencarian menoleransi salah ketik"""
+    assert _ids(index.search('nasi gorneg')) == [1]
+    assert _ids(index.search('bakr')) == [5]
+
+
+def test_search_prefix(index):
+    """Test pencarian dengan awalan kata"""
+    assert set(_ids(index.search('gor'))) == {1, 4}
+
+
+def test_search_ranking(index):
+    """Test kecocokan di nama diurutkan sebelum kecocokan di deskripsi"""
+    total, menus = index.search('nasi')
+    assert total == 2
+    assert [m['menu_id'] for m in menus] == [1, 5]
+
+    total, menus = index.search('ayam')
+    assert [m['menu_id'] for m in menus] == [5, 2]
+
+
+def test_search_requires_all_tokens(index):
+    """Test semua kata query harus cocok"""
+    assert _ids(index.search('ayam goreng')) == []
+    assert index.search('   ') == (0, [])
+
+
+def test_search_limit(index):
+    """Test jumlah hasil dibatasi limit tanpa mengubah total"""
+    total, menus = index.search('goreng', limit=1)
+    assert total == 2
+    assert len(menus) == 1
+
+
+def test_index_update_and_remove(index):
+    """Test indeks diperbarui per menu"""
+    index.update(3, _payload(3, 'Es Jeruk'))
+    assert _ids(index.search('teh')) == []
+    assert _ids(index.search('jeruk')) == [3]
+
+    index.remove(3)
+    assert _ids(index.search('jeruk')) == []
+    assert len(index) == 4
+
+
+@pytest.fixture
+def setup_menu(dbsession):
+    dbsession.add(Kategori(kategori_id=1, nama_kategori='Makanan', icon='🍽️'))
+    dbsession.add(Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000))
+    dbsession.add(Menu(menu_id=2, kategori_id=1, nama_menu='Mie Ayam', harga=15000))
+    dbsession.flush()
+
+
+@pytest.fixture
+def search_registry():
+    registry = Registry()
+    registry.settings = {}
+    registry['menu_search'] = MenuSearchIndex()
+    return registry
+
+
+def _request(dbsession, registry=None, **kwargs):
+    req = DummyRequest(**kwargs)
+    if registry is not None:
+        req.registry = registry
+    req.dbsession = dbsession
+    return req
+
+
+def test_menu_search_view(dbsession, setup_menu):
+    """Test view pencarian menu"""
+    response = menu_search(_request(dbsession, params={'q': 'goreng'}))
+
+    assert response['total'] == 1
+    assert response['menus'][0]['nama_menu'] == 'Nasi Goreng'
+    assert response['menus'][0]['kategori']['nama_kategori'] == 'Makanan'
+
+
+def test_menu_search_view_missing_query(dbsession):
+    """Test pencarian tanpa parameter q"""
+    response = menu_search(_request(dbsession, params={}))
+    assert isinstance(response, HTTPBadRequest)
+
+
+def test_menu_search_incremental_update(dbsession, setup_menu, search_registry, query_counter):
+    """Test indeks registry diperbarui oleh view menu tanpa dibangun ulang"""
+    menu_search(_request(dbsession, search_registry, params={'q': 'mie'}))
+
+    req = _request(dbsession, search_registry, json_body={
+        'nama_menu': 'Mie Goreng Jawa', 'kategori_id': 1, 'harga': 18000})
+    req.response = DummyRequest()
+    req.response.headers = {}
+    menu_add(req)
+
+    req = _request(dbsession, search_registry, matchdict={'id': '2'})
+    req.response = DummyRequest()
+    req.response.headers = {}
+    menu_delete(req)
+
+    del query_counter[:]
+    response = menu_search(_request(dbsession, search_registry, params={'q': 'mie'}))
+
+    assert query_counter == []
+    assert [m['nama_menu'] for m in response['menus']] == ['Mie Goreng Jawa']
+
+
+def test_background_rebuild_serves_old_index(tmp_path):
+    """Test rebuild berkala berjalan di latar belakang, satu per satu, tanpa
+    kehilangan perubahan yang masuk selama rebuild"""
+    import threading
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from backend.models.meta import Base
+
+    engine = create_engine('sqlite:///{}'.format(tmp_path / 'search.sqlite'))
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    dbsession = session_factory()
+    dbsession.add(Kategori(kategori_id=1, nama_kategori='Makanan'))
+    dbsession.add(Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000))
+    dbsession.commit()
+
+    release = threading.Event()
+    calls = []
+
+    def slow_factory():
+        calls.append(1)
+        release.wait(5)
+        return session_factory()
+
+    index = MenuSearchIndex(rebuild_interval=0)
+    index.ensure_built(dbsession, slow_factory)
+    assert calls == []  # pembangunan pertama langsung dari session request
+
+    dbsession.add(Menu(menu_id=2, kategori_id=1, nama_menu='Mie Goreng', harga=15000))
+    dbsession.commit()
+
+    index.ensure_built(dbsession, slow_factory)
+    index.ensure_built(dbsession, slow_factory)
+    assert _ids(index.search('goreng')) == [1]
+    index.update(3, _payload(3, 'Tahu Goreng'))
+
+    release.set()
+    index._rebuild_thread.join(5)
+
+    assert calls == [1]
+    assert sorted(_ids(index.search('goreng'))) == [1, 2, 3]
+    dbsession.close()
+    engine.dispose()
@@ -0,0 +1,98 @@
+import threading
+
+from pyramid import testing
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+
+from backend.metrics import RequestMetrics, metrics_tween_factory
+
+
+class _Route(object):
+    def __init__(self, name):
+        self.name = name
+
+
+def test_histogram_and_counters():
+    """Test histogram latensi kumulatif serta counter request dan error"""
+    metrics = RequestMetrics(buckets=(0.1, 1))
+    metrics.observe('order_create', 'POST', 201, 0.05)
+    metrics.observe('order_create', 'POST', 201, 0.5)
+    metrics.observe('order_create', 'POST', 500, 3)
+
+    text = metrics.render()
+
+    assert 'kantin_http_requests_total{route="order_create",method="POST",status="201"} 2' in text
+    assert 'kantin_http_request_errors_total{route="order_create"} 1' in text
+    assert 'kantin_http_request_duration_seconds_bucket{route="order_create",le="0.1"} 1' in text
+    assert 'kantin_http_request_duration_seconds_bucket{route="order_create",le="1"} 2' in text
+    assert 'kantin_http_request_duration_seconds_bucket{route="order_create",le="+Inf"} 3' in text
+    assert 'kantin_http_request_duration_seconds_sum{route="order_create"} 3.550000' in text
+    assert 'kantin_http_request_duration_seconds_count{route="order_create"} 3' in text
+
+
+def test_per_thread_shards_merged():
+    """Test catatan dari banyak thread digabung saat metrik dibaca"""
+    metrics = RequestMetrics()
+
+    def worker():
+        for _ in range(1000):
+            metrics.observe('menu_list', 'GET', 200, 0.001)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(metrics._shards) == 4
+    assert 'kantin_http_requests_total{route="menu_list",method="GET",status="200"} 4000' in metrics.render()
+
+
+def test_unknown_method_and_escaping():
+    """Test method di luar standar digabung ke 'other' dan nilai label di-escape"""
+    metrics = RequestMetrics()
+    metrics.observe('menu_list', 'FOO', 405, 0.001)
+    metrics.observe('menu_list', 'BAR"}\n', 405, 0.001)
+    metrics.observe('a"b\\c', 'GET', 200, 0.001)
+
+    text = metrics.render()
+
+    assert 'kantin_http_requests_total{route="menu_list",method="other",status="405"} 2' in text
+    assert 'FOO' not in text and 'BAR' not in text
+    assert 'route="a\\"b\\\\c",method="GET"' in text
+
+
+def test_tween_labels_route_name():
+    """Test tween memberi label nama route, atau 'unmatched' bila tidak ada route"""
+    def handler(request):
+        if request.path == '/api/menu':
+            request.matched_route = _Route('menu_list')
+            return Response('ok')
+        return Response('x', status=404)
+
+    registry = Registry()
+    registry['request_metrics'] = metrics = RequestMetrics()
+    tween = metrics_tween_factory(handler, registry)
+    tween(Request.blank('/api/menu'))
+    tween(Request.blank('/tidak-ada'))
+
+    text = metrics.render()
+    assert 'route="menu_list",method="GET",status="200"} 1' in text
+    assert 'route="unmatched",method="GET",status="404"} 1' in text
+
+
+def test_metrics_view():
+    """Test endpoint /metrics menghasilkan teks Prometheus"""
+    from backend.views.internal import metrics as metrics_view
+
+    registry = Registry()
+    registry['request_metrics'] = metrics = RequestMetrics()
+    metrics.observe('login', 'POST', 200, 0.2)
+    request = testing.DummyRequest()
+    request.registry = registry
+
+    response = metrics_view(request)
+
+    assert response.content_type == 'text/plain'
+    assert 'route="login"' in response.text
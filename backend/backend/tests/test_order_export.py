@@ -0,0 +1,127 @@
+import csv
+import datetime
+import io
+import json
+
+import pytest
+from pyramid.testing import DummyRequest
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.registry import Registry
+from sqlalchemy.orm import sessionmaker
+
+from backend.views.export import order_export
+from backend.renderers import get_dumps
+from backend.models import Menu, Kategori, Users, Orders, OrderDetails, Roles
+
+
+@pytest.fixture
+def setup_orders(dbsession):
+    dbsession.add(Roles(role_id=1, role_name='customer', permissions='read,order'))
+    dbsession.add(Kategori(kategori_id=1, nama_kategori='Makanan', icon='🍽️'))
+    dbsession.add(Users(user_id=1, role_id=1, nama_lengkap='Test User', email='test@test.com',
+                        password='password123'))
+    dbsession.add(Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000))
+    for day in range(1, 6):
+        order = Orders(user_id=1, status='cancelled' if day == 3 else 'completed',
+                       total_harga=50000, pembayaran='cash',
+                       create_at=datetime.datetime(2025, 5, day, 12, 0))
+        order.order_details = [OrderDetails(menu_id=1, jumlah=2, subtotal=50000)]
+        dbsession.add(order)
+    # Export membaca dengan sesi sendiri, jadi data harus sudah di-commit
+    dbsession.commit()
+
+
+class _SessionFactory(object):
+    """Factory sesi export yang mencatat apakah sesinya sudah ditutup"""
+
+    def __init__(self, bind):
+        self.factory = sessionmaker(bind=bind)
+        self.closed = []
+
+    def __call__(self):
+        session = self.factory()
+        close = session.close
+
+        def tracked_close():
+            self.closed.append(session)
+            close()
+
+        session.close = tracked_close
+        return session
+
+
+def _export_request(dbsession, **params):
+    registry = Registry()
+    registry.settings = {'orders.export.batch_size': '2'}
+    registry['dbsession_factory'] = _SessionFactory(dbsession.get_bind())
+    req = DummyRequest(params=params)
+    req.registry = registry
+    return req
+
+
+def test_order_export_csv(dbsession, setup_orders):
+    """Test export CSV berisi header dan semua order secara kronologis"""
+    req = _export_request(dbsession)
+    response = order_export(req)
+
+    assert response.content_type == 'text/csv'
+    assert 'attachment' in response.content_disposition
+    chunks = list(response.app_iter)
+    # Header, lalu satu chunk per batch (2 baris)
+    assert len(chunks) == 4
+
+    rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert [int(r['order_id']) for r in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]['create_at'] == '2025-05-01T12:00:00'
+    assert rows[0]['jumlah_item'] == '2'
+    assert rows[0]['nama_lengkap'] == 'Test User'
+    assert len(req.registry['dbsession_factory'].closed) == 1
+
+
+def test_order_export_ndjson_filters(dbsession, setup_orders):
+    """Test export NDJSON dengan filter tanggal dan status"""
+    response = order_export(_export_request(
+        dbsession, format='ndjson', date_from='2025-05-02', date_to='2025-05-04', status='completed'))
+
+    assert response.content_type == 'application/x-ndjson'
+    rows = [json.loads(line) for line in b''.join(response.app_iter).splitlines()]
+    assert [r['order_id'] for r in rows] == [2, 4]
+    assert rows[0]['create_at'] == '2025-05-02T12:00:00'
+    assert rows[0]['total_harga'] == 50000
+
+
+def test_order_export_ndjson_uses_registry_dumps(dbsession, setup_orders):
+    """Test NDJSON ditulis dengan encoder renderer yang dipasang di registry"""
+    encoded = []
+    json_dumps = get_dumps('json')
+
+    def dumps(value):
+        encoded.append(value)
+        return json_dumps(value)
+
+    req = _export_request(dbsession, format='ndjson')
+    req.registry['json_dumps'] = dumps
+    lines = b''.join(order_export(req).app_iter).splitlines()
+
+    assert len(encoded) == len(lines) == 5
+    assert json.loads(lines[0])['order_id'] == 1
+
+
+def test_order_export_streams_before_query(dbsession, setup_orders, query_counter):
+    """Test header CSV terkirim sebelum query dijalankan"""
+    req = _export_request(dbsession)
+    response = order_export(req)
+
+    del query_counter[:]
+    assert next(response.app_iter).startswith(b'order_id,create_at')
+    assert query_counter == []
+
+    # Klien memutus koneksi: sesi export tetap ditutup
+    response.app_iter.close()
+    assert len(req.registry['dbsession_factory'].closed) == 1
+
+
+def test_order_export_invalid_params(dbsession):
+    """Test format dan tanggal yang tidak valid ditolak"""
+    assert isinstance(order_export(_export_request(dbsession, format='xlsx')), HTTPBadRequest)
+    assert isinstance(order_export(_export_request(dbsession, date_from='kemarin')), HTTPBadRequest)
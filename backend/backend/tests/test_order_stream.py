@@ -0,0 +1,135 @@
+import threading
+from pyramid.testing import DummyRequest
+from pyramid.registry import Registry
+
+from backend.events import InProcessBroker, ORDER_STATUS_CHANGED
+from backend.views.stream import order_stream, waiter_capacity
+from backend.views.kantin import order_update
+from backend.models import Users, Orders, Roles
+
+
+def _stream_request(broker, headers=None, **settings):
+    registry = Registry()
+    registry.settings = dict({'orders.stream.max_wait': '0'}, **settings)
+    registry['order_events'] = broker
+    req = DummyRequest(headers=headers or {})
+    req.registry = registry
+    return req
+
+
+def _body(response):
+    return b''.join(response.app_iter).decode('utf-8')
+
+
+def test_broker_events_after():
+    """Test broker mengembalikan event setelah id tertentu"""
+    broker = InProcessBroker(history=2)
+    for i in range(3):
+        broker.publish('test', {'i': i})
+
+    assert [e.data['i'] for e in broker.events_after(1)] == [1, 2]
+    assert broker.events_after(3) == []
+    # Event pertama sudah terbuang dari buffer
+    assert broker.events_after(0) is None
+
+
+def test_broker_wait_wakes_on_publish():
+    """Test wait langsung kembali saat ada event baru"""
+    broker = InProcessBroker()
+    timer = threading.Timer(0.05, broker.publish, args=('test', {}))
+    timer.start()
+
+    events = broker.wait(0, timeout=5)
+
+    assert [e.id for e in events] == [1]
+
+
+def test_order_stream_new_client():
+    """Test klien baru tidak menerima riwayat lama"""
+    broker = InProcessBroker()
+    broker.publish('test', {})
+
+    response = order_stream(_stream_request(broker))
+
+    assert response.content_type == 'text/event-stream'
+    assert _body(response) == 'retry: 2000\nid: 1\n\n'
+
+
+def test_order_stream_replays_after_last_event_id():
+    """Test event sejak Last-Event-ID dikirim ulang"""
+    broker = InProcessBroker()
+    broker.publish('test', {'n': 1})
+    broker.publish(ORDER_STATUS_CHANGED, {'order_id': 7, 'status': 'completed'})
+
+    response = order_stream(_stream_request(broker, headers={'Last-Event-ID': '1'}))
+
+    assert _body(response) == (
+        'retry: 2000\n'
+        'id: 2\nevent: order_status_changed\n'
+        'data: {"order_id":7,"status":"completed"}\n\n'
+    )
+
+
+def test_order_stream_resync_when_history_lost():
+    """Test klien diminta memuat ulang bila event sudah terbuang"""
+    broker = InProcessBroker(history=1)
+    for _ in range(3):
+        broker.publish('test', {})
+
+    response = order_stream(_stream_request(broker, headers={'Last-Event-ID': '1'}))
+
+    assert 'event: resync' in _body(response)
+
+
+def test_order_stream_waits_for_event():
+    """Test koneksi menunggu event baru selama slot tersedia"""
+    broker = InProcessBroker()
+    response = order_stream(_stream_request(broker, **{'orders.stream.max_wait': '5'}))
+    timer = threading.Timer(0.05, broker.publish, args=('test', {'ok': True}))
+    timer.start()
+
+    body = _body(response)
+
+    assert 'id: 1\nevent: test\ndata: {"ok":true}\n\n' in body
+
+
+def test_waiter_capacity_leaves_threads_free():
+    """Test jumlah koneksi yang menunggu menyisakan thread waitress untuk request biasa"""
+    assert waiter_capacity(threads=4) == 1
+    assert waiter_capacity(threads=8) == 5
+    assert waiter_capacity(max_waiters=2, threads=8) == 2
+    assert waiter_capacity(max_waiters=10, threads=4) == 1
+    assert waiter_capacity(threads=2) == 0
+    assert waiter_capacity() == 1
+
+
+def test_order_stream_no_wait_without_spare_threads():
+    """Test koneksi langsung ditutup bila tidak ada thread yang boleh menunggu"""
+    broker = InProcessBroker()
+    response = order_stream(_stream_request(
+        broker, **{'orders.stream.max_wait': '5', 'waitress.threads': '3'}))
+
+    assert _body(response) == 'retry: 2000\nid: 0\n\n'
+
+
+def test_order_update_publishes_event(dbsession):
+    """Test perubahan status order mengirim event"""
+    dbsession.add(Roles(role_id=1, role_name='customer', permissions='read,order'))
+    dbsession.add(Users(user_id=1, role_id=1, nama_lengkap='Test User',
+                        email='test@test.com', password='password123'))
+    dbsession.add(Orders(order_id=1, user_id=1, status='pending', total_harga=0))
+    dbsession.flush()
+
+    broker = InProcessBroker()
+    req = _stream_request(broker)
+    req.matchdict = {'id': '1'}
+    req.json_body = {'status': 'completed'}
+    req.dbsession = dbsession
+    req.response = DummyRequest()
+    req.response.headers = {}
+
+    order_update(req)
+
+    event, = broker.events_after(0)
+    assert event.type == ORDER_STATUS_CHANGED
+    assert event.data == {'order_id': 1, 'status': 'completed', 'previous_status': 'pending'}
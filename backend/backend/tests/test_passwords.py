@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+from pyramid.registry import Registry
+from pyramid.testing import DummyRequest
+
+from backend.models import Roles, Users
+from backend import main
+from backend.passwords import PasswordHasher, PasswordHasherBusy, hasher_capacity
+from backend.scripts.bench_passwords import bench
+from backend.views.auth import login
+from backend.views.kantin import user_register
+
+
+def _request(dbsession, hasher, json_body):
+    registry = Registry()
+    registry['password_hasher'] = hasher
+    req = DummyRequest(json_body=json_body)
+    req.registry = registry
+    req.dbsession = dbsession
+    return req
+
+
+def test_hash_and_verify():
+    """Test hash bcrypt dapat diverifikasi dan memakai cost yang diatur"""
+    hasher = PasswordHasher(rounds=4)
+    hashed = hasher.hash('password123')
+
+    assert hashed.startswith('$2b$04$')
+    assert hasher.verify('password123', hashed)
+    assert not hasher.verify('salah', hashed)
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=5).needs_rehash(hashed)
+
+
+def test_legacy_plaintext_password():
+    """Test password teks biasa lama tetap bisa login dan perlu di-rehash"""
+    hasher = PasswordHasher(rounds=4)
+
+    assert hasher.verify('admin123', 'admin123')
+    assert not hasher.verify('admin12', 'admin123')
+    assert hasher.needs_rehash('admin123')
+
+
+def test_busy_when_queue_full():
+    """Test hash ditolak (bukan diantrekan) bila executor dan antrean penuh"""
+    hasher = PasswordHasher(rounds=4, workers=1, queue=0)
+    release = threading.Event()
+    blocker = threading.Thread(target=hasher._run, args=(release.wait,))
+    blocker.start()
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash('password123')
+    finally:
+        release.set()
+        blocker.join()
+
+    assert hasher.verify('password123', hasher.hash('password123'))
+
+
+@pytest.mark.parametrize('workers, queue, threads, expected', [
+    (2, None, 4, (2, 1)),
+    (2, None, 2, (1, 0)),
+    (2, None, 1, (1, 0)),
+    (2, 5, 4, (2, 5)),
+    (2, None, None, (2, 16)),
+])
+def test_hasher_capacity(workers, queue, threads, expected):
+    """Test worker + antrean hash dibatasi threads - 1 kecuali antrean diatur manual"""
+    assert hasher_capacity(workers, queue, threads) == expected
+
+
+def test_hash_queue_from_server_threads(tmp_path):
+    """Test antrean hash dihitung dari [server:main] threads di file ini"""
+    ini = tmp_path / 'app.ini'
+    ini.write_text('[server:main]\nuse = egg:waitress#main\nthreads = 6\n')
+
+    app = main({'__file__': str(ini)}, **{
+        'sqlalchemy.url': 'sqlite://', 'auth.secret': 'rahasia-untuk-test-minimal-32-byte'})
+
+    assert app.registry.settings['waitress.threads'] == '6'
+    assert app.registry['password_hasher']._slots._value == 5
+
+
+def test_login_rehashes_password(dbsession):
+    """Test login dengan password teks biasa atau cost lama menyimpan hash baru"""
+    dbsession.add(Roles(role_id=1, role_name='customer', permissions='read'))
+    dbsession.add(Users(user_id=1, role_id=1, nama_lengkap='User', email='u@test.com',
+                        password='password123', is_active=True))
+    dbsession.flush()
+    body = {'email': 'u@test.com', 'password': 'password123'}
+
+    login(_request(dbsession, PasswordHasher(rounds=4), body))
+    user = dbsession.get(Users, 1)
+    assert user.password.startswith('$2b$04$')
+
+    login(_request(dbsession, PasswordHasher(rounds=5), body))
+    assert user.password.startswith('$2b$05$')
+
+    response = login(_request(dbsession, PasswordHasher(rounds=5), dict(body, password='salah')))
+    assert response.status_code == 400
+
+
+def test_register_stores_hash(dbsession):
+    """Test registrasi menyimpan hash bcrypt, bukan password asli"""
+    hasher = PasswordHasher(rounds=4)
+    response = user_register(_request(dbsession, hasher, {
+        'nama_lengkap': 'Baru', 'email': 'baru@test.com', 'password': 'rahasia1'}))
+
+    user = dbsession.get(Users, response['user']['user_id'])
+    assert user.password != 'rahasia1'
+    assert hasher.verify('rahasia1', user.password)
+
+
+def test_benchmark_runs():
+    """Test benchmark login menghasilkan throughput dan menutup thread bcrypt"""
+    def bcrypt_threads():
+        return {t for t in threading.enumerate() if t.name.startswith('bcrypt')}
+
+    before = bcrypt_threads()
+    rate, latency, busy = bench(rounds=4, workers=1, threads=2, logins=4)
+
+    assert rate > 0 and latency > 0 and busy == 0
+    assert bcrypt_threads() <= before
+
+
+def test_shutdown_stops_executor():
+    """Test hasher sebagai context manager mematikan executor saat keluar"""
+    with PasswordHasher(rounds=4, workers=1) as hasher:
+        hashed = hasher.hash('password123')
+
+    with pytest.raises(RuntimeError):
+        hasher.verify('password123', hashed)
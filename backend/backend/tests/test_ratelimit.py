@@ -0,0 +1,134 @@
+import json
+
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+
+from backend.ratelimit import (
+    InMemoryBucketStore,
+    client_ip,
+    parse_limit,
+    parse_networks,
+    ratelimit_tween_factory,
+)
+
+
+def _tween(ip_store=None, email_store=None, **settings):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return Response('ok')
+
+    registry = Registry()
+    registry.settings = settings
+    registry['ratelimit_ip_store'] = InMemoryBucketStore() if ip_store is None else ip_store
+    registry['ratelimit_email_store'] = (
+        InMemoryBucketStore() if email_store is None else email_store)
+    return ratelimit_tween_factory(handler, registry), calls
+
+
+def _login(email, ip='10.0.0.1', path='/api/login', forwarded=None):
+    request = Request.blank(path, method='POST', body=json.dumps({'email': email, 'password': 'x'}).encode('utf-8'),
+                            content_type='application/json')
+    request.remote_addr = ip
+    if forwarded is not None:
+        request.headers['X-Forwarded-For'] = forwarded
+    return request
+
+
+def test_token_bucket_refills():
+    """Test bucket mengizinkan burst lalu terisi kembali sesuai rate"""
+    store = InMemoryBucketStore()
+
+    assert store.take('k', 1, 2, now=0) == (True, 0)
+    assert store.take('k', 1, 2, now=0) == (True, 0)
+    allowed, retry_after = store.take('k', 1, 2, now=0.25)
+    assert not allowed and retry_after == 0.75
+    assert store.take('k', 1, 2, now=1.25)[0]
+
+
+def test_store_bounded():
+    """Test jumlah key dibatasi dengan membuang key yang paling lama tidak dipakai"""
+    store = InMemoryBucketStore(max_keys=3)
+    for i in range(10):
+        store.take('ip:{}'.format(i), 1, 1, now=0)
+
+    assert len(store) == 3
+
+
+def test_parse_limit():
+    assert parse_limit('20/60') == (20 / 60, 20)
+    assert parse_limit('0/60') is None
+    assert parse_limit('') is None
+
+
+def test_email_limited_across_ips():
+    """Test percobaan untuk satu email dibatasi walau dari IP berbeda, tanpa memanggil handler"""
+    tween, calls = _tween(**{'ratelimit.per_email': '3/60'})
+
+    for i in range(3):
+        assert tween(_login('Korban@Test.com', ip='10.0.0.{}'.format(i))).status_code == 200
+    response = tween(_login('korban@test.com ', ip='10.0.0.9'))
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert len(calls) == 3
+    assert tween(_login('lain@test.com', ip='10.0.0.9')).status_code == 200
+
+
+def test_ip_limited_and_other_paths_untouched():
+    """Test IP dibatasi lintas email; path lain tidak dibatasi"""
+    tween, calls = _tween(**{'ratelimit.per_ip': '2/60'})
+
+    assert tween(_login('a@test.com')).status_code == 200
+    assert tween(_login('b@test.com')).status_code == 200
+    assert tween(_login('c@test.com')).status_code == 429
+    assert tween(_login('c@test.com', ip='10.0.0.2')).status_code == 200
+    for _ in range(5):
+        assert tween(_login('a@test.com', path='/api/orders')).status_code == 200
+
+
+def test_shared_store_between_workers():
+    """Test store yang sama dipakai dua worker (simulasi store bersama)"""
+    shared = InMemoryBucketStore()
+    worker_a, _ = _tween(email_store=shared, **{'ratelimit.per_email': '2/60'})
+    worker_b, _ = _tween(email_store=shared, **{'ratelimit.per_email': '2/60'})
+
+    assert worker_a(_login('x@test.com')).status_code == 200
+    assert worker_b(_login('x@test.com', ip='10.0.0.2')).status_code == 200
+    assert worker_a(_login('x@test.com', ip='10.0.0.3')).status_code == 429
+
+
+def test_forwarded_for_ignored_without_trusted_proxy():
+    """Test X-Forwarded-For palsu tidak bisa dipakai untuk berganti bucket IP"""
+    tween, _ = _tween(**{'ratelimit.per_ip': '2/60', 'ratelimit.per_email': ''})
+
+    for i in range(2):
+        assert tween(_login('a@test.com', forwarded='1.2.3.{}'.format(i))).status_code == 200
+    assert tween(_login('a@test.com', forwarded='1.2.3.9')).status_code == 429
+
+
+def test_client_ip_from_trusted_proxy():
+    """Test hop paling kanan yang bukan proxy tepercaya dipakai sebagai IP klien"""
+    trusted = parse_networks('127.0.0.1 10.0.0.0/8')
+
+    request = _login('a@test.com', ip='127.0.0.1', forwarded='6.6.6.6, 203.0.113.5, 10.1.1.1')
+    assert client_ip(request, trusted) == '203.0.113.5'
+    assert client_ip(request) == '127.0.0.1'
+    request = _login('a@test.com', ip='198.51.100.7', forwarded='203.0.113.5')
+    assert client_ip(request, trusted) == '198.51.100.7'
+
+
+def test_ip_and_email_stores_separate():
+    """Test email acak mengisi store email sendiri, bukan LRU bucket IP"""
+    ip_store, email_store = InMemoryBucketStore(), InMemoryBucketStore(max_keys=2)
+    tween, _ = _tween(ip_store, email_store, **{'ratelimit.per_ip': '2/60'})
+
+    assert tween(_login('a@test.com')).status_code == 200
+    for i in range(5):
+        email_store.take('email:/api/login:acak{}@test.com'.format(i), 1, 1)
+
+    assert len(ip_store) == 1
+    assert tween(_login('b@test.com')).status_code == 200
+    assert tween(_login('c@test.com')).status_code == 429
@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+from pyramid.registry import Registry
+from pyramid.testing import DummyRequest
+
+from backend.models import Roles, Users
+from backend.roles import RoleRegistry, UserRoleCache
+from backend.views.auth import login
+
+
+def _roles(dbsession):
+    dbsession.add(Roles(role_id=1, role_name='pembeli', permissions='read, order'))
+    dbsession.add(Roles(role_id=2, role_name='Admin', permissions='all'))
+    dbsession.commit()
+
+
+def test_principals_from_cache(dbsession, query_counter):
+    """Test principal role dan permission dibaca dari cache tanpa query berulang"""
+    _roles(dbsession)
+    roles = RoleRegistry()
+    roles.load(dbsession)
+    del query_counter[:]
+
+    assert roles.principals(1, dbsession) == ['role:pembeli', 'perm:order', 'perm:read']
+    assert roles.principals(2, dbsession) == ['role:admin', 'perm:all']
+    assert roles.principals(99, dbsession) == []
+    assert query_counter == []
+
+
+def test_reload_after_committed_change(dbsession):
+    """Test cache dimuat ulang setelah perubahan Roles di-commit, bukan sebelum"""
+    _roles(dbsession)
+    roles = RoleRegistry()
+    roles.load(dbsession)
+
+    dbsession.get(Roles, 1).permissions = 'read'
+    dbsession.flush()
+    assert not roles.stale()
+
+    dbsession.commit()
+    assert roles.stale()
+    assert roles.get(1, dbsession).permissions == frozenset(['read'])
+    assert not roles.stale()
+
+
+def test_reload_after_interval(dbsession):
+    """Test cache dimuat ulang setelah refresh_interval (perubahan dari proses lain)"""
+    _roles(dbsession)
+    roles = RoleRegistry(refresh_interval=60)
+    roles.load(dbsession)
+
+    with patch('backend.roles.time.monotonic', return_value=10 ** 9):
+        assert roles.stale()
+
+
+def test_login_uses_role_cache(dbsession, query_counter):
+    """Test login tidak lagi meng-query tabel roles"""
+    _roles(dbsession)
+    dbsession.add(Users(user_id=1, role_id=2, nama_lengkap='Admin', email='a@test.com',
+                        password='admin123', is_active=True))
+    dbsession.commit()
+    roles = RoleRegistry()
+    roles.load(dbsession)
+    registry = Registry()
+    registry['role_registry'] = roles
+    req = DummyRequest(json_body={'email': 'a@test.com', 'password': 'admin123'})
+    req.registry = registry
+    req.dbsession = dbsession
+    del query_counter[:]
+
+    response = login(req)
+
+    assert response['user']['role_name'] == 'Admin'
+    assert not any('FROM roles' in statement for statement in query_counter)
+
+
+def test_user_roles_cached_until_commit(dbsession, query_counter):
+    """Test role per user dibaca dari cache dan dikosongkan setelah perubahan di-commit"""
+    _roles(dbsession)
+    dbsession.add(Users(user_id=1, role_id=2, nama_lengkap='Admin', email='a@test.com',
+                        password='admin123', is_active=True))
+    dbsession.commit()
+    users = UserRoleCache(ttl=60)
+
+    assert users.get(1, dbsession) == (2, True)
+    assert users.get(99, dbsession) is None
+    del query_counter[:]
+    assert users.get(1, dbsession) == (2, True)
+    assert query_counter == []
+
+    dbsession.get(Users, 1).role_id = 1
+    dbsession.flush()
+    assert users.get(1, dbsession) == (2, True)
+
+    dbsession.commit()
+    assert users.get(1, dbsession) == (1, True)
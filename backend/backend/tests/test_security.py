@@ -0,0 +1,232 @@
+import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+import webtest
+
+from backend import main
+from backend.models import Kategori, Keranjang, Menu, Roles, Users
+from backend.models.meta import Base
+from backend.security import SECRET_ENV, TokenService, load_secret
+
+SECRET = 'rahasia-untuk-test-minimal-32-byte'
+
+
+def test_token_roundtrip_and_cache():
+    """Test token terverifikasi disimpan di cache sehingga tanda tangan tidak dicek ulang"""
+    tokens = TokenService(SECRET)
+    token = tokens.issue(7, 2, 'admin')
+
+    with patch('backend.security.jwt.decode', wraps=jwt.decode) as decode:
+        first = tokens.verify(token)
+        second = tokens.verify(token)
+
+    assert first['sub'] == '7' and first['rid'] == 2 and first['role'] == 'admin'
+    assert second is first
+    assert decode.call_count == 1
+    assert tokens.stats()['hits'] == 1
+
+
+def test_invalid_tokens_rejected():
+    """Test token dengan secret lain, rusak, atau kedaluwarsa ditolak"""
+    tokens = TokenService(SECRET, ttl=-1)
+
+    assert TokenService(SECRET + '-lain').verify(TokenService(SECRET).issue(1)) is None
+    assert tokens.verify('bukan.token.jwt') is None
+    assert tokens.verify(tokens.issue(1)) is None
+
+
+def test_cached_token_expires():
+    """Test token di cache tetap ditolak setelah kedaluwarsa"""
+    tokens = TokenService(SECRET, ttl=1)
+    token = tokens.issue(1)
+    assert tokens.verify(token) is not None
+
+    time.sleep(1.1)
+    assert tokens.verify(token) is None
+
+
+def test_cache_bounded():
+    """Test cache token terverifikasi dibatasi (LRU)"""
+    tokens = TokenService(SECRET, cache_size=2)
+    for user_id in range(5):
+        tokens.verify(tokens.issue(user_id))
+
+    assert tokens.stats()['entries'] == 2
+
+
+@pytest.mark.parametrize('settings, environ', [
+    ({}, {}),
+    ({'auth.secret': 'GANTI-DENGAN-STRING-ACAK-PANJANG'}, {}),
+    ({'auth.secret': 'terlalu-pendek'}, {}),
+    ({'auth.secret': SECRET}, {SECRET_ENV: 'terlalu-pendek'}),
+])
+def test_weak_secret_rejected(settings, environ):
+    """Test secret kosong, placeholder, atau kurang dari 32 byte ditolak"""
+    with pytest.raises(ValueError):
+        load_secret(settings, environ)
+
+
+def test_secret_from_environment(monkeypatch):
+    """Test secret dari environment diutamakan dan aplikasi bisa start tanpa auth.secret"""
+    assert load_secret({'auth.secret': 'x' * 40}, {SECRET_ENV: SECRET}) == SECRET
+
+    monkeypatch.setenv(SECRET_ENV, SECRET)
+    app = main({}, **{'sqlalchemy.url': 'sqlite://'})
+    assert app.registry['token_service'].secret == SECRET
+
+    monkeypatch.delenv(SECRET_ENV)
+    with pytest.raises(ValueError):
+        main({}, **{'sqlalchemy.url': 'sqlite://'})
+
+
+def _testapp(*extra, **settings):
+    """App dengan user admin (1) dan pembeli (2) serta objek tambahan."""
+    app = main({}, **dict({'sqlalchemy.url': 'sqlite://', 'auth.secret': SECRET}, **settings))
+    engine = app.registry['dbengine']
+    Base.metadata.create_all(engine)
+    session = app.registry['dbsession_factory']()
+    session.add(Roles(role_id=1, role_name='admin', permissions='all'))
+    session.add(Roles(role_id=2, role_name='pembeli', permissions='read,order'))
+    session.add(Users(user_id=1, role_id=1, nama_lengkap='Admin', email='a@test.com',
+                      password='admin123', is_active=True))
+    session.add(Users(user_id=2, role_id=2, nama_lengkap='Pembeli', email='p@test.com',
+                      password='pembeli123', is_active=True))
+    session.flush()
+    session.add_all(extra)
+    session.commit()
+    session.close()
+    return webtest.TestApp(app)
+
+
+def _auth(testapp, email, password):
+    token = testapp.post_json('/api/login', {'email': email, 'password': password}).json['token']
+    return {'Authorization': 'Bearer ' + token}
+
+
+def test_protected_views_require_token():
+    """Test /api/users dan /api/orders butuh token dari /api/login"""
+    testapp = _testapp()
+
+    response = testapp.get('/api/users', status=401)
+    assert response.json == {'error': 'Login diperlukan'}
+    testapp.get('/api/orders/stream', status=401)
+    testapp.get('/api/orders', headers={'Authorization': 'Bearer salah'}, status=401)
+
+    token = testapp.post_json('/api/login', {'email': 'a@test.com', 'password': 'admin123'}).json['token']
+    headers = {'Authorization': 'Bearer ' + token}
+    assert testapp.get('/api/users', headers=headers).json['users'][0]['email'] == 'a@test.com'
+    assert testapp.get('/api/orders', headers=headers).json['orders'] == []
+
+    # Pembeli boleh melihat pesanan, tetapi route admin ditolak
+    token = testapp.post_json('/api/login', {'email': 'p@test.com', 'password': 'pembeli123'}).json['token']
+    headers = {'Authorization': 'Bearer ' + token}
+    testapp.get('/api/orders', headers=headers)
+    assert testapp.get('/api/users', headers=headers, status=403).json == {'error': 'Akses ditolak'}
+    testapp.delete('/api/users/1', headers=headers, status=403)
+    testapp.get('/api/orders/stream', headers=headers, status=403)
+
+    # Perubahan katalog dan endpoint monitoring hanya untuk admin
+    testapp.post_json('/api/menu', {}, status=401)
+    testapp.post_json('/api/menu', {'nama_menu': 'X'}, headers=headers, status=403)
+    testapp.put_json('/api/menu/1', {}, headers=headers, status=403)
+    testapp.delete('/api/menu/1', headers=headers, status=403)
+    testapp.post_json('/api/kategori', {'nama_kategori': 'X'}, headers=headers, status=403)
+    for path in ('/api/_internal/cache', '/api/_internal/pool', '/metrics'):
+        testapp.get(path, status=401)
+        testapp.get(path, headers=headers, status=403)
+
+    token = testapp.post_json('/api/login', {'email': 'a@test.com', 'password': 'admin123'}).json['token']
+    headers = {'Authorization': 'Bearer ' + token}
+    testapp.post_json('/api/kategori', {'nama_kategori': 'Minuman'}, headers=headers)
+    testapp.get('/api/_internal/pool', headers=headers)
+    assert 'kantin_http_requests_total' in testapp.get('/metrics', headers=headers).text
+
+
+def test_cart_owner_only():
+    """Test keranjang hanya bisa diakses pemiliknya atau admin"""
+    testapp = _testapp(
+        Kategori(kategori_id=1, nama_kategori='Makanan'),
+        Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000),
+        Keranjang(keranjang_id=1, user_id=1, menu_id=1, jumlah=1, subtotal=25000),
+    )
+    testapp.get('/api/keranjang/2', status=401)
+    testapp.post_json('/api/keranjang', {'user_id': 2, 'items': []}, status=401)
+
+    pembeli = _auth(testapp, 'p@test.com', 'pembeli123')
+    testapp.get('/api/keranjang/1', headers=pembeli, status=403)
+    testapp.delete('/api/keranjang/1/clear', headers=pembeli, status=403)
+    testapp.post_json('/api/keranjang', {'user_id': 1, 'items': [{'menu_id': 1, 'jumlah': 1}]},
+                      headers=pembeli, status=403)
+    # Item milik user lain tidak terlihat
+    testapp.put_json('/api/keranjang/1', {'jumlah': 5}, headers=pembeli, status=404)
+    testapp.delete('/api/keranjang/1', headers=pembeli, status=404)
+
+    line = testapp.post_json('/api/keranjang', {'user_id': 2, 'items': [{'menu_id': 1, 'jumlah': 2}]},
+                             headers=pembeli).json['keranjang'][0]
+    testapp.put_json('/api/keranjang/{}'.format(line['keranjang_id']), {'jumlah': 3}, headers=pembeli)
+    assert testapp.get('/api/keranjang/2', headers=pembeli).json['keranjang'][0]['jumlah'] == 3
+
+    admin = _auth(testapp, 'a@test.com', 'admin123')
+    assert testapp.get('/api/keranjang/1', headers=admin).json['keranjang'][0]['jumlah'] == 1
+    testapp.delete('/api/keranjang/{}'.format(line['keranjang_id']), headers=admin)
+    assert testapp.get('/api/keranjang/2', headers=pembeli).json['keranjang'] == []
+
+
+def test_order_create_owner_only():
+    """Test pesanan hanya bisa dibuat atas nama pemilik token atau oleh admin"""
+    testapp = _testapp(
+        Kategori(kategori_id=1, nama_kategori='Makanan'),
+        Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000),
+        Keranjang(keranjang_id=1, user_id=1, menu_id=1, jumlah=1, subtotal=25000),
+    )
+    order = {'user_id': 1, 'items': [{'menu_id': 1, 'jumlah': 1}], 'pembayaran': 'tunai'}
+    testapp.post_json('/api/orders', order, status=401)
+
+    # Pembeli tidak bisa memesan atas nama user lain maupun mengosongkan keranjangnya
+    pembeli = _auth(testapp, 'p@test.com', 'pembeli123')
+    testapp.post_json('/api/orders', order, headers=pembeli, status=403)
+    admin = _auth(testapp, 'a@test.com', 'admin123')
+    assert len(testapp.get('/api/keranjang/1', headers=admin).json['keranjang']) == 1
+
+    response = testapp.post_json('/api/orders', dict(order, user_id=2), headers=pembeli)
+    assert response.json['order']['user_id'] == 2
+    testapp.post_json('/api/orders', order, headers=admin)
+    assert testapp.get('/api/keranjang/1', headers=admin).json['keranjang'] == []
+
+
+def test_role_changes_apply_to_issued_tokens():
+    """Test perubahan role, nonaktif, dan hapus user langsung berlaku untuk token lama"""
+    testapp = _testapp()
+    admin = _auth(testapp, 'a@test.com', 'admin123')
+    pembeli = _auth(testapp, 'p@test.com', 'pembeli123')
+    testapp.get('/api/users', headers=pembeli, status=403)
+
+    testapp.put_json('/api/users/2', {'role_id': 1}, headers=admin)
+    testapp.get('/api/users', headers=pembeli)
+    testapp.put_json('/api/users/2', {'role_id': 2}, headers=admin)
+    testapp.get('/api/users', headers=pembeli, status=403)
+
+    testapp.delete('/api/users/2', headers=admin)
+    testapp.get('/api/orders', headers=pembeli, status=401)
+
+    session = testapp.app.registry['dbsession_factory']()
+    session.get(Users, 1).is_active = False
+    session.commit()
+    session.close()
+    testapp.get('/api/users', headers=admin, status=401)
+
+
+def test_metrics_scrape_token():
+    """Test /metrics bisa di-scrape dengan metrics.scrape_token tanpa token login"""
+    scrape_token = 'token-scrape-prometheus-yang-panjang'
+    testapp = _testapp(**{'metrics.scrape_token': scrape_token})
+
+    text = testapp.get('/metrics', headers={'Authorization': 'Bearer ' + scrape_token}).text
+    assert 'kantin_http_requests_total' in text
+    testapp.get('/metrics', headers={'Authorization': 'Bearer salah'}, status=401)
+    testapp.get('/metrics', headers=_auth(testapp, 'p@test.com', 'pembeli123'), status=403)
+    testapp.get('/metrics', headers=_auth(testapp, 'a@test.com', 'admin123'))
+    # Scrape token bukan token login
+    testapp.get('/api/users', headers={'Authorization': 'Bearer ' + scrape_token}, status=401)
@@ -0,0 +1,109 @@
+import datetime
+import json
+
+import pytest
+from pyramid.testing import DummyRequest
+
+from backend.models import Menu, Kategori, Users, Orders, OrderDetails, Roles
+from backend.renderers import FastJSON, get_dumps, orjson
+from backend.serializers import Fieldset, Serializer
+
+
+@pytest.fixture
+def order(dbsession):
+    create_at = datetime.datetime(2025, 5, 28, 12, 30, 15, 250000)
+    dbsession.add(Roles(role_id=1, role_name='customer', permissions='read,order'))
+    dbsession.add(Kategori(kategori_id=1, nama_kategori='Makanan', icon='🍽️'))
+    dbsession.add(Users(user_id=1, role_id=1, nama_lengkap='Test User', email='test@test.com',
+                        password='password123', create_at=create_at))
+    dbsession.add(Menu(menu_id=1, kategori_id=1, nama_menu='Nasi Goreng', harga=25000,
+                       create_at=create_at))
+    dbsession.add(Menu(menu_id=2, kategori_id=1, nama_menu='Mie Goreng', harga=20000,
+                       create_at=create_at))
+    order = Orders(order_id=1, user_id=1, status='pending', total_harga=70000,
+                   pembayaran='cash', create_at=create_at)
+    order.order_details = [
+        OrderDetails(menu_id=1, jumlah=2, subtotal=50000),
+        OrderDetails(menu_id=2, jumlah=1, subtotal=20000),
+    ]
+    dbsession.add(order)
+    dbsession.flush()
+    dbsession.expire_all()
+    return dbsession.get(Orders, 1)
+
+
+def _render(value, backend='auto'):
+    return json.loads(get_dumps(backend)(value))
+
+
+@pytest.mark.parametrize('backend', [
+    pytest.param('orjson', marks=pytest.mark.skipif(orjson is None, reason='orjson tidak terpasang')),
+    'json',
+])
+def test_serializer_matches_to_dict(order, backend):
+    """Test hasil serializer sama dengan to_dict setelah dirender"""
+    assert _render(Serializer().order(order), backend) == order.to_dict()
+    assert _render(Serializer().user(order.user), backend) == order.user.to_dict()
+
+
+def test_serializer_memoizes_shared_objects(order):
+    """Test kategori yang sama hanya diserialisasi sekali per serializer"""
+    serializer = Serializer()
+    details = serializer.order(order)['order_details']
+
+    assert details[0]['menu']['kategori'] is details[1]['menu']['kategori']
+    assert serializer.menu(order.order_details[0].menu) is details[0]['menu']
+    assert Serializer().menu(order.order_details[0].menu) is not details[0]['menu']
+
+
+def test_order_summary(order):
+    """Test format daftar pesanan berisi ringkasan user dan item"""
+    data = _render(Serializer().order_summary(order))
+
+    assert data['user'] == {'user_id': 1, 'nama_lengkap': 'Test User', 'email': 'test@test.com'}
+    assert data['items'][0] == {
+        'menu_id': 1, 'nama_menu': 'Nasi Goreng', 'jumlah': 2, 'harga': 25000, 'subtotal': 50000}
+    assert data['create_at'] == '2025-05-28T12:30:15.250000'
+
+
+def test_fieldset_from_params():
+    """Test parsing fields dan expand; primary key selalu disertakan"""
+    fieldset = Fieldset.from_params({'fields': 'harga, nama_menu', 'expand': ''}, 'menu')
+
+    assert fieldset.fields == ('menu_id', 'nama_menu', 'harga')
+    assert fieldset.expand == frozenset()
+    assert not fieldset.expands('kategori')
+    assert Fieldset.from_params({}, 'menu').key == (None, None)
+
+    with pytest.raises(ValueError):
+        Fieldset.from_params({'fields': 'password'}, 'user')
+    with pytest.raises(ValueError):
+        Fieldset.from_params({'expand': 'kategori'}, 'user')
+
+
+def test_serializer_fieldset(order):
+    """Test serializer hanya mengirim kolom dan relasi yang dipilih"""
+    fieldset = Fieldset.from_params({'fields': 'status', 'expand': 'order_details'}, 'order')
+
+    data = fieldset.serializer().order(order)
+
+    assert data['status'] == 'pending'
+    assert set(data) == {'order_id', 'status', 'order_details'}
+    assert 'menu' not in data['order_details'][0]
+
+
+def test_renderer_sets_json_content_type():
+    """Test renderer menulis bytes JSON dengan content type application/json"""
+    request = DummyRequest()
+    render = FastJSON('json')(None)
+
+    body = render({'tanggal': datetime.date(2025, 5, 28), 'nama': 'Sâté'}, {'request': request})
+
+    assert json.loads(body) == {'tanggal': '2025-05-28', 'nama': 'Sâté'}
+    assert request.response.content_type == 'application/json'
+
+
+def test_renderer_unknown_backend():
+    """Test backend renderer yang tidak dikenal ditolak"""
+    with pytest.raises(ValueError):
+        get_dumps('ujson')
@@ -0,0 +1,63 @@
+import logging
+
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+from sqlalchemy import create_engine, text
+
+from backend.sqltiming import current_stats, install, sqltiming_tween_factory
+
+
+class _Route(object):
+    name = 'menu_list'
+
+
+def _tween(engine, queries, **settings):
+    def handler(request):
+        request.matched_route = _Route()
+        with engine.connect() as conn:
+            for _ in range(queries):
+                conn.execute(text('SELECT 1'))
+        return Response('ok')
+
+    registry = Registry()
+    registry.settings = settings
+    return sqltiming_tween_factory(handler, registry)
+
+
+def test_server_timing_counts_queries():
+    """Test jumlah statement dan waktu database masuk header Server-Timing"""
+    engine = create_engine('sqlite://')
+    install(engine, slow_query=10)
+
+    response = _tween(engine, 3)(Request.blank('/api/menu'))
+
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+    assert 'desc="3 queries"' in response.headers['Server-Timing']
+    assert current_stats() is None
+
+
+def test_slow_query_logged_with_route(caplog):
+    """Test statement lambat dicatat beserta nama route"""
+    engine = create_engine('sqlite://')
+    install(engine, slow_query=0)
+
+    with caplog.at_level(logging.WARNING, logger='backend.sqltiming'):
+        _tween(engine, 1, **{'sqltiming.server_timing': 'false'})(Request.blank('/api/menu'))
+
+    assert 'Query lambat' in caplog.text
+    assert 'route=menu_list' in caplog.text
+    assert 'SELECT 1' in caplog.text
+
+
+def test_many_queries_logged_as_warning(caplog):
+    """Test request dengan banyak statement (N+1) dicatat sebagai warning"""
+    engine = create_engine('sqlite://')
+    install(engine, slow_query=10)
+
+    with caplog.at_level(logging.WARNING, logger='backend.sqltiming'):
+        response = _tween(engine, 5, **{'sqltiming.query_warning': '5'})(
+            Request.blank('/api/menu'))
+
+    assert 'route=menu_list status=200 queries=5' in caplog.text
+    assert 'Server-Timing' in response.headers
@@ -0,0 +1,76 @@
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+import webtest
+from pyramid.interfaces import IRendererFactory, ITweens
+
+import backend
+from backend import main
+
+
+def _app(**settings):
+    return main({}, **dict({'sqlalchemy.url': 'sqlite://',
+                            'auth.secret': 'rahasia-untuk-test-minimal-32-byte'}, **settings))
+
+
+def _tweens(app):
+    return [name for name, _ in app.registry.getUtility(ITweens).implicit()]
+
+
+def test_production_mode_skips_dev_includes(caplog):
+    """Test mode production tanpa debugtoolbar, jinja2, dan view template"""
+    with caplog.at_level(logging.INFO, logger='backend'):
+        app = _app(**{'backend.production': 'true'})
+
+    assert not any('debugtoolbar' in name for name in _tweens(app))
+    assert app.registry.queryUtility(IRendererFactory, name='.jinja2') is None
+    assert 'Startup production' in caplog.text
+
+    response = webtest.TestApp(app).get('/tidak-ada', status=404)
+    assert response.json == {'error': 'Tidak ditemukan'}
+
+
+def test_development_mode_includes_template_views():
+    """Test mode development tetap memuat debugtoolbar dan jinja2"""
+    app = _app()
+
+    assert any('debugtoolbar' in name for name in _tweens(app))
+    assert app.registry.queryUtility(IRendererFactory, name='.jinja2') is not None
+
+
+@pytest.mark.parametrize('platform, max_rss', [('linux', 2048), ('darwin', 2 * 1024 * 1024)])
+def test_max_rss_units(monkeypatch, platform, max_rss):
+    """Test ru_maxrss dibaca sebagai KB di Linux dan byte di macOS"""
+    usage = SimpleNamespace(ru_maxrss=max_rss)
+    monkeypatch.setattr(backend, 'resource', SimpleNamespace(
+        RUSAGE_SELF=0, getrusage=lambda who: usage))
+    monkeypatch.setattr(backend.sys, 'platform', platform)
+
+    assert backend._max_rss_mb() == 2
+
+
+def test_startup_log_without_resource(monkeypatch, caplog):
+    """Test tanpa modul resource (Windows) log startup tetap ditulis tanpa maxrss"""
+    monkeypatch.setattr(backend, 'resource', None)
+    with caplog.at_level(logging.INFO, logger='backend'):
+        _app(**{'backend.production': 'true'})
+
+    assert 'Startup production' in caplog.text
+    assert 'maxrss' not in caplog.text
+
+
+def test_startup_time_includes_imports(monkeypatch, caplog):
+    """Test app pertama melaporkan waktu sejak paket di-import, app berikutnya tidak"""
+    monkeypatch.setattr(backend, '_import_started', time.perf_counter() - 0.5)
+    with caplog.at_level(logging.INFO, logger='backend'):
+        _app(**{'backend.production': 'true'})
+
+    assert 'imports 5' in caplog.text
+    assert backend._import_started is None
+
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger='backend'):
+        _app(**{'backend.production': 'true'})
+    assert 'imports' not in caplog.text
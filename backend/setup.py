@@ -20,7 +20,7 @@ requires = [
     'transaction',
     'zope.sqlalchemy',
     'bcrypt',
-    'python-jose',
+    'PyJWT',
     'pytest',
     'pytest-cov',
     'webtest'
@@ -1,6 +1,7 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Icon } from '@iconify/react';
+import { logout } from '../utils/auth';
 
 const ProfileDropdown = ({ username, onLogout }) => {
   const [isOpen, setIsOpen] = useState(false);
@@ -22,7 +23,7 @@ const ProfileDropdown = ({ username, onLogout }) => {
     if (onLogout) {
       onLogout();
     } else {
-      sessionStorage.removeItem('user');
+      logout();
       navigate('/login');
     }
     setIsOpen(false);
@@ -1,12 +1,13 @@
 import React from 'react';
 import { Icon } from '@iconify/react';
 import { useNavigate } from 'react-router-dom';
+import { logout } from '../../utils/auth';
 
 const AdminSidebar = ({ activeMenu = 'dashboard' }) => {
   const navigate = useNavigate();
 
   const handleLogout = () => {
-    sessionStorage.removeItem('user');
+    logout();
     navigate('/login');
   };
 
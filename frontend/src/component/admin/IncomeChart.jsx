@@ -10,7 +10,7 @@ import {
   ResponsiveContainer
 } from 'recharts';
 
-const IncomeChart = ({ orders = [] }) => {
+const IncomeChart = ({ revenuePerDay = [] }) => {
   // Fungsi untuk memformat mata uang
   const formatCurrency = (amount) => {
     return new Intl.NumberFormat('id-ID', {
@@ -38,14 +38,6 @@ const IncomeChart = ({ orders = [] }) => {
     const currentMonth = now.getMonth();
     const currentYear = now.getFullYear();
     
-    // Filter orders untuk bulan ini saja
-    const thisMonthOrders = orders.filter(order => {
-      const orderDate = new Date(order.create_at);
-      return orderDate.getMonth() === currentMonth && 
-             orderDate.getFullYear() === currentYear &&
-             order.status !== 'cancelled';
-    });
-
     // Buat objek untuk menyimpan penghasilan per hari
     const dailyData = {};
     
@@ -65,13 +57,14 @@ const IncomeChart = ({ orders = [] }) => {
       dailyData[dateStr] = 0;
     }
 
-    // Hitung penghasilan per hari
-    thisMonthOrders.forEach(order => {
-      const orderDate = new Date(order.create_at);
-      const day = orderDate.getDate();
-      if (day >= startDay && day <= endDay) {
+    // Penghasilan per hari dari server (tanggal YYYY-MM-DD, tanpa pesanan
+    // yang dibatalkan)
+    revenuePerDay.forEach(({ tanggal, total }) => {
+      const [year, month, day] = tanggal.split('-').map(Number);
+      if (year === currentYear && month - 1 === currentMonth &&
+          day >= startDay && day <= endDay) {
         const dateStr = day.toString().padStart(2, '0');
-        dailyData[dateStr] = (dailyData[dateStr] || 0) + order.total_harga;
+        dailyData[dateStr] = (dailyData[dateStr] || 0) + total;
       }
     });
 
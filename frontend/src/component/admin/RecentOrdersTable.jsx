@@ -73,8 +73,8 @@ const RecentOrdersTable = ({ orders = [] }) => {
                       #{order.order_id}
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap">
-                      <div className="text-sm text-gray-900">{order.user.nama_lengkap}</div>
-                      <div className="text-sm text-gray-500">{order.user.email}</div>
+                      <div className="text-sm text-gray-900">{order.nama_lengkap}</div>
+                      <div className="text-sm text-gray-500">{order.email}</div>
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
                       {formatCurrency(order.total_harga)}
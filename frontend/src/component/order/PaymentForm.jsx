@@ -1,6 +1,7 @@
-import React, { useState } from 'react';
+import React, { useState, useRef } from 'react';
 import Swal from 'sweetalert2';
 import { useNavigate } from 'react-router-dom';
+import { getCurrentUser, getToken } from '../../utils/auth';
 import {
   Box,
   Button,
@@ -17,6 +18,8 @@ import {
 const PaymentForm = ({ cartItems, totalAmount, onSuccess, onCancel }) => {
   const [paymentMethod, setPaymentMethod] = useState('tunai');
   const [loading, setLoading] = useState(false);
+  // Key yang sama untuk setiap percobaan ulang agar pesanan tidak terduplikasi
+  const idempotencyKey = useRef(crypto.randomUUID());
   const navigate = useNavigate();
 
   const handleSubmit = async (e) => {
@@ -24,15 +27,15 @@ const PaymentForm = ({ cartItems, totalAmount, onSuccess, onCancel }) => {
     setLoading(true);
 
     try {
-      const userId = localStorage.getItem('userId');
-      const token = localStorage.getItem('token');
+      const user = getCurrentUser();
+      const token = getToken();
 
-      if (!userId || !token) {
+      if (!user || !token) {
         throw new Error('Silakan login terlebih dahulu');
       }
 
       const orderData = {
-        user_id: parseInt(userId),
+        user_id: user.user_id,
         items: cartItems.map(item => ({
           menu_id: item.menu_id,
           jumlah: item.quantity
@@ -46,7 +49,8 @@ const PaymentForm = ({ cartItems, totalAmount, onSuccess, onCancel }) => {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
+          'Content-Type': 'application/json',
+          'Idempotency-Key': idempotencyKey.current
         },
         body: JSON.stringify(orderData)
       });
@@ -2,14 +2,14 @@ import { useCart } from "../../pages/cart";
 import Swal from "sweetalert2";
 import { FaPlus } from "react-icons/fa";
 import { useNavigate } from "react-router-dom";
+import { isAuthenticated } from "../../utils/auth";
 
 function Card({ id, name, image, desc, price, status }) {
   const { addToCart } = useCart();
   const navigate = useNavigate();
 
   const handleAdd = () => {
-    const token = localStorage.getItem('token');
-    if (!token) {
+    if (!isAuthenticated()) {
       Swal.fire({
         title: 'Login Diperlukan',
         text: 'Silakan login terlebih dahulu untuk menambahkan menu ke keranjang',
@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react"
 import { FaBars, FaTimes, FaShoppingCart, FaHome, FaUtensils, FaQuestionCircle, FaSignInAlt, FaSignOutAlt, FaUser } from "react-icons/fa"
 import { useNavigate } from "react-router-dom"
+import { logout } from "../../utils/auth"
 import { Drawer, List, ListItem, ListItemIcon, ListItemText, IconButton, Box, Typography, Divider } from '@mui/material'
 
 const BurgerMenu = ({ toggleCart, userData, onLogout }) => {
@@ -28,7 +29,7 @@ const BurgerMenu = ({ toggleCart, userData, onLogout }) => {
         if (onLogout) {
             onLogout();
         } else {
-            sessionStorage.removeItem('user');
+            logout();
             navigate('/login');
         }
         setOpen(false);
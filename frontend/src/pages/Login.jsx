@@ -1,5 +1,6 @@
 import { useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
+import { saveSession } from '../utils/auth';
 
 const Login = () => {
   const [email, setEmail] = useState('');
@@ -29,8 +30,8 @@ const Login = () => {
         throw new Error(data.error || 'Login gagal');
       }
 
-      // Simpan data user untuk sesi ini
-      sessionStorage.setItem('user', JSON.stringify(data.user));
+      // Simpan token dan data user untuk sesi ini
+      saveSession(data.token, data.user);
       
       // Dispatch event untuk update navbar
       window.dispatchEvent(new Event('userLogin'));
@@ -100,6 +100,7 @@ describe('Login', () => {
     })
     
     await waitFor(() => {
+      expect(sessionStorage.setItem).toHaveBeenCalledWith('token', 'fake-token')
       expect(sessionStorage.setItem).toHaveBeenCalledWith('user', JSON.stringify({
         user_id: 1,
         email: 'customer@test.com',
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { getToken } from '../../utils/auth';
 import AdminSidebar from '../../component/admin/AdminSidebar';
 import StatusCard from '../../component/admin/StatusCard';
 import RecentOrdersTable from '../../component/admin/RecentOrdersTable';
@@ -12,6 +13,7 @@ const DashboardAdmin = () => {
     totalPesanan: 0,
     totalMenu: 0,
     totalPengguna: 0,
+    revenuePerDay: null,
     recentOrders: []
   });
 
@@ -40,26 +42,23 @@ const DashboardAdmin = () => {
 
   const fetchDashboardData = async () => {
     try {
-      // Fetch total penghasilan dan pesanan
-      const ordersResponse = await fetch('http://localhost:6543/api/orders');
-      const ordersData = await ordersResponse.json();
-      const orders = ordersData.orders || [];
-      const totalPenghasilan = orders.reduce((sum, order) => sum + (order.total_harga || 0), 0);
-      
-      // Fetch total menu
-      const menuResponse = await fetch('http://localhost:6543/api/menu');
-      const menuData = await menuResponse.json();
-      
-      // Fetch total pengguna
-      const usersResponse = await fetch('http://localhost:6543/api/users');
-      const usersData = await usersResponse.json();
+      // Semua angka dihitung di server (/api/admin/dashboard), bukan dari
+      // seluruh daftar pesanan
+      const response = await fetch('http://localhost:6543/api/admin/dashboard', {
+        headers: { 'Authorization': `Bearer ${getToken()}` }
+      });
+      if (!response.ok) {
+        throw new Error(`Gagal memuat dashboard (${response.status})`);
+      }
+      const data = await response.json();
       
       setDashboardData({
-        totalPenghasilan: totalPenghasilan,
-        totalPesanan: orders.length,
-        totalMenu: (menuData.menus || []).length,
-        totalPengguna: (usersData.users || []).length,
-        recentOrders: orders // Simpan semua orders untuk grafik
+        totalPenghasilan: data.totals.penghasilan,
+        totalPesanan: data.totals.pesanan,
+        totalMenu: data.totals.menu,
+        totalPengguna: data.totals.pengguna,
+        revenuePerDay: data.revenue_per_day,
+        recentOrders: data.recent_orders
       });
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
@@ -136,8 +135,8 @@ const DashboardAdmin = () => {
           </div>
 
           {/* Income Chart */}
-          {dashboardData.recentOrders.length > 0 ? (
-            <IncomeChart orders={dashboardData.recentOrders} />
+          {dashboardData.revenuePerDay !== null ? (
+            <IncomeChart revenuePerDay={dashboardData.revenuePerDay} />
           ) : (
             <div className="bg-white rounded-lg shadow-md p-6 mb-8">
               <h2 className="text-xl font-semibold text-gray-800 mb-4">Grafik Penghasilan per Bulan</h2>
@@ -148,7 +147,7 @@ const DashboardAdmin = () => {
           )}
 
           {/* Recent Orders Table Component */}
-          <RecentOrdersTable orders={dashboardData.recentOrders.slice(0, 5)} />
+          <RecentOrdersTable orders={dashboardData.recentOrders} />
         </div>
       </div>
     </div>
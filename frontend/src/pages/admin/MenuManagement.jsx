@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { getToken } from '../../utils/auth';
 import AdminSidebar from '../../component/admin/AdminSidebar';
 import MenuTable from '../../component/admin/MenuTable';
 import MenuFormModal from '../../component/admin/MenuFormModal';
@@ -90,6 +91,7 @@ const MenuManagement = () => {
       try {
         const response = await fetch(`/api/menu/${menuId}`, {
           method: 'DELETE',
+          headers: { 'Authorization': `Bearer ${getToken()}` }
         });
 
         if (!response.ok) {
@@ -133,6 +135,7 @@ const MenuManagement = () => {
         method,
         headers: {
           'Content-Type': 'application/json',
+          'Authorization': `Bearer ${getToken()}`
         },
         body: JSON.stringify(formData),
       });
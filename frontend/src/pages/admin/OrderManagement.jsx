@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { getToken } from '../../utils/auth';
+import { subscribeOrderEvents } from '../../utils/orderStream';
 import AdminSidebar from '../../component/admin/AdminSidebar';
 import OrderTable from '../../component/admin/OrderTable';
 import OrderDetailModal from '../../component/admin/OrderDetailModal';
@@ -37,12 +39,21 @@ const OrderManagement = () => {
     }
 
     fetchOrders();
+
+    // Muat ulang daftar saat ada pesanan baru, perubahan status, atau
+    // pesanan dihapus (termasuk oleh admin lain)
+    return subscribeOrderEvents(() => fetchOrders(true));
   }, [navigate]);
 
-  const fetchOrders = async () => {
+  const fetchOrders = async (silent = false) => {
     try {
-      setLoading(true);
-      const response = await fetch('/api/orders');
+      if (!silent) {
+        setLoading(true);
+      }
+      const token = getToken();
+      const response = await fetch('/api/orders', {
+        headers: { 'Authorization': `Bearer ${token}` }
+      });
       if (!response.ok) {
         throw new Error('Gagal memuat data pesanan');
       }
@@ -85,7 +96,7 @@ const OrderManagement = () => {
 
   const handleStatusUpdate = async (orderId, newStatus) => {
     try {
-      const token = localStorage.getItem('token');
+      const token = getToken();
       const response = await fetch(`/api/orders/${orderId}`, {
         method: 'PUT',
         headers: {
@@ -141,7 +152,7 @@ const OrderManagement = () => {
       });
 
       if (result.isConfirmed) {
-        const token = localStorage.getItem('token');
+        const token = getToken();
         const response = await fetch(`http://localhost:6543/api/orders/${orderId}`, {
           method: 'DELETE',
           headers: {
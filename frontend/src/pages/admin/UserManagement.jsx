@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { getToken } from '../../utils/auth';
 import AdminSidebar from '../../component/admin/AdminSidebar';
 import { FaTrash, FaUser, FaSearch, FaEdit, FaPlus } from 'react-icons/fa';
 import Swal from 'sweetalert2';
@@ -44,7 +45,10 @@ const UserManagement = () => {
 
   const fetchUsers = async () => {
     try {
-      const response = await fetch('http://localhost:6543/api/users');
+      const token = getToken();
+      const response = await fetch('http://localhost:6543/api/users', {
+        headers: { 'Authorization': `Bearer ${token}` }
+      });
       if (!response.ok) {
         throw new Error('Gagal memuat data pengguna');
       }
@@ -96,7 +100,7 @@ const UserManagement = () => {
           type: typeof userId
         });
         
-        const token = localStorage.getItem('token');
+        const token = getToken();
         // Menggunakan URL lengkap dan memastikan userId adalah angka
         const deleteUrl = `http://localhost:6543/api/users/${userId}`;
         console.log('Delete URL:', deleteUrl);
@@ -145,7 +149,7 @@ const UserManagement = () => {
   const handleCreateUser = async (e) => {
     e.preventDefault();
     try {
-      const token = localStorage.getItem('token');
+      const token = getToken();
       const response = await fetch('http://localhost:6543/api/users', {
         method: 'POST',
         headers: {
@@ -195,7 +199,7 @@ const UserManagement = () => {
   const handleUpdateUser = async (e) => {
     e.preventDefault();
     try {
-      const token = localStorage.getItem('token');
+      const token = getToken();
       
       // Pastikan user_id ada dan valid
       if (!editingUser || !editingUser.user_id) {
@@ -1,7 +1,7 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { useCart } from "./cart";
-import { isAuthenticated, getCurrentUser } from "../utils/auth";
+import { isAuthenticated, getCurrentUser, getToken } from "../utils/auth";
 import PaymentTabs from "../component/checkout/paymentTabs";
 import Ewallet from "../component/checkout/eWallet";
 import Qris from "../component/checkout/qris";
@@ -10,6 +10,8 @@ import Swal from "sweetalert2";
 const Checkout = () => {
     const [paymentMethod, setPaymentMethod] = useState("qris");
     const [selectedEwallet, setSelectedEwallet] = useState(null);
+    // Key yang sama untuk setiap percobaan ulang agar pesanan tidak terduplikasi
+    const idempotencyKey = useRef(crypto.randomUUID());
     const [ewalletNumber, setEwalletNumber] = useState("");
     const navigate = useNavigate();
     const { cartItems, clearCart } = useCart();
@@ -50,12 +52,12 @@ const Checkout = () => {
                 total_harga: total // Menambahkan total harga
             };
 
-            console.log('Sending order data:', orderData); // Debug log
-
             const response = await fetch('/api/orders', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Authorization': `Bearer ${getToken()}`,
+                    'Idempotency-Key': idempotencyKey.current,
                 },
                 body: JSON.stringify(orderData),
             });
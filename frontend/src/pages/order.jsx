@@ -20,6 +20,7 @@ const OrderMenu = () => {
     const [menuItems, setMenuItems] = useState([])
     const [categories, setCategories] = useState(["Semua"])
     const [searchTerm, setSearchTerm] = useState("")
+    const [searchResults, setSearchResults] = useState(null)
     const [categoryFilter, setCategoryFilter] = useState("Semua")
     const [loading, setLoading] = useState(true)
     const [error, setError] = useState(null)
@@ -69,11 +70,48 @@ const OrderMenu = () => {
         fetchData()
     }, [])
 
-    const filteredItems = menuItems.filter((item) => {
-        const matchesSearch = item.nama_menu.toLowerCase().includes(searchTerm.toLowerCase())
+    // Pencarian dilakukan di server (toleran salah ketik, diurutkan relevansi)
+    useEffect(() => {
+        const query = searchTerm.trim()
+        if (!query) {
+            setSearchResults(null)
+            return
+        }
+
+        const controller = new AbortController()
+        const timer = setTimeout(async () => {
+            try {
+                const response = await fetch(
+                    `http://localhost:6543/api/menu/search?q=${encodeURIComponent(query)}&limit=200`,
+                    { signal: controller.signal }
+                );
+                const data = await response.json();
+                if (response.ok) {
+                    setSearchResults(data.menus.map(menu => menu.menu_id));
+                }
+            } catch (error) {
+                if (error.name !== 'AbortError') {
+                    console.error('Error searching menu:', error);
+                }
+            }
+        }, 200)
+
+        return () => {
+            clearTimeout(timer)
+            controller.abort()
+        }
+    }, [searchTerm])
+
+    const searchedItems = searchResults === null
+        ? menuItems
+        : searchResults
+            .map(menuId => menuItems.find(item => item.menu_id === menuId))
+            .filter(Boolean)
+
+    const filteredItems = searchedItems.filter((item) => {
         const matchesCategory = categoryFilter === "Semua" || 
                               (item.kategori && item.kategori.nama_kategori === categoryFilter)
-        return matchesSearch && matchesCategory
+        return matchesCategory
     })
 
     return (
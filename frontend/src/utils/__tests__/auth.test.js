@@ -1,5 +1,5 @@
 import { describe, it, expect, beforeEach, vi } from 'vitest'
-import { isAuthenticated, getCurrentUser, logout, requireAuth } from '../auth'
+import { isAuthenticated, getCurrentUser, getToken, saveSession, logout, requireAuth } from '../auth'
 
 describe('Auth Utilities', () => {
   beforeEach(() => {
@@ -22,6 +22,31 @@ describe('Auth Utilities', () => {
       expect(isAuthenticated()).toBe(false)
       expect(sessionStorage.getItem).toHaveBeenCalledWith('user')
     })
+
+    it('should return false when user data exists but the token is missing', () => {
+      sessionStorage.getItem.mockImplementation((key) => key === 'user' ? '{"user_id": 1}' : null)
+      
+      expect(isAuthenticated()).toBe(false)
+      expect(sessionStorage.getItem).toHaveBeenCalledWith('token')
+    })
+  })
+
+  describe('saveSession and getToken', () => {
+    it('should store the token and user data in sessionStorage', () => {
+      const userData = { user_id: 1, email: 'test@example.com', role_id: 2 }
+      
+      saveSession('fake-token', userData)
+      
+      expect(sessionStorage.setItem).toHaveBeenCalledWith('token', 'fake-token')
+      expect(sessionStorage.setItem).toHaveBeenCalledWith('user', JSON.stringify(userData))
+    })
+
+    it('should read the token from sessionStorage, not localStorage', () => {
+      sessionStorage.getItem.mockImplementation((key) => key === 'token' ? 'fake-token' : null)
+      
+      expect(getToken()).toBe('fake-token')
+      expect(sessionStorage.getItem).toHaveBeenCalledWith('token')
+    })
   })
 
   describe('getCurrentUser', () => {
@@ -65,10 +90,11 @@ describe('Auth Utilities', () => {
   })
 
   describe('logout', () => {
-    it('should remove user data from sessionStorage and dispatch logout event', () => {
+    it('should remove user data and token from sessionStorage and dispatch logout event', () => {
       logout()
       
       expect(sessionStorage.removeItem).toHaveBeenCalledWith('user')
+      expect(sessionStorage.removeItem).toHaveBeenCalledWith('token')
       expect(window.dispatchEvent).toHaveBeenCalledWith(new Event('userLogout'))
     })
   })
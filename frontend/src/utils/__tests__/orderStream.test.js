@@ -0,0 +1,78 @@
+import { describe, it, expect, beforeEach, vi } from 'vitest'
+import { parseEvents, subscribeOrderEvents } from '../orderStream'
+
+// Response fetch dengan body yang dibaca per potongan teks
+const streamResponse = (chunks) => {
+  const encoder = new TextEncoder()
+  const queue = chunks.map((chunk) => encoder.encode(chunk))
+  return {
+    ok: true,
+    body: {
+      getReader: () => ({
+        read: () => Promise.resolve(
+          queue.length ? { done: false, value: queue.shift() } : { done: true, value: undefined }
+        )
+      })
+    }
+  }
+}
+
+describe('Order stream', () => {
+  beforeEach(() => {
+    vi.clearAllMocks()
+    global.fetch = vi.fn()
+  })
+
+  describe('parseEvents', () => {
+    it('should parse complete events and keep the incomplete rest', () => {
+      const { events, rest } = parseEvents(
+        'retry: 2000\nid: 1\n\nid: 2\nevent: order_created\ndata: {"order_id":7}\n\nid: 3\nev'
+      )
+
+      expect(events).toEqual([
+        { id: '1', type: 'message', data: null, retry: 2000 },
+        { id: '2', type: 'order_created', data: '{"order_id":7}', retry: null }
+      ])
+      expect(rest).toBe('id: 3\nev')
+    })
+  })
+
+  describe('subscribeOrderEvents', () => {
+    it('should send the session token and report events with data', async () => {
+      sessionStorage.getItem.mockImplementation((key) => key === 'token' ? 'fake-token' : null)
+      fetch
+        .mockResolvedValueOnce(streamResponse([
+          'retry: 2000\nid: 1\n\n',
+          'id: 2\nevent: order_status_changed\ndata: {"order_id":7,',
+          '"status":"completed"}\n\n'
+        ]))
+        .mockResolvedValue({ ok: false })
+      const onEvent = vi.fn()
+
+      const unsubscribe = subscribeOrderEvents(onEvent)
+
+      await vi.waitFor(() => expect(onEvent).toHaveBeenCalledTimes(1))
+      unsubscribe()
+
+      expect(fetch).toHaveBeenCalledWith('/api/orders/stream', expect.objectContaining({
+        headers: { 'Authorization': 'Bearer fake-token' }
+      }))
+      expect(onEvent.mock.calls[0][0]).toEqual({
+        id: '2',
+        type: 'order_status_changed',
+        data: '{"order_id":7,"status":"completed"}',
+        retry: null
+      })
+    })
+
+    it('should stop when the stream is rejected', async () => {
+      fetch.mockResolvedValue({ ok: false, status: 403 })
+      const onEvent = vi.fn()
+
+      subscribeOrderEvents(onEvent)
+
+      await vi.waitFor(() => expect(fetch).toHaveBeenCalledTimes(1))
+      expect(onEvent).not.toHaveBeenCalled()
+    })
+  })
+})
@@ -1,7 +1,15 @@
 // Utility functions untuk autentikasi
+// Data user dan token login disimpan bersama di sessionStorage untuk sesi ini
+export const saveSession = (token, user) => {
+  sessionStorage.setItem('token', token);
+  sessionStorage.setItem('user', JSON.stringify(user));
+};
+
+export const getToken = () => sessionStorage.getItem('token');
+
 export const isAuthenticated = () => {
   const userData = sessionStorage.getItem('user');
-  return userData !== null;
+  return userData !== null && getToken() !== null;
 };
 
 export const getCurrentUser = () => {
@@ -20,6 +28,7 @@ export const getCurrentUser = () => {
 
 export const logout = () => {
   sessionStorage.removeItem('user');
+  sessionStorage.removeItem('token');
   window.dispatchEvent(new Event('userLogout'));
 };
 
@@ -29,4 +38,4 @@ export const requireAuth = (navigate) => {
     return false;
   }
   return true;
-}; 
\ No newline at end of file
+};
@@ -0,0 +1,90 @@
+import { getToken } from './auth';
+
+// Pisahkan event Server-Sent Events yang sudah lengkap dari buffer; sisa
+// yang belum diakhiri baris kosong dikembalikan untuk dibaca berikutnya
+export const parseEvents = (buffer) => {
+  const blocks = buffer.split('\n\n');
+  const rest = blocks.pop();
+  const events = blocks.map((block) => {
+    const event = { id: null, type: 'message', data: null, retry: null };
+    block.split('\n').forEach((line) => {
+      const index = line.indexOf(':');
+      const field = index === -1 ? line : line.slice(0, index);
+      const value = index === -1 ? '' : line.slice(index + 1).replace(/^ /, '');
+      if (field === 'id') {
+        event.id = value;
+      } else if (field === 'event') {
+        event.type = value;
+      } else if (field === 'data') {
+        event.data = event.data === null ? value : `${event.data}\n${value}`;
+      } else if (field === 'retry') {
+        event.retry = parseInt(value, 10);
+      }
+    });
+    return event;
+  });
+  return { events, rest };
+};
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Berlangganan event pesanan dari /api/orders/stream. Dibaca dengan fetch
+// karena EventSource bawaan browser tidak bisa mengirim header
+// Authorization. Server menutup koneksi setelah beberapa detik, lalu klien
+// tersambung ulang setelah jeda "retry" dengan Last-Event-ID terakhir.
+// Mengembalikan fungsi untuk berhenti berlangganan.
+export const subscribeOrderEvents = (onEvent) => {
+  const controller = new AbortController();
+  let lastEventId = null;
+  let retry = 2000;
+
+  const run = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const headers = { 'Authorization': `Bearer ${getToken()}` };
+        if (lastEventId !== null) {
+          headers['Last-Event-ID'] = lastEventId;
+        }
+        const response = await fetch('/api/orders/stream', { headers, signal: controller.signal });
+        if (!response.ok) {
+          // Token kedaluwarsa atau bukan admin; tidak perlu dicoba lagi
+          return;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+          const { done, value } = await reader.read();
+          if (done) {
+            break;
+          }
+          buffer += decoder.decode(value, { stream: true });
+          const parsed = parseEvents(buffer);
+          buffer = parsed.rest;
+          parsed.events.forEach((event) => {
+            if (event.retry !== null && !Number.isNaN(event.retry)) {
+              retry = event.retry;
+            }
+            if (event.id !== null) {
+              lastEventId = event.id;
+            }
+            // Blok tanpa data hanya memperbarui id/retry
+            if (event.data !== null) {
+              onEvent(event);
+            }
+          });
+        }
+      } catch (error) {
+        if (controller.signal.aborted) {
+          return;
+        }
+        console.error('Error reading order stream:', error);
+      }
+      await sleep(retry);
+    }
+  };
+
+  run();
+  return () => controller.abort();
+};